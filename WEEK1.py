@@ -1,9 +1,113 @@
-import json
-import datetime
-from typing import Dict, List, Tuple
+import time
+
+# Reference point of --profile-startup, taken before any other import
+STARTED = time.perf_counter()
+
+import sys
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+# Everything else (asset store, scoring engine, reports, data sources) is imported
+# where it is first used, so the first prompt does not wait for it
+if TYPE_CHECKING:
+    from asset_table import AssetTable
+    from scoring import AnalysisCache, InvestorProfile
+    from service import RecommendationService
+
+# Predefined cryptocurrency dataset with updated environmental scores and rising trends
+DEFAULT_ASSETS = {
+    "bitcoin": {
+        "symbol": "BTC",
+        "current_price": 68500,
+        "price_change_24h": 3.5,
+        "price_change_7d": 5.8,
+        "price_change_30d": 12.2,
+        "market_cap": 1350000000000,
+        "volume_24h": 25200000000,
+        "energy_efficiency_score": 3,
+        "environmental_score": 2, # Low due to Proof-of-Work
+        "sustainability_rating": "Low",
+        "environmental_rating": "Poor",
+        "project_viability": 9,
+        "adoption_score": 10,
+        "technology_score": 8,
+        "team_score": 9
+    },
+    "ethereum": {
+        "symbol": "ETH",
+        "current_price": 3850,
+        "price_change_24h": 4.2,
+        "price_change_7d": 8.1,
+        "price_change_30d": 15.7,
+        "market_cap": 462000000000,
+        "volume_24h": 12500000000,
+        "energy_efficiency_score": 9, # Post-merge Proof-of-Stake
+        "environmental_score": 9,
+        "sustainability_rating": "High",
+        "environmental_rating": "Excellent",
+        "project_viability": 9,
+        "adoption_score": 9,
+        "technology_score": 10,
+        "team_score": 9
+    },
+    "cardano": {
+        "symbol": "ADA",
+        "current_price": 0.82,
+        "price_change_24h": 2.1,
+        "price_change_7d": 6.3,
+        "price_change_30d": 18.5,
+        "market_cap": 29000000000,
+        "volume_24h": 850000000,
+        "energy_efficiency_score": 9,
+        "environmental_score": 9,
+        "sustainability_rating": "High",
+        "environmental_rating": "Excellent",
+        "project_viability": 8,
+        "adoption_score": 7,
+        "technology_score": 8,
+        "team_score": 8
+    },
+    "polygon": {
+        "symbol": "MATIC",
+        "current_price": 1.15,
+        "price_change_24h": 5.7,
+        "price_change_7d": 12.4,
+        "price_change_30d": 25.2,
+        "market_cap": 11500000000,
+        "volume_24h": 720000000,
+        "energy_efficiency_score": 8,
+        "environmental_score": 8,
+        "sustainability_rating": "High",
+        "environmental_rating": "Good",
+        "project_viability": 8,
+        "adoption_score": 8,
+        "technology_score": 9,
+        "team_score": 7
+    },
+    "solana": {
+        "symbol": "SOL",
+        "current_price": 172.50,
+        "price_change_24h": 6.8,
+        "price_change_7d": 14.2,
+        "price_change_30d": 28.9,
+        "market_cap": 79000000000,
+        "volume_24h": 2800000000,
+        "energy_efficiency_score": 8,
+        "environmental_score": 8,
+        "sustainability_rating": "High",
+        "environmental_rating": "Good",
+        "project_viability": 8,
+        "adoption_score": 8,
+        "technology_score": 9,
+        "team_score": 7
+    }
+}
+
+# Asset pickers list every asset up to this many; beyond it they only take a name or symbol search
+LIST_LIMIT = 20
 
 class CryptoInvestmentBot:
-    def __init__(self):
+    def __init__(self, assets: Optional["AssetTable"] = None, cache: Optional["AnalysisCache"] = None,
+                 loader: Optional[Callable[[], "RecommendationService"]] = None):
         self.name = "CryptoWise AI"
         self.conversation_state = "greeting"
         self.user_profile = {
@@ -13,343 +117,72 @@ class CryptoInvestmentBot:
             "sustainability_preference": None  # low, medium, high
         }
 
-        # Predefined cryptocurrency dataset with updated environmental scores and rising trends
-        self.crypto_data = {
-            "bitcoin": {
-                "symbol": "BTC",
-                "current_price": 68500,
-                "price_change_24h": 3.5,
-                "price_change_7d": 5.8,
-                "price_change_30d": 12.2,
-                "market_cap": 1350000000000,
-                "volume_24h": 25200000000,
-                "energy_efficiency_score": 3,
-                "environmental_score": 2, # Low due to Proof-of-Work
-                "sustainability_rating": "Low",
-                "environmental_rating": "Poor",
-                "project_viability": 9,
-                "adoption_score": 10,
-                "technology_score": 8,
-                "team_score": 9
-            },
-            "ethereum": {
-                "symbol": "ETH",
-                "current_price": 3850,
-                "price_change_24h": 4.2,
-                "price_change_7d": 8.1,
-                "price_change_30d": 15.7,
-                "market_cap": 462000000000,
-                "volume_24h": 12500000000,
-                "energy_efficiency_score": 9, # Post-merge Proof-of-Stake
-                "environmental_score": 9,
-                "sustainability_rating": "High",
-                "environmental_rating": "Excellent",
-                "project_viability": 9,
-                "adoption_score": 9,
-                "technology_score": 10,
-                "team_score": 9
-            },
-            "cardano": {
-                "symbol": "ADA",
-                "current_price": 0.82,
-                "price_change_24h": 2.1,
-                "price_change_7d": 6.3,
-                "price_change_30d": 18.5,
-                "market_cap": 29000000000,
-                "volume_24h": 850000000,
-                "energy_efficiency_score": 9,
-                "environmental_score": 9,
-                "sustainability_rating": "High",
-                "environmental_rating": "Excellent",
-                "project_viability": 8,
-                "adoption_score": 7,
-                "technology_score": 8,
-                "team_score": 8
-            },
-            "polygon": {
-                "symbol": "MATIC",
-                "current_price": 1.15,
-                "price_change_24h": 5.7,
-                "price_change_7d": 12.4,
-                "price_change_30d": 25.2,
-                "market_cap": 11500000000,
-                "volume_24h": 720000000,
-                "energy_efficiency_score": 8,
-                "environmental_score": 8,
-                "sustainability_rating": "High",
-                "environmental_rating": "Good",
-                "project_viability": 8,
-                "adoption_score": 8,
-                "technology_score": 9,
-                "team_score": 7
-            },
-            "solana": {
-                "symbol": "SOL",
-                "current_price": 172.50,
-                "price_change_24h": 6.8,
-                "price_change_7d": 14.2,
-                "price_change_30d": 28.9,
-                "market_cap": 79000000000,
-                "volume_24h": 2800000000,
-                "energy_efficiency_score": 8,
-                "environmental_score": 8,
-                "sustainability_rating": "High",
-                "environmental_rating": "Good",
-                "project_viability": 8,
-                "adoption_score": 8,
-                "technology_score": 9,
-                "team_score": 7
-            }
-        }
+        # The asset store and engine are built on first use: from assets/cache when
+        # given, else by loader, else from the bundled DEFAULT_ASSETS
+        self._assets = assets
+        self._cache = cache
+        self._loader = loader
+        self._service: Optional["RecommendationService"] = None
+        self.profile_startup = False
+
+    @property
+    def service(self) -> "RecommendationService":
+        """Recommendation engine over the asset store, loaded the first time it is needed"""
+        if self._service is None:
+            started = time.perf_counter()
+            if self._loader is not None:
+                self._service = self._loader()
+            else:
+                from asset_table import AssetTable
+                from service import RecommendationService
 
-        print(f"🤖 Hello! I'm {self.name}, your cryptocurrency investment advisor.")
-        print("I analyze crypto data based on profitability and sustainability to help you make informed decisions.")
-        print("\nLet's start by getting to know your investment preferences...")
+                assets = self._assets if self._assets is not None else AssetTable.from_records(DEFAULT_ASSETS)
+                self._service = RecommendationService(assets, self._cache)
+            if self.profile_startup:
+                print(f"⏱️  asset store and engine loaded on first use in {(time.perf_counter() - started) * 1000:.1f} ms "
+                      f"({len(self._service.assets):,} assets)", file=sys.stderr)
+        return self._service
+
+    @property
+    def crypto_data(self) -> "AssetTable":
+        return self.service.assets
+
+    @property
+    def profile(self) -> "InvestorProfile":
+        """Current answers as an immutable profile for the service layer"""
+        from scoring import InvestorProfile
+
+        return InvestorProfile.from_dict(self.user_profile)
 
     def analyze_profitability(self, crypto_name: str) -> Dict:
         """Analyze profitability based on price trends"""
-        data = self.crypto_data[crypto_name]
-
-        # Profitability scoring logic
-        score = 0
-        signals = []
-
-        # Short-term trend (24h)
-        if data["price_change_24h"] > 5:
-            score += 3
-            signals.append("Strong 24h growth")
-        elif data["price_change_24h"] > 0:
-            score += 1
-            signals.append("Positive 24h trend")
-        elif data["price_change_24h"] < -5:
-            score -= 2
-            signals.append("Weak 24h performance")
-
-        # Medium-term trend (7d)
-        if data["price_change_7d"] > 10:
-            score += 3
-            signals.append("Excellent weekly performance")
-        elif data["price_change_7d"] > 0:
-            score += 2
-            signals.append("Positive weekly trend")
-        elif data["price_change_7d"] < -10:
-            score -= 3
-            signals.append("Poor weekly performance")
-
-        # Long-term trend (30d)
-        if data["price_change_30d"] > 20:
-            score += 4
-            signals.append("Outstanding monthly growth")
-        elif data["price_change_30d"] > 10:
-            score += 3
-            signals.append("Strong monthly performance")
-        elif data["price_change_30d"] > 0:
-            score += 1
-            signals.append("Positive monthly trend")
-        elif data["price_change_30d"] < -20:
-            score -= 4
-            signals.append("Concerning monthly decline")
-
-        # Volume analysis
-        market_cap = data["market_cap"]
-        volume_24h = data["volume_24h"]
-        volume_ratio = volume_24h / market_cap if market_cap > 0 else 0
-
-        if volume_ratio > 0.1:
-            score += 2
-            signals.append("High trading activity")
-        elif volume_ratio > 0.05:
-            score += 1
-            signals.append("Good trading volume")
-        elif volume_ratio < 0.01:
-            score -= 1
-            signals.append("Low trading volume")
-
-        # Determine profitability rating
-        if score >= 8:
-            rating = "Excellent"
-        elif score >= 5:
-            rating = "Good"
-        elif score >= 2:
-            rating = "Moderate"
-        elif score >= -2:
-            rating = "Poor"
-        else:
-            rating = "Very Poor"
-
-        return {
-            "score": score,
-            "rating": rating,
-            "signals": signals,
-            "recommendation": self._get_profitability_recommendation(score)
-        }
+        return self.service.cache.profitability(crypto_name)
 
     def analyze_sustainability(self, crypto_name: str) -> Dict:
         """Analyze sustainability based on environmental factors and project viability"""
-        data = self.crypto_data[crypto_name]
-
-        score = 0
-        factors = []
-
-        # Environmental Score (40% weight)
-        environmental_score = data["environmental_score"]
-        if environmental_score >= 8:
-            score += 4
-            factors.append("Excellent environmental rating")
-        elif environmental_score >= 6:
-            score += 2
-            factors.append("Good environmental rating")
-        elif environmental_score >= 4:
-            score += 1
-            factors.append("Moderate environmental rating")
-        else:
-            score -= 2
-            factors.append("Poor environmental rating")
-
-        # Project viability (30% weight)
-        viability_score = data["project_viability"]
-        if viability_score >= 8:
-            score += 3
-            factors.append("Strong project fundamentals")
-        elif viability_score >= 6:
-            score += 2
-            factors.append("Solid project foundation")
-        elif viability_score >= 4:
-            score += 1
-            factors.append("Moderate project strength")
-        else:
-            score -= 1
-            factors.append("Weak project fundamentals")
-
-        # Technology and adoption (30% weight)
-        tech_adoption_avg = (data["technology_score"] + data["adoption_score"]) / 2
-        if tech_adoption_avg >= 8:
-            score += 3
-            factors.append("Advanced technology with strong adoption")
-        elif tech_adoption_avg >= 6:
-            score += 2
-            factors.append("Good technology and adoption balance")
-        elif tech_adoption_avg >= 4:
-            score += 1
-            factors.append("Developing technology and adoption")
-        else:
-            factors.append("Limited technology adoption")
-
-        # Determine sustainability rating
-        if score >= 8:
-            rating = "Highly Sustainable"
-        elif score >= 5:
-            rating = "Sustainable"
-        elif score >= 2:
-            rating = "Moderately Sustainable"
-        else:
-            rating = "Low Sustainability"
-
-        return {
-            "score": score,
-            "rating": rating,
-            "factors": factors,
-            "recommendation": self._get_sustainability_recommendation(score)
-        }
+        return self.service.cache.sustainability(crypto_name)
 
     def _get_profitability_recommendation(self, score: int) -> str:
         """Get profitability-based recommendation"""
-        if score >= 8:
-            return "Strong buy signal - excellent profit potential"
-        elif score >= 5:
-            return "Buy signal - good profit potential"
-        elif score >= 2:
-            return "Hold or small position - moderate potential"
-        elif score >= -2:
-            return "Caution advised - limited profit potential"
-        else:
-            return "Avoid - high risk of losses"
+        from scoring import profitability_recommendation
+
+        return profitability_recommendation(score)
 
     def _get_sustainability_recommendation(self, score: int) -> str:
         """Get sustainability-based recommendation"""
-        if score >= 8:
-            return "Excellent long-term investment choice"
-        elif score >= 5:
-            return "Good sustainable investment option"
-        elif score >= 2:
-            return "Acceptable for ESG-conscious investors"
-        else:
-            return "Not recommended for sustainability-focused portfolios"
+        from scoring import sustainability_recommendation
+
+        return sustainability_recommendation(score)
 
     def get_personalized_recommendation(self, crypto_name: str) -> Dict:
         """Generate personalized recommendation based on user profile"""
-        profitability = self.analyze_profitability(crypto_name)
-        sustainability = self.analyze_sustainability(crypto_name)
-
-        # Weight factors based on user preferences
-        profit_weight = 0.7 if self.user_profile.get("sustainability_preference") == "low" else 0.5
-        sustain_weight = 1 - profit_weight
-
-        # Calculate weighted score
-        weighted_score = (profitability["score"] * profit_weight + 
-                          sustainability["score"] * sustain_weight)
-
-        # Risk adjustment
-        risk_tolerance = self.user_profile.get("risk_tolerance", "medium")
-        if risk_tolerance == "low":
-            # Penalize volatile options
-            if self.crypto_data[crypto_name]["price_change_7d"] > 15 or self.crypto_data[crypto_name]["price_change_7d"] < -15:
-                weighted_score -= 2
-        elif risk_tolerance == "high":
-            # Bonus for high-growth potential
-            if self.crypto_data[crypto_name]["price_change_30d"] > 20:
-                weighted_score += 1
-
-        # Generate final recommendation
-        if weighted_score >= 7:
-            final_rec = "Highly Recommended"
-        elif weighted_score >= 4:
-            final_rec = "Recommended"
-        elif weighted_score >= 1:
-            final_rec = "Consider with Caution"
-        else:
-            final_rec = "Not Recommended"
-
-        return {
-            "crypto": crypto_name.title(),
-            "symbol": self.crypto_data[crypto_name]["symbol"],
-            "profitability": profitability,
-            "sustainability": sustainability,
-            "weighted_score": round(weighted_score, 2),
-            "final_recommendation": final_rec,
-            "investment_advice": self._generate_investment_advice(crypto_name, weighted_score)
-        }
+        return self.service.analyze(self.profile, crypto_name)
 
     def _generate_investment_advice(self, crypto_name: str, score: float) -> str:
         """Generate specific investment advice"""
-        data = self.crypto_data[crypto_name]
-        advice = []
-
-        # Position sizing advice
-        risk_tolerance = self.user_profile.get("risk_tolerance", "medium")
-        if score >= 7 and risk_tolerance == "high":
-            advice.append("Consider a 15-25% portfolio allocation")
-        elif score >= 4:
-            advice.append("Consider a 5-15% portfolio allocation")
-        elif score >= 1:
-            advice.append("Consider a small 2-5% portfolio allocation")
-        else:
-            advice.append("Avoid or minimal exposure (<2%)")
-
-        # Timing advice
-        if data["price_change_24h"] < -3:
-            advice.append("Current dip may present buying opportunity")
-        elif data["price_change_24h"] > 5:
-            advice.append("Consider dollar-cost averaging due to recent gains")
+        from scoring import generate_investment_advice
 
-        # Time horizon advice
-        time_horizon = self.user_profile.get("time_horizon", "medium")
-        if time_horizon == "long" and self.crypto_data[crypto_name]["project_viability"] >= 8:
-            advice.append("Well-suited for long-term holding strategy")
-        elif time_horizon == "short":
-            advice.append("Monitor closely for short-term trading opportunities")
-
-        return " | ".join(advice)
+        return generate_investment_advice(self.crypto_data[crypto_name], score, self.profile)
 
     def chat(self):
         """Main chat interface"""
@@ -368,6 +201,17 @@ class CryptoInvestmentBot:
 
     def _handle_greeting(self):
         """Handle initial greeting and move to profile setup"""
+        if all(answer is not None for answer in self.user_profile.values()):
+            # Profile restored from a snapshot
+            print(f"🤖 Welcome back! I'm {self.name}, your cryptocurrency investment advisor.")
+            print("Using your saved investment profile (choose 5 in the menu to update it).")
+            self.conversation_state = "main_menu"
+            return
+
+        print(f"🤖 Hello! I'm {self.name}, your cryptocurrency investment advisor.")
+        print("I analyze crypto data based on profitability and sustainability to help you make informed decisions.")
+        print("\nLet's start by getting to know your investment preferences...")
+
         self.conversation_state = "profile_setup"
         self._collect_user_profile()
 
@@ -450,128 +294,113 @@ class CryptoInvestmentBot:
         else:
             print("❌ Invalid choice. Please try again.")
 
-    def _analyze_specific_crypto(self):
-        """Analyze a specific cryptocurrency"""
-        print("\n📊 Available cryptocurrencies:")
+    def _list_cryptocurrencies(self):
+        """Numbered asset list, or just a count when there are too many to read through"""
+        if len(self.crypto_data) > LIST_LIMIT:
+            print(f"{len(self.crypto_data):,} cryptocurrencies available - type a name or symbol, "
+                  f"or the start of one.")
+            return
         for i, crypto in enumerate(self.crypto_data.keys(), 1):
             symbol = self.crypto_data[crypto]["symbol"]
             price = self.crypto_data[crypto]["current_price"]
             print(f"{i}. {crypto.title()} ({symbol}) - ${price:,.2f}")
 
-        try:
-            choice = int(input(f"\nSelect cryptocurrency (1-{len(self.crypto_data)}): "))
-            crypto_list = list(self.crypto_data.keys())
+    def _find_crypto(self, query: str) -> Optional[str]:
+        """Asset a typed name or symbol refers to, printing suggestions when it is not clear"""
+        crypto = self.service.search_index.best(query)
+        if crypto is None:
+            matches = self.service.search(query, 5)
+            if matches:
+                suggestions = ", ".join(f"{match['crypto']} ({match['symbol']})" for match in matches)
+                print(f"🔎 Did you mean: {suggestions}?")
+            else:
+                print(f"❌ No cryptocurrency matches '{query}'.")
+        return crypto
 
-            if 1 <= choice <= len(crypto_list):
-                selected_crypto = crypto_list[choice - 1]
-                recommendation = self.get_personalized_recommendation(selected_crypto)
-                self._display_detailed_analysis(recommendation)
+    def _analyze_specific_crypto(self):
+        """Analyze a specific cryptocurrency"""
+        print("\n📊 Available cryptocurrencies:")
+        self._list_cryptocurrencies()
+
+        if len(self.crypto_data) > LIST_LIMIT:
+            choice = input("\nCryptocurrency name or symbol: ").strip()
+        else:
+            choice = input(f"\nSelect cryptocurrency (1-{len(self.crypto_data)}, or a name or symbol): ").strip()
+        crypto_list = list(self.crypto_data.keys())
+
+        if choice.lstrip("+-").isdigit():
+            # isdigit() also passes "--5" or "²", which int() refuses
+            try:
+                index = int(choice)
+            except ValueError:
+                print("❌ Please enter a valid number.")
+                return
+            if 1 <= index <= len(crypto_list):
+                selected_crypto = crypto_list[index - 1]
             else:
                 print("❌ Invalid selection.")
-        except ValueError:
-            print("❌ Please enter a valid number.")
+                return
+        else:
+            selected_crypto = self._find_crypto(choice)
+            if selected_crypto is None:
+                return
+        recommendation = self.get_personalized_recommendation(selected_crypto)
+        self._display_detailed_analysis(recommendation)
 
     def _display_detailed_analysis(self, rec: Dict):
         """Display detailed analysis results"""
-        print("\n" + "="*60)
-        print(f"📈 DETAILED ANALYSIS: {rec['crypto']} ({rec['symbol']})")
-        print("="*60)
-
-        # Current data
-        crypto_data = self.crypto_data[rec['crypto'].lower()]
-        print(f"💰 Current Price: ${crypto_data['current_price']:,.2f}")
-        print(f"📊 24h Change: {crypto_data['price_change_24h']:+.1f}%")
-        print(f"📊 7d Change: {crypto_data['price_change_7d']:+.1f}%")
-        print(f"📊 30d Change: {crypto_data['price_change_30d']:+.1f}%")
-        print(f"🏛️ Market Cap: ${crypto_data['market_cap']:,.0f}")
-
-        # Profitability Analysis
-        print(f"\n🎯 PROFITABILITY ANALYSIS")
-        print(f"Rating: {rec['profitability']['rating']} (Score: {rec['profitability']['score']}/10)")
-        print(f"Signals: {', '.join(rec['profitability']['signals'])}")
-        print(f"Recommendation: {rec['profitability']['recommendation']}")
-
-        # Sustainability Analysis
-        print(f"\n🌱 SUSTAINABILITY ANALYSIS")
-        print(f"Rating: {rec['sustainability']['rating']} (Score: {rec['sustainability']['score']}/10)")
-        print(f"Environmental Rating: {crypto_data['environmental_rating']}")
-        print(f"Factors: {', '.join(rec['sustainability']['factors'])}")
-        print(f"Recommendation: {rec['sustainability']['recommendation']}")
-
-        # Final Recommendation
-        print(f"\n⭐ FINAL RECOMMENDATION")
-        print(f"Overall Score: {rec['weighted_score']}/10")
-        print(f"Verdict: {rec['final_recommendation']}")
-        print(f"Investment Advice: {rec['investment_advice']}")
+        from reports import DetailedAnalysisReport
+
+        DetailedAnalysisReport(rec, self.crypto_data[rec['crypto'].lower()]).display()
 
         input("\nPress Enter to continue...")
 
     def _get_top_recommendations(self):
         """Get top recommendations based on user profile"""
-        print("\n🏆 Analyzing all cryptocurrencies for your profile...")
-
-        recommendations = []
-        for crypto_name in self.crypto_data.keys():
-            rec = self.get_personalized_recommendation(crypto_name)
-            recommendations.append(rec)
+        from reports import TopRecommendationsReport
 
-        # Sort by weighted score
-        recommendations.sort(key=lambda x: x['weighted_score'], reverse=True)
-
-        print("\n" + "="*60)
-        print("🎯 TOP RECOMMENDATIONS FOR YOUR PROFILE")
-        print("="*60)
+        print("\n🏆 Analyzing all cryptocurrencies for your profile...")
 
-        for i, rec in enumerate(recommendations[:3], 1):
-            crypto_data = self.crypto_data[rec['crypto'].lower()]
-            print(f"\n{i}. {rec['crypto']} ({rec['symbol']})")
-            print(f"   💰 Price: ${crypto_data['current_price']:,.2f}")
-            print(f"   ⭐ Score: {rec['weighted_score']}/10")
-            print(f"   📈 Recommendation: {rec['final_recommendation']}")
-            print(f"   💡 Advice: {rec['investment_advice']}")
+        recommendations = self.service.top_recommendations(self.profile, 3)
+        TopRecommendationsReport(recommendations, self.crypto_data).display()
 
         input("\nPress Enter to continue...")
 
     def _compare_cryptocurrencies(self):
         """Compare multiple cryptocurrencies"""
+        from reports import ComparisonReport
+
         print("\n🔍 Select cryptocurrencies to compare:")
+        self._list_cryptocurrencies()
 
         crypto_list = list(self.crypto_data.keys())
-        for i, crypto in enumerate(crypto_list, 1):
-            symbol = self.crypto_data[crypto]["symbol"]
-            price = self.crypto_data[crypto]["current_price"]
-            print(f"{i}. {crypto.title()} ({symbol}) - ${price:,.2f}")
-
-        selections = input(f"\nEnter numbers separated by commas (e.g., 1,2,3): ").strip()
+        selections = input("\nEnter numbers, names or symbols separated by commas (e.g., 1,2,ETH): ").strip()
 
         try:
-            indices = [int(x.strip()) - 1 for x in selections.split(',')]
-            selected_cryptos = [crypto_list[i] for i in indices if 0 <= i < len(crypto_list)]
+            # Each entry is a list number, or a name or symbol looked up in the search index
+            selected_cryptos = []
+            for entry in selections.split(','):
+                entry = entry.strip()
+                if entry.lstrip("+-").isdigit():
+                    try:
+                        i = int(entry) - 1
+                    except ValueError:
+                        print(f"❌ Please enter a valid number instead of '{entry}'.")
+                        return
+                    if 0 <= i < len(crypto_list):
+                        selected_cryptos.append(crypto_list[i])
+                else:
+                    crypto = self._find_crypto(entry)
+                    if crypto is None:
+                        return
+                    selected_cryptos.append(crypto)
+            selected_cryptos = list(dict.fromkeys(selected_cryptos))
 
             if len(selected_cryptos) < 2:
                 print("❌ Please select at least 2 cryptocurrencies.")
                 return
 
-            print("\n" + "="*80)
-            print("⚖️ CRYPTOCURRENCY COMPARISON")
-            print("="*80)
-
-            # Headers
-            print(f"{'Crypto':<12} {'Price':<12} {'24h%':<8} {'30d%':<8} {'Profit':<12} {'Sustain':<12} {'Score':<8}")
-            print("-" * 80)
-
-            # Comparison data
-            for crypto in selected_cryptos:
-                rec = self.get_personalized_recommendation(crypto)
-                data = self.crypto_data[crypto]
-
-                print(f"{crypto.title():<12} "
-                      f"${data['current_price']:<11,.2f} "
-                      f"{data['price_change_24h']:+6.1f}% "
-                      f"{data['price_change_30d']:+6.1f}% "
-                      f"{rec['profitability']['rating']:<12} "
-                      f"{rec['sustainability']['rating']:<12} "
-                      f"{rec['weighted_score']:<8.1f}")
+            ComparisonReport(self.service.compare(self.profile, selected_cryptos)).display()
 
             input("\nPress Enter to continue...")
 
@@ -580,52 +409,162 @@ class CryptoInvestmentBot:
 
     def _show_market_overview(self):
         """Show market overview"""
-        print("\n" + "="*60)
-        print("🌐 CRYPTOCURRENCY MARKET OVERVIEW")
-        print("="*60)
+        from reports import MarketOverviewReport
+
+        MarketOverviewReport(self.service.market_overview()).display()
 
-        total_market_cap = sum(data["market_cap"] for data in self.crypto_data.values())
-        total_volume = sum(data["volume_24h"] for data in self.crypto_data.values())
+        input("\nPress Enter to continue...")
 
-        print(f"📊 Total Market Cap: ${total_market_cap:,.0f}")
-        print(f"📈 24h Volume: ${total_volume:,.0f}")
+# Main execution
+def main():
+    """Main function to run the chatbot"""
+    main_started = time.perf_counter()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CryptoWise AI - cryptocurrency investment advisor")
+    parser.add_argument("--feed", metavar="PATH", help="apply a JSONL market-data feed to the asset data")
+    parser.add_argument("--follow", action="store_true", help="keep applying updates appended to the feed")
+    parser.add_argument("--history", metavar="DIR",
+                        help="recompute 24h/7d/30d changes and measure volatility, drawdown and beta "
+                             "from an OHLCV price history directory")
+    parser.add_argument("--rules", metavar="PATH",
+                        help="scoring rules table (JSON), default $CRYPTOWISE_RULES or the bundled table")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="warm start from a snapshot of the asset data, analyses and profile, "
+                             "saved back to PATH on exit")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record stage timings and branch counts, written to PATH on exit "
+                             "(Prometheus text for *.prom, JSON lines otherwise)")
+    parser.add_argument("--cprofile", metavar="PATH",
+                        help="profile the session with cProfile and save pstats data to PATH")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report module load, init and time to the first prompt on stderr, "
+                             "then the cost of each deferred load when it happens")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    batch = commands.add_parser("batch", help="recommendations for many profiles from a file, without prompts",
+                                description="Stream recommendations for investor profiles read from JSON "
+                                            "lines or CSV to stdout or a file")
+    import batch_cli
+
+    batch_cli.add_arguments(batch)
+    args = parser.parse_args()
+    parsed = time.perf_counter()
+
+    if args.rules:
+        import rules
 
-        print(f"\n{'Cryptocurrency':<15} {'Price':<12} {'24h Change':<12} {'Market Cap':<15}")
-        print("-" * 60)
+        try:
+            rules.install(rules.load_rules(args.rules))
+        except (OSError, ValueError) as error:
+            parser.error(str(error))
+    if args.metrics:
+        import instrumentation
+
+        instrumentation.enable([instrumentation.sink_for_path(args.metrics)])
+    profiler = None
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+
+    if args.command is None:
+        print("🚀 Initializing CryptoWise AI...")
+        print("This chatbot will help you make informed cryptocurrency investment decisions!")
+        print("Based on profitability analysis and sustainability factors.\n")
+
+    seeds = []
+
+    def load_service():
+        """Asset store from the snapshot or the bundled data, with history and feed applied"""
+        if args.snapshot:
+            import snapshot
+
+            warm = snapshot.warm_start(args.snapshot, DEFAULT_ASSETS)
+            seeds.append(warm.seeds)
+            service = warm.service
+        else:
+            from asset_table import AssetTable
+            from service import RecommendationService
 
-        for crypto, data in self.crypto_data.items():
-            change_color = "📈" if data["price_change_24h"] >= 0 else "📉"
-            print(f"{crypto.title():<15} "
-                  f"${data['current_price']:<11,.2f} "
-                  f"{change_color}{data['price_change_24h']:+6.1f}% "
-                  f"${data['market_cap']:>14,.0f}")
+            service = RecommendationService(AssetTable.from_records(DEFAULT_ASSETS))
 
-        # Market sentiment
-        positive_changes = sum(1 for data in self.crypto_data.values() if data["price_change_24h"] > 0)
-        total_cryptos = len(self.crypto_data)
-        sentiment = "Bullish 🐂" if positive_changes > total_cryptos / 2 else "Bearish 🐻"
+        if args.history:
+            from price_history import PriceHistory
+            from risk_analytics import RiskAnalytics
 
-        print(f"\n🎭 Market Sentiment: {sentiment}")
-        print(f"📊 Positive Performers: {positive_changes}/{total_cryptos}")
+            history = PriceHistory(args.history)
+            history.apply_to(service.assets)
+            RiskAnalytics(history, service.assets).apply_to(service.assets)
 
-        input("\nPress Enter to continue...")
+        if args.feed:
+            from ingestion import IngestionPipeline, file_source
 
-# Main execution
-def main():
-    """Main function to run the chatbot"""
-    print("🚀 Initializing CryptoWise AI...")
-    print("This chatbot will help you make informed cryptocurrency investment decisions!")
-    print("Based on profitability analysis and sustainability factors.\n")
+            pipeline = IngestionPipeline(service.assets, service.cache)
+            if args.follow:
+                import threading
 
-    bot = CryptoInvestmentBot()
+                threading.Thread(target=pipeline.run, args=(file_source(args.feed, follow=True),),
+                                 name="market-feed", daemon=True).start()
+            else:
+                pipeline.run(file_source(args.feed))
+        return service
+
+    bot = CryptoInvestmentBot(loader=load_service)
+    bot.profile_startup = args.profile_startup
+    if args.command == "batch":
+        if profiler is not None:
+            profiler.enable()
+        status = batch_cli.main(bot.service, args)
+        if profiler is not None:
+            import pstats
+
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        if args.metrics:
+            probe = instrumentation.disable()
+            if probe is not None:
+                probe.flush()
+        sys.exit(status)
+    if args.snapshot:
+        import snapshot
+
+        # Only the saved profile is needed up front; the snapshot itself loads on first use
+        saved = snapshot.read_profiles(args.snapshot).get("default")
+        if saved is not None:
+            bot.user_profile.update(saved)
+
+    if args.profile_startup:
+        ready = time.perf_counter()
+        print(f"⏱️  startup: module load {(main_started - STARTED) * 1000:.1f} ms, "
+              f"arguments {(parsed - main_started) * 1000:.1f} ms, init {(ready - parsed) * 1000:.1f} ms, "
+              f"first prompt after {(ready - STARTED) * 1000:.1f} ms ({len(sys.modules)} modules imported)",
+              file=sys.stderr)
 
     try:
+        if profiler is not None:
+            profiler.enable()
         bot.chat()
     except KeyboardInterrupt:
         print("\n\n🤖 Thanks for using CryptoWise AI! Goodbye! 👋")
     except Exception as e:
         print(f"\n❌ An error occurred: {e}")
         print("Please restart the bot and try again.")
+    finally:
+        if profiler is not None:
+            import pstats
+
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        if args.metrics:
+            probe = instrumentation.disable()
+            if probe is not None:
+                probe.flush()
+        if args.snapshot:
+            answered = all(answer is not None for answer in bot.user_profile.values())
+            assets = bot.crypto_data
+            snapshot.save_snapshot(args.snapshot, assets, {"default": bot.profile} if answered else {}, seeds[0])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,357 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple, Union
+
+import rules
+from asset_table import FLOAT_COLUMNS, INT_COLUMNS, RISK_COLUMNS, AssetTable
+from scoring import AnalysisCache, InvestorProfile, compute_weighted_score
+from topk_index import BUCKETS, bucket_of
+
+# Fields a condition can watch. The first two depend on the subscriber's profile, and only
+# through its topk_index bucket, so subscriptions are grouped per bucket rather than per profile
+PROFILE_FIELDS = ("weighted_score", "final_recommendation")
+ANALYSIS_FIELDS = ("profitability_score", "profitability_rating", "sustainability_score", "sustainability_rating")
+ASSET_FIELDS = FLOAT_COLUMNS + INT_COLUMNS + RISK_COLUMNS
+FIELDS = PROFILE_FIELDS + ANALYSIS_FIELDS + ASSET_FIELDS
+# Compared by tier, worst to best, and given and reported as their labels
+TIER_FIELDS = ("final_recommendation", "profitability_rating", "sustainability_rating")
+
+THRESHOLD_OPERATORS = (">", ">=", "<", "<=")
+OPERATORS = THRESHOLD_OPERATORS + ("==", "!=", "changes")
+INBOX_SIZE = 1000  # Undrained alerts kept per subscriber, oldest dropped first
+
+
+class SubscriptionError(ValueError):
+    """An alert condition that cannot be registered"""
+
+
+class Alert(NamedTuple):
+    """A subscription whose condition became true on an asset update"""
+
+    subscription: int
+    crypto: str
+    field: str
+    condition: str
+    old: Union[float, str]
+    new: Union[float, str]
+
+    def to_dict(self) -> Dict:
+        return {"subscription": self.subscription, "crypto": self.crypto.title(), "field": self.field,
+                "condition": self.condition, "old": self.old, "new": self.new}
+
+
+def tier_labels(field: str, ruleset: Optional[rules.Ruleset] = None) -> Tuple[str, ...]:
+    """Labels of a tier field by tier code, worst first"""
+    ruleset = ruleset or rules.current()
+    if field == "final_recommendation":
+        return ruleset.final_recommendation["recommendation"]
+    ladder = ruleset.profitability_rating if field == "profitability_rating" else ruleset.sustainability_rating
+    return ladder["rating"]
+
+
+class _Watch:
+    """Subscriptions on one (asset, field, bucket) and the value they last saw
+
+    Threshold conditions sit in one sorted threshold array per operator, so
+    the ones a change from old to new makes true are a contiguous slice
+    found with two bisects, however many subscriptions share the watch.
+    """
+
+    __slots__ = ("last", "sorted", "keyed", "changes", "size")
+
+    def __init__(self, value: float):
+        self.last = value
+        self.sorted: Dict[str, Tuple[array, array]] = {}  # operator -> (thresholds, subscription ids)
+        self.keyed: Dict[str, Dict[float, List[int]]] = {}  # "==" / "!=" -> value -> subscription ids
+        self.changes: List[int] = []
+        self.size = 0
+
+    def add(self, op: str, value: float, sid: int):
+        if op in THRESHOLD_OPERATORS:
+            thresholds, ids = self.sorted.setdefault(op, (array("d"), array("q")))
+            i = bisect_right(thresholds, value)
+            thresholds.insert(i, value)
+            ids.insert(i, sid)
+        elif op == "changes":
+            self.changes.append(sid)
+        else:
+            self.keyed.setdefault(op, {}).setdefault(value, []).append(sid)
+        self.size += 1
+
+    def remove(self, op: str, value: float, sid: int):
+        if op in THRESHOLD_OPERATORS:
+            thresholds, ids = self.sorted[op]
+            low = bisect_left(thresholds, value)
+            i = low + ids[low:bisect_right(thresholds, value)].index(sid)
+            del thresholds[i]
+            del ids[i]
+        elif op == "changes":
+            self.changes.remove(sid)
+        else:
+            same = self.keyed[op][value]
+            same.remove(sid)
+            if not same:
+                del self.keyed[op][value]
+        self.size -= 1
+
+    def fired(self, old: float, new: float) -> List[int]:
+        """Subscriptions whose condition is false at old and true at new"""
+        if old == new or (old != old and new != new):
+            return []
+        fired: List[int] = []
+        if old == old and new == new:  # Thresholds never fire to or from an unmeasured (NaN) value
+            for op, (thresholds, ids) in self.sorted.items():
+                if new > old:
+                    if op == ">":  # old <= t < new
+                        fired += ids[bisect_left(thresholds, old):bisect_left(thresholds, new)]
+                    elif op == ">=":  # old < t <= new
+                        fired += ids[bisect_right(thresholds, old):bisect_right(thresholds, new)]
+                elif op == "<":  # new < t <= old
+                    fired += ids[bisect_right(thresholds, new):bisect_right(thresholds, old)]
+                elif op == "<=":  # new <= t < old
+                    fired += ids[bisect_left(thresholds, new):bisect_left(thresholds, old)]
+        if self.keyed:
+            fired += self.keyed.get("==", {}).get(new, ())
+            fired += self.keyed.get("!=", {}).get(old, ())
+        fired += self.changes
+        return fired
+
+
+class AlertEngine:
+    """Conditions on asset fields, scores and tiers, evaluated as the asset table changes
+
+    A subscription watches one field of one asset (for the weighted score
+    and the verdict, as seen by one investor profile) and fires once each
+    time its condition goes from false to true. Subscriptions are indexed by
+    asset row, so an update only looks at the watches on the updated asset,
+    and within a watch only at the subscriptions its change crosses: the
+    cost of an update does not grow with the number of subscriptions.
+
+    Alerts go to the subscriber's inbox (drained with drain()) and to every
+    handler added with add_handler(). Subscription records are kept in
+    columns indexed by subscription id, which are reused once freed.
+    """
+
+    def __init__(self, assets: AssetTable, cache: Optional[AnalysisCache] = None, inbox_size: int = INBOX_SIZE):
+        self.assets = assets
+        self.cache = cache if cache is not None else AnalysisCache(assets)
+        self.inbox_size = inbox_size
+        self._watches: Dict[int, Dict[Tuple[int, int], _Watch]] = {}  # row -> (field, bucket) -> watch
+        self._owners: List[Optional[Hashable]] = []
+        self._rows = array("l")
+        self._fields = array("B")
+        self._buckets = array("B")
+        self._ops = array("B")
+        self._values = array("d")
+        self._free: List[int] = []
+        self._owned: Dict[Hashable, Set[int]] = {}
+        self._inboxes: Dict[Hashable, deque] = {}
+        self._handlers: List[Callable[[Hashable, Alert], None]] = []
+        self._lock = threading.Lock()
+        self.fired = 0
+        assets.add_listener(self._on_update)
+
+    def __len__(self) -> int:
+        return len(self._owners) - len(self._free)
+
+    def add_handler(self, handler: Callable[[Hashable, Alert], None]):
+        """Call handler(owner, alert) for every alert, on the thread that updated the asset"""
+        self._handlers.append(handler)
+
+    def remove_handler(self, handler: Callable[[Hashable, Alert], None]):
+        self._handlers.remove(handler)
+
+    def subscribe(self, owner: Hashable, crypto: str, field: str, op: str, value=None,
+                  profile: Optional[InvestorProfile] = None) -> int:
+        """Register a condition for owner and return its subscription id
+
+        value is a number, or a tier label for the rating and verdict fields;
+        "changes" takes none. profile (medium answers by default) decides the
+        weighted score and verdict the condition sees.
+        """
+        row = self.assets.row_of(crypto)
+        if row is None:
+            raise KeyError(f"Unknown cryptocurrency: {crypto}")
+        if field not in FIELDS:
+            raise SubscriptionError(f"Cannot watch {field!r} (expected one of {', '.join(FIELDS)})")
+        if op not in OPERATORS:
+            raise SubscriptionError(f"Invalid operator: {op!r} (expected one of {', '.join(OPERATORS)})")
+        threshold = self._threshold(field, op, value)
+        bucket = BUCKETS.index(bucket_of(profile or InvestorProfile())) if field in PROFILE_FIELDS else 0
+        code = FIELDS.index(field)
+
+        with self._lock:
+            watches = self._watches.setdefault(row, {})
+            watch = watches.get((code, bucket))
+            if watch is None:
+                watch = watches[code, bucket] = _Watch(self._values_of(row, {(code, bucket)})[code, bucket])
+            if self._free:
+                sid = self._free.pop()
+                self._owners[sid] = owner
+                self._rows[sid], self._fields[sid], self._buckets[sid] = row, code, bucket
+                self._ops[sid], self._values[sid] = OPERATORS.index(op), threshold
+            else:
+                sid = len(self._owners)
+                self._owners.append(owner)
+                self._rows.append(row)
+                self._fields.append(code)
+                self._buckets.append(bucket)
+                self._ops.append(OPERATORS.index(op))
+                self._values.append(threshold)
+            watch.add(op, threshold, sid)
+            self._owned.setdefault(owner, set()).add(sid)
+        return sid
+
+    def _threshold(self, field: str, op: str, value) -> float:
+        if op == "changes":
+            if value is not None:
+                raise SubscriptionError("'changes' conditions take no value")
+            return 0.0
+        if field in TIER_FIELDS:
+            labels = tier_labels(field)
+            if value not in labels:
+                raise SubscriptionError(f"Invalid {field}: {value!r} (expected one of {', '.join(labels)})")
+            return float(labels.index(value))
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+            raise SubscriptionError(f"{field} conditions need a number, not {value!r}")
+        return float(value)
+
+    def unsubscribe(self, sid: int, owner: Optional[Hashable] = None):
+        """Drop a subscription (only if it belongs to owner, when given)"""
+        with self._lock:
+            if not 0 <= sid < len(self._owners) or self._owners[sid] is None or (
+                    owner is not None and self._owners[sid] != owner):
+                raise KeyError(f"No subscription {sid}")
+            self._drop(sid)
+
+    def unsubscribe_all(self, owner: Hashable) -> int:
+        """Drop every subscription and pending alert of owner, return how many subscriptions there were"""
+        with self._lock:
+            sids = self._owned.get(owner, ())
+            count = len(sids)
+            for sid in list(sids):
+                self._drop(sid)
+            self._inboxes.pop(owner, None)
+        return count
+
+    def _drop(self, sid: int):
+        row, key = self._rows[sid], (self._fields[sid], self._buckets[sid])
+        watches = self._watches[row]
+        watch = watches[key]
+        watch.remove(OPERATORS[self._ops[sid]], self._values[sid], sid)
+        if not watch.size:
+            del watches[key]
+            if not watches:
+                del self._watches[row]
+        owner = self._owners[sid]
+        owned = self._owned[owner]
+        owned.discard(sid)
+        if not owned:
+            del self._owned[owner]
+        self._owners[sid] = None
+        self._free.append(sid)
+
+    def describe(self, sid: int) -> Dict:
+        field = FIELDS[self._fields[sid]]
+        description = {"subscription": sid, "crypto": self.assets.name_of(self._rows[sid]).title(),
+                       "field": field, "condition": self._condition(sid)}
+        if field in PROFILE_FIELDS:
+            risk, profit_focused = BUCKETS[self._buckets[sid]]
+            description["risk_tolerance"] = risk
+            description["profit_focused"] = profit_focused
+        return description
+
+    def subscriptions(self, owner: Hashable) -> List[Dict]:
+        with self._lock:
+            return [self.describe(sid) for sid in sorted(self._owned.get(owner, ()))]
+
+    def _condition(self, sid: int) -> str:
+        field, op = FIELDS[self._fields[sid]], OPERATORS[self._ops[sid]]
+        if op == "changes":
+            return f"{field} changes"
+        return f"{field} {op} {self._display(field, self._values[sid])}"
+
+    @staticmethod
+    def _display(field: str, value: float) -> Union[float, str]:
+        return tier_labels(field)[int(value)] if field in TIER_FIELDS else value
+
+    def _values_of(self, row: int, keys) -> Dict[Tuple[int, int], float]:
+        """Current value of each watched (field, bucket) of a row, tiers as codes"""
+        values = {}
+        data = analyses = ruleset = None
+        for code, bucket in keys:
+            field = FIELDS[code]
+            if field in ASSET_FIELDS:
+                values[code, bucket] = float(self.assets.get_field(row, field))
+                continue
+            if analyses is None:
+                name = self.assets.name_of(row)
+                analyses = self.cache.analyses(name)
+                data = self.assets[name]
+                ruleset = rules.current()
+            profitability, sustainability = analyses
+            if field == "profitability_score":
+                value = profitability["score"]
+            elif field == "sustainability_score":
+                value = sustainability["score"]
+            elif field == "profitability_rating":
+                value = tier_labels(field, ruleset).index(profitability["rating"])
+            elif field == "sustainability_rating":
+                value = tier_labels(field, ruleset).index(sustainability["rating"])
+            else:
+                risk, profit_focused = BUCKETS[bucket]
+                score = compute_weighted_score(profitability["score"], sustainability["score"], data,
+                                               risk, "low" if profit_focused else "medium")
+                if field == "weighted_score":
+                    value = round(score, 2)  # What the recommendation shows
+                else:
+                    labels = tier_labels(field, ruleset)
+                    value = labels.index(labels[ruleset.final_recommendation.bucket(score)])
+            values[code, bucket] = float(value)
+        return values
+
+    def _on_update(self, row: int):
+        watches = self._watches.get(row)
+        if watches is None:
+            return
+        delivered = []
+        with self._lock:
+            watches = self._watches.get(row)
+            if watches is None:
+                return
+            values = self._values_of(row, watches)
+            crypto = self.assets.name_of(row)
+            for key, watch in watches.items():
+                old, new = watch.last, values[key]
+                if old == new:
+                    continue
+                watch.last = new
+                for sid in watch.fired(old, new):
+                    field = FIELDS[key[0]]
+                    alert = Alert(sid, crypto, field, self._condition(sid),
+                                  self._display(field, old), self._display(field, new))
+                    owner = self._owners[sid]
+                    inbox = self._inboxes.get(owner)
+                    if inbox is None:
+                        inbox = self._inboxes[owner] = deque(maxlen=self.inbox_size)
+                    inbox.append(alert)
+                    delivered.append((owner, alert))
+            self.fired += len(delivered)
+        for handler in self._handlers:
+            for owner, alert in delivered:
+                handler(owner, alert)
+
+    def drain(self, owner: Hashable, limit: Optional[int] = None) -> List[Alert]:
+        """Take the pending alerts of owner, oldest first"""
+        with self._lock:
+            inbox = self._inboxes.get(owner)
+            if not inbox:
+                return []
+            count = len(inbox) if limit is None else min(limit, len(inbox))
+            return [inbox.popleft() for _ in range(count)]
+
+    def close(self):
+        """Stop following table updates"""
+        self.assets.remove_listener(self._on_update)
@@ -0,0 +1,320 @@
+import math
+import operator
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+# Column layout of the asset store, in the field order of the original crypto_data records
+FLOAT_COLUMNS = (
+    "current_price", "price_change_24h", "price_change_7d", "price_change_30d",
+    "market_cap", "volume_24h",
+)
+INT_COLUMNS = (
+    "energy_efficiency_score", "environmental_score", "project_viability",
+    "adoption_score", "technology_score", "team_score",
+)
+CATEGORY_COLUMNS = ("sustainability_rating", "environmental_rating")
+# Risk metrics measured on price history (see risk_analytics), NaN until an asset has enough of it.
+# Records without them are accepted, and they are not part of the record fields a row view lists
+RISK_COLUMNS = ("realized_volatility", "max_drawdown", "beta")
+FIELDS = ("symbol",) + FLOAT_COLUMNS + INT_COLUMNS[:2] + CATEGORY_COLUMNS + INT_COLUMNS[2:]
+
+
+def _extend(column: array, values):
+    """Append a whole column, as one buffer copy when values exposes a matching buffer"""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == column.typecode and view.c_contiguous:
+        column.frombytes(view.cast("B"))
+    else:
+        column.extend(values)
+
+
+def _intern_str(field: str, value) -> str:
+    if not isinstance(value, str):
+        raise TypeError(f"Expected a string for {field}, got {type(value).__name__}")
+    return sys.intern(value)
+
+
+def _finite_float(field: str, value, unmeasured: bool = False) -> float:
+    """Float checked to be finite, NaN being allowed for unmeasured risk columns"""
+    value = float(value)
+    if not math.isfinite(value) and not (unmeasured and value != value):
+        raise ValueError(f"{field} must be a finite number: {value}")
+    return value
+
+
+def _small_int(field: str, value) -> int:
+    """Integer score checked against the range of its int16 column"""
+    value = operator.index(value)
+    if not -0x8000 <= value <= 0x7FFF:
+        raise OverflowError(f"{field} out of range: {value}")
+    return value
+
+
+class AssetRow(Mapping):
+    """Read-only dict-like view of one asset row"""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "AssetTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, field: str):
+        return self._table.get_field(self._row, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"AssetRow({self._table.name_of(self._row)!r}, {dict(self)!r})"
+
+
+class AssetTable(Mapping):
+    """Columnar asset store: typed array columns with name and symbol indexes
+
+    Behaves as a read-only mapping of asset name -> AssetRow so code written
+    against the old nested crypto_data dict keeps working.
+    """
+
+    def __init__(self):
+        self._names: List[str] = []
+        self._symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._symbol_index: Dict[str, int] = {}
+        self._floats = {field: array("d") for field in FLOAT_COLUMNS + RISK_COLUMNS}
+        self._ints = {field: array("h") for field in INT_COLUMNS}
+        self._codes = {field: array("B") for field in CATEGORY_COLUMNS}
+        # Per-row data version, bumped on every update so derived results can be invalidated
+        self._versions = array("Q")
+        self._listeners: List[Callable[[int], None]] = []
+        # Interned category values per categorical column, code -> value and value -> code
+        self._categories: Dict[str, List[str]] = {field: [] for field in CATEGORY_COLUMNS}
+        self._category_codes: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORY_COLUMNS}
+
+    @classmethod
+    def from_records(cls, records: Mapping) -> "AssetTable":
+        """Build a table from a name -> fields mapping like the old crypto_data dict"""
+        table = cls()
+        for name, record in records.items():
+            table.add(name, record)
+        return table
+
+    @classmethod
+    def from_columns(cls, names: Sequence[str], symbols: Sequence[str], columns: Mapping,
+                     categories: Mapping[str, Sequence[str]], versions=None) -> "AssetTable":
+        """Build a table from whole columns, such as the ones stored in a snapshot
+
+        Numeric columns (and the category codes indexing categories[field])
+        are copied into the table's own arrays with one buffer copy each, so
+        no per-row work is done apart from the name and symbol indexes.
+        """
+        table = cls()
+        rows = len(names)
+        for field, value in categories.items():
+            for code_value in value:
+                table._encode(field, code_value)
+        for storage in (table._floats, table._ints, table._codes):
+            for field, column in storage.items():
+                if field in RISK_COLUMNS and field not in columns:
+                    column.extend([math.nan] * rows)
+                    continue
+                _extend(column, columns[field])
+                if len(column) != rows:
+                    raise ValueError(f"Column {field} has {len(column)} rows, expected {rows}")
+        for field, codes in table._codes.items():
+            if rows and max(codes) >= len(table._categories[field]):
+                raise ValueError(f"Column {field} has codes without a category value")
+        if versions is not None:
+            _extend(table._versions, versions)
+            if len(table._versions) != rows:
+                raise ValueError(f"Expected {rows} row versions, got {len(table._versions)}")
+        else:
+            table._versions = array("Q", bytes(8 * rows))
+        if len(symbols) != rows:
+            raise ValueError(f"Expected {rows} symbols, got {len(symbols)}")
+        table._names = list(names)
+        table._symbols = list(symbols)
+        table._index = dict(zip(table._names, range(rows)))
+        if len(table._index) != rows:
+            raise ValueError("Duplicate asset names")
+        table._symbol_index = dict(zip(map(str.upper, table._symbols), range(rows)))
+        return table
+
+    def _encode(self, field: str, value: str) -> int:
+        codes = self._category_codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = len(self._categories[field])
+            if code > 255:
+                raise ValueError(f"Too many distinct values for {field}")
+            value = sys.intern(value)
+            self._categories[field].append(value)
+            codes[value] = code
+        return code
+
+    def add(self, name: str, record: Mapping) -> int:
+        """Append a new asset and return its row number"""
+        if name in self._index:
+            raise KeyError(f"Asset already exists: {name}")
+        # Convert every field before touching the columns so a bad record cannot leave them ragged
+        name = _intern_str("asset name", name)
+        symbol = _intern_str("symbol", record["symbol"])
+        self._check_symbol(symbol, None)
+        floats = [self._convert(field, record[field]) for field in FLOAT_COLUMNS]
+        floats += [self._convert(field, record.get(field, math.nan)) for field in RISK_COLUMNS]
+        ints = [_small_int(field, record[field]) for field in INT_COLUMNS]
+        codes = [self._encode(field, record[field]) for field in CATEGORY_COLUMNS]
+
+        row = len(self._names)
+        for column, value in zip(self._floats.values(), floats):
+            column.append(value)
+        for column, value in zip(self._ints.values(), ints):
+            column.append(value)
+        for column, value in zip(self._codes.values(), codes):
+            column.append(value)
+        self._versions.append(0)
+        self._names.append(name)
+        self._symbols.append(symbol)
+        self._index[name] = row
+        self._symbol_index[sys.intern(symbol.upper())] = row
+        self._notify(row)
+        return row
+
+    def update(self, name: str, fields: Mapping) -> int:
+        """Overwrite some fields of an existing asset in place and return its row number
+
+        Every value is converted before any is written, so an unknown field
+        or a bad value leaves the row (and its version) untouched.
+        """
+        row = self._index[name]
+        values = [(field, self._convert(field, value)) for field, value in fields.items()]
+        if "symbol" in fields:
+            self._check_symbol(dict(values)["symbol"], row)
+        for field, value in values:
+            if field in self._floats:
+                self._floats[field][row] = value
+            elif field in self._ints:
+                self._ints[field][row] = value
+            elif field in self._codes:
+                self._codes[field][row] = value
+            else:
+                del self._symbol_index[self._symbols[row].upper()]
+                self._symbols[row] = value
+                self._symbol_index[sys.intern(value.upper())] = row
+        self._versions[row] += 1
+        self._notify(row)
+        return row
+
+    def validate(self, fields: Mapping, name: Optional[str] = None):
+        """Raise what update() of asset name would for these fields, without writing anything"""
+        for field, value in fields.items():
+            value = self._convert(field, value)
+            if field == "symbol":
+                self._check_symbol(value, self._index.get(name))
+
+    def _check_symbol(self, symbol: str, row: Optional[int]):
+        """Raise if another row than row already uses the symbol, which lookups must resolve to one asset"""
+        owner = self._symbol_index.get(symbol.upper(), row)
+        if owner != row:
+            raise ValueError(f"Symbol {symbol} is already used by {self._names[owner]}")
+
+    def _convert(self, field: str, value):
+        """A field value in the form its column stores it"""
+        if field in self._floats:
+            return _finite_float(field, value, unmeasured=field in RISK_COLUMNS)
+        if field in self._ints:
+            return _small_int(field, value)
+        if field in self._codes:
+            return self._encode(field, value)
+        if field == "symbol":
+            return _intern_str(field, value)
+        raise KeyError(f"Unknown asset field: {field}")
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """Call listener(row) after every add or update, for indexes derived from the table"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int], None]):
+        self._listeners.remove(listener)
+
+    def _notify(self, row: int):
+        for listener in self._listeners:
+            listener(row)
+
+    def row_of(self, key: str) -> Optional[int]:
+        """Row number for an asset name or (case-insensitive) symbol, None if unknown"""
+        row = self._index.get(key)
+        if row is None:
+            row = self._index.get(key.lower())
+        if row is None:
+            row = self._symbol_index.get(key.upper())
+        return row
+
+    def name_of(self, row: int) -> str:
+        return self._names[row]
+
+    def version_of(self, row: int) -> int:
+        """Data version of a row, changes whenever any of its fields is updated"""
+        return self._versions[row]
+
+    def versions(self) -> array:
+        """Data version of every row, indexed by row number (read-only by convention)"""
+        return self._versions
+
+    def get_field(self, row: int, field: str):
+        """Single cell access without building a row view"""
+        if field in self._floats:
+            return self._floats[field][row]
+        if field in self._ints:
+            return self._ints[field][row]
+        if field in self._codes:
+            return self._categories[field][self._codes[field][row]]
+        if field == "symbol":
+            return self._symbols[row]
+        raise KeyError(field)
+
+    def column(self, field: str):
+        """Raw column storage for a field (array for numerics, code array for categories)"""
+        if field in self._floats:
+            return self._floats[field]
+        if field in self._ints:
+            return self._ints[field]
+        if field in self._codes:
+            return self._codes[field]
+        if field == "symbol":
+            return self._symbols
+        raise KeyError(field)
+
+    def categories(self, field: str) -> List[str]:
+        """Code -> value list of a categorical column"""
+        return self._categories[field]
+
+    def columns(self) -> Dict:
+        """Zero-copy column dict in the shape batch_scoring expects"""
+        columns = {"names": self._names}
+        columns.update(self._floats)
+        columns.update(self._ints)
+        return columns
+
+    def __getitem__(self, name: str) -> AssetRow:
+        return AssetRow(self, self._index[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"AssetTable({len(self)} assets)"
@@ -0,0 +1,276 @@
+import itertools
+import math
+import statistics
+from array import array
+from itertools import compress, repeat
+from operator import mul, sub, truediv
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import rules
+from asset_table import AssetTable
+from batch_scoring import final_recommendations, score_universe, weighted_scores
+from price_history import DAY, PriceHistory
+from profiles import PROFILES
+from scoring import InvestorProfile
+from topk_index import BUCKETS, bucket_of
+
+YEAR = 365.25 * DAY
+
+# Target weight range of each position-sizing band in generate_investment_advice, indexed
+# like the final_recommendation verdict tiers. "Avoid or minimal exposure (<2%)" is simulated as no position,
+# and only high-risk profiles get the 15-25% band; everyone else stops at 5-15%.
+ALLOCATION_BANDS = ((0.0, 0.0), (0.02, 0.05), (0.05, 0.15), (0.15, 0.25))
+
+# Static sustainability inputs carried over from the asset table into every snapshot
+STATIC_COLUMNS = ("environmental_score", "project_viability", "technology_score", "adoption_score")
+
+
+class Snapshot(NamedTuple):
+    """Market state at one rebalance time, columns aligned with the backtest universe
+
+    prices holds NaN for assets that cannot be traded at that time (not listed
+    yet, delisted, or without 30 days of history to score).
+    """
+
+    timestamp: int
+    columns: Dict
+    prices: array
+
+
+def all_profiles() -> List[InvestorProfile]:
+    """Every combination of the four profile answers (81 profiles)"""
+    return list(PROFILES)
+
+
+def history_snapshots(history: PriceHistory, table: AssetTable, start: Optional[int] = None,
+                      end: Optional[int] = None, every: int = DAY) -> Tuple[List[str], Iterator[Snapshot]]:
+    """Universe names plus a lazy stream of snapshots rebuilt from stored OHLCV bars
+
+    Trend changes come from the bars exactly as PriceHistory.apply_to computes
+    them. Bar volume is taken in units of the asset, so volume_24h is the
+    traded value of the trailing day, and market cap assumes today's
+    circulating supply (table market_cap / current_price).
+    """
+    names = [name for name in history.assets() if name in table]
+    if not names:
+        raise ValueError("No asset in the price history is part of the asset table")
+    series = [history.series(name) for name in names]
+    rows = [table[name] for name in names]
+    static = {field: array("d", [row[field] for row in rows]) for field in STATIC_COLUMNS}
+    supply = [row["market_cap"] / row["current_price"] if row["current_price"] else 0.0 for row in rows]
+
+    listed = [s for s in series if len(s)]
+    if start is None:
+        start = min(s.timestamps[0] for s in listed) + 30 * DAY
+    if end is None:
+        end = max(s.timestamps[-1] for s in listed)
+
+    def snapshots() -> Iterator[Snapshot]:
+        nan = math.nan
+        for ts in range(start, end + 1, every):
+            prices = array("d")
+            changes = {field: array("d") for field in ("price_change_24h", "price_change_7d", "price_change_30d")}
+            market_cap = array("d")
+            volume = array("d")
+            for bars, units in zip(series, supply):
+                i = bars.index_at(ts)
+                trend = bars.trend_changes(ts) if i >= 0 and ts - bars.timestamps[i] < every else {}
+                if len(trend) == len(changes):
+                    close = bars.closes[i]
+                    day = bars.index_at(bars.timestamps[i] - DAY) + 1
+                    prices.append(close)
+                    market_cap.append(units * close)
+                    volume.append(math.fsum(map(mul, bars.volumes[day:i + 1], bars.closes[day:i + 1])))
+                else:
+                    prices.append(nan)
+                    market_cap.append(1.0)
+                    volume.append(0.0)
+                    trend = dict.fromkeys(changes, 0.0)
+                for field, column in changes.items():
+                    column.append(trend[field])
+            columns = {"names": names, "market_cap": market_cap, "volume_24h": volume}
+            columns.update(changes)
+            columns.update(static)
+            yield Snapshot(ts, columns, prices)
+
+    return names, snapshots()
+
+
+class _SnapshotColumns:
+    """Hands a snapshot's columns to score_universe as-is"""
+
+    def __init__(self, columns: Dict):
+        self._columns = columns
+
+    def columns(self) -> Dict:
+        return self._columns
+
+
+class _Strategy:
+    """Simulated portfolio of one (risk tolerance, profit focus) bucket"""
+
+    def __init__(self, risk_tolerance: str, profit_focused: bool, size: int):
+        self.risk_tolerance = risk_tolerance
+        self.sustainability_preference = "low" if profit_focused else "medium"
+        self.weights = array("d", bytes(8 * size))
+        self.cash = 1.0
+        self.equity = array("d", [1.0])
+        self.returns = array("d")
+        self.turnover = array("d")
+        self.tier_keys: Optional[array] = None
+        self.verdicts = rules.current().final_recommendation["recommendation"]
+        self.tier_sums = [0.0] * len(self.verdicts)
+        self.tier_counts = [0] * len(self.verdicts)
+
+    def mark_to_market(self, growth: array, forward: array):
+        """Let positions drift with one period of price moves"""
+        values = array("d", map(mul, self.weights, growth))
+        total = math.fsum(values) + self.cash
+        self.weights = array("d", map(truediv, values, repeat(total)))
+        self.cash /= total
+        self.returns.append(total - 1)
+        self.equity.append(self.equity[-1] * total)
+        if self.tier_keys is not None:
+            # Tier keys are 1 + verdict code for assets that were tradable, 0 otherwise
+            for code in range(len(self.verdicts)):
+                observed = list(compress(forward, map((code + 1).__eq__, self.tier_keys)))
+                self.tier_sums[code] += math.fsum(observed)
+                self.tier_counts[code] += len(observed)
+
+    def rebalance(self, scores: Dict, tradable: array, band_weights: Sequence[float], cost: float):
+        tiers = final_recommendations(weighted_scores(scores, self.risk_tolerance, self.sustainability_preference))
+        self.tier_keys = array("B", map(mul, map((1).__add__, tiers), tradable))
+        bands = tiers if self.risk_tolerance == "high" else map(min, tiers, repeat(2))
+        targets = array("d", map(mul, map(band_weights.__getitem__, bands), tradable))
+        invested = math.fsum(targets)
+        if invested > 1:
+            # Bands add up to more than the whole portfolio, scale every position down alike
+            targets = array("d", map(truediv, targets, repeat(invested)))
+            invested = 1.0
+        traded = math.fsum(map(abs, map(sub, targets, self.weights)))
+        self.turnover.append(traded)
+        self.weights = targets
+        self.cash = 1.0 - invested
+        if cost and traded:
+            self.equity[-1] *= 1 - traded * cost
+
+    def report(self, start: int, end: int) -> Dict:
+        final = self.equity[-1]
+        years = (end - start) / YEAR
+        peaks = itertools.accumulate(self.equity, max)
+        drawdown = 1 - min(map(truediv, self.equity, peaks))
+        periods_per_year = len(self.returns) / years if years > 0 else 0
+        return {
+            "total_return": final - 1,
+            "annualized_return": final ** (1 / years) - 1 if years > 0 and final > 0 else None,
+            "annualized_volatility": (statistics.stdev(self.returns) * math.sqrt(periods_per_year)
+                                      if len(self.returns) > 1 else None),
+            "max_drawdown": drawdown,
+            "average_turnover": statistics.fmean(self.turnover) if self.turnover else 0.0,
+            "total_turnover": math.fsum(self.turnover),
+            "tiers": {
+                self.verdicts[code]: {
+                    "mean_forward_return": self.tier_sums[code] / count if count else None,
+                    "observations": count,
+                }
+                for code, count in enumerate(self.tier_counts)
+            },
+        }
+
+
+class Backtester:
+    """Replay snapshots through the batch scorer and rebalance simulated portfolios
+
+    Every snapshot is scored once for the whole universe; the 81 investor
+    profiles only differ in risk tolerance and profit focus as far as the
+    verdict tiers and allocation bands go, so six portfolios are simulated
+    and each profile reports the one it maps to. All per-asset arithmetic
+    runs over array columns.
+    """
+
+    def __init__(self, profiles: Optional[Iterable[InvestorProfile]] = None, cost_bps: float = 0.0,
+                 band_position: float = 0.5):
+        if not 0 <= band_position <= 1:
+            raise ValueError("band_position must be between 0 (band floor) and 1 (band ceiling)")
+        self.profiles = list(profiles) if profiles is not None else all_profiles()
+        self.cost = cost_bps / 10_000
+        self.band_weights = tuple(low + (high - low) * band_position for low, high in ALLOCATION_BANDS)
+
+    def run(self, snapshots: Iterable[Snapshot]) -> Dict:
+        """Returns, drawdown, turnover and per-tier forward returns per profile"""
+        buckets = sorted({bucket_of(profile) for profile in self.profiles}, key=BUCKETS.index)
+        strategies: Dict[Tuple[str, bool], _Strategy] = {}
+        previous: Optional[array] = None
+        start = end = None
+        for snapshot in snapshots:
+            prices = snapshot.prices
+            if not strategies:
+                strategies = {bucket: _Strategy(*bucket, len(prices)) for bucket in buckets}
+                start = snapshot.timestamp
+            if previous is not None:
+                # NaN on either side (untradable) counts as no move
+                growth = array("d", (p / q if p == p and q == q and q else 1.0 for p, q in zip(prices, previous)))
+                forward = array("d", map((1.0).__rsub__, growth))
+                for strategy in strategies.values():
+                    strategy.mark_to_market(growth, forward)
+            tradable = array("B", (price == price for price in prices))
+            scores = score_universe(_SnapshotColumns(snapshot.columns))
+            for strategy in strategies.values():
+                strategy.rebalance(scores, tradable, self.band_weights, self.cost)
+            previous = prices
+            end = snapshot.timestamp
+        if not strategies:
+            raise ValueError("No snapshots to backtest")
+
+        reports = {bucket: strategy.report(start, end) for bucket, strategy in strategies.items()}
+        return {
+            "start": start,
+            "end": end,
+            "rebalances": len(next(iter(strategies.values())).turnover),
+            "strategies": {f"{risk}-risk{', profit-focused' if focused else ''}": reports[risk, focused]
+                           for risk, focused in buckets},
+            "profiles": {profile: reports[bucket_of(profile)] for profile in self.profiles},
+        }
+
+
+def main():
+    """Backtest the recommendation strategy over a price history directory"""
+    import argparse
+    import json
+
+    from WEEK1 import CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="Backtest CryptoWise AI verdicts and allocation bands")
+    parser.add_argument("history", metavar="DIR", help="OHLCV price history directory")
+    parser.add_argument("--start", type=int, help="first rebalance (epoch seconds)")
+    parser.add_argument("--end", type=int, help="last rebalance (epoch seconds)")
+    parser.add_argument("--every", type=float, default=1.0, help="days between rebalances (default 1)")
+    parser.add_argument("--cost-bps", type=float, default=10.0, help="trading cost per unit of turnover")
+    parser.add_argument("--band-position", type=float, default=0.5,
+                        help="where in each allocation band to size positions, 0 floor to 1 ceiling")
+    parser.add_argument("--output", "-o", metavar="PATH", help="write per-profile results as JSON")
+    args = parser.parse_args()
+
+    table = CryptoInvestmentBot().crypto_data
+    _names, snapshots = history_snapshots(PriceHistory(args.history), table, args.start, args.end,
+                                          int(args.every * DAY))
+    result = Backtester(cost_bps=args.cost_bps, band_position=args.band_position).run(snapshots)
+
+    print(f"📈 {result['rebalances']} rebalances, {len(result['profiles'])} profiles")
+    print(f"{'Strategy':<30} {'Return':>9} {'CAGR':>9} {'Vol':>8} {'Max DD':>8} {'Turnover':>9}")
+    for label, report in result["strategies"].items():
+        cagr = report["annualized_return"]
+        vol = report["annualized_volatility"]
+        print(f"{label:<30} {report['total_return']:>+9.1%} "
+              f"{cagr if cagr is not None else math.nan:>+9.1%} {vol if vol is not None else math.nan:>8.1%} "
+              f"{-report['max_drawdown']:>8.1%} {report['average_turnover']:>9.1%}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({**result, "profiles": [{**profile.to_dict(), **report}
+                                              for profile, report in result["profiles"].items()]},
+                      output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
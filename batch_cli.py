@@ -0,0 +1,223 @@
+import csv
+import io
+import json
+import os
+import sys
+from typing import IO, TYPE_CHECKING, Dict, Iterator, Optional, Sequence, Tuple
+
+# The batch subcommand is registered on every start of the chatbot, so the
+# scoring modules (and reports) are only imported once a batch actually runs
+if TYPE_CHECKING:
+    from reports import ReportWriter
+    from scoring import InvestorProfile
+
+INPUT_FORMATS = ("jsonl", "csv")
+OUTPUT_FORMATS = ("jsonl", "csv")
+SUFFIX_FORMATS = {".jsonl": "jsonl", ".json": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+# Optional input column identifying the user a profile belongs to (the line number otherwise)
+ID_FIELDS = ("id", "user_id")
+# CSV columns after the id and the profile answers
+RESULT_COLUMNS = ("kind", "rank", "crypto", "symbol", "weighted_score", "final_recommendation",
+                  "investment_advice", "error")
+
+
+class BatchInputError(ValueError):
+    """A profile line that cannot be read, reported in the output instead of stopping the run"""
+
+
+def format_for_path(path: str, default: str = "jsonl") -> str:
+    """Batch file format implied by a suffix, default for stdin or an unknown suffix"""
+    return SUFFIX_FORMATS.get(os.path.splitext(path)[1].lower(), default) if path != "-" else default
+
+
+def read_profiles(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object, Optional[Dict]]]:
+    """(line number, id, profile fields or None if unreadable) per input record, read lazily"""
+    from reports import PROFILE_FIELDS
+
+    if fmt == "csv":
+        rows: Iterator = csv.DictReader(stream)
+        first_line = 2  # After the header
+    else:
+        rows = (line for line in stream)
+        first_line = 1
+    for line, row in enumerate(rows, first_line):
+        if fmt != "csv":
+            if not row.strip():
+                continue
+            try:
+                row = json.loads(row)
+            except ValueError:
+                yield line, line, None
+                continue
+            if not isinstance(row, dict):
+                yield line, line, None
+                continue
+        user_id = next((row[field] for field in ID_FIELDS if row.get(field) not in (None, "")), line)
+        # Empty CSV cells mean unanswered, like missing JSON keys
+        yield line, user_id, {field: row.get(field) or None for field in PROFILE_FIELDS}
+
+
+class BatchRunner:
+    """Top recommendations and per-asset analyses for a stream of profiles
+
+    There are only 81 distinct profiles, so each one is computed and
+    serialized once; every later input line with the same answers costs a
+    dict lookup and one buffered write. Input is read and output written as
+    a stream, so memory stays flat however many profiles are processed.
+    """
+
+    def __init__(self, service, top: int = 3, cryptos: Sequence[str] = (), fmt: str = "jsonl"):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output format: {fmt!r} (expected one of {', '.join(OUTPUT_FORMATS)})")
+        if top < 0:
+            raise ValueError(f"The number of top recommendations cannot be negative: {top}")
+        self.service = service
+        self.top = top
+        self.cryptos = [service.resolve(crypto) for crypto in cryptos]
+        self.format = fmt
+        self._rendered: Dict[int, object] = {}
+        self.stats = {"profiles": 0, "rejected": 0, "distinct": 0}
+
+    def _compute(self, profile: "InvestorProfile") -> Dict:
+        result = {"profile": profile.to_dict()}
+        if self.top:
+            result["recommendations"] = self.service.top_recommendations(profile, self.top)
+        if self.cryptos:
+            result["analyses"] = [self.service.analyze(profile, crypto) for crypto in self.cryptos]
+        return result
+
+    def _render(self, profile: "InvestorProfile"):
+        """Output of a profile without its id: a JSON object tail, or CSV rows missing the id column"""
+        from profiles import encode
+        from reports import PROFILE_FIELDS
+
+        code = encode(profile)
+        rendered = self._rendered.get(code)
+        if rendered is None:
+            result = self._compute(profile)
+            if self.format == "jsonl":
+                rendered = json.dumps(result)[1:]
+            else:
+                answers = [result["profile"][field] for field in PROFILE_FIELDS]
+                rendered = [answers + ["top", rank, rec["crypto"], rec["symbol"], rec["weighted_score"],
+                                       rec["final_recommendation"], rec["investment_advice"], ""]
+                            for rank, rec in enumerate(result.get("recommendations", ()), 1)]
+                rendered += [answers + ["analysis", "", rec["crypto"], rec["symbol"], rec["weighted_score"],
+                                        rec["final_recommendation"], rec["investment_advice"], ""]
+                             for rec in result.get("analyses", ())]
+            self._rendered[code] = rendered
+            self.stats["distinct"] += 1
+        return rendered
+
+    def run(self, records: Iterator[Tuple[int, object, Optional[Dict]]], writer: "ReportWriter") -> Dict:
+        """Write the results of every record to writer, return the run statistics"""
+        from reports import PROFILE_FIELDS
+        from scoring import InvestorProfile
+
+        stats = self.stats
+        if self.format == "csv":
+            rows = csv.writer(writer)
+            rows.writerow(("id",) + PROFILE_FIELDS + RESULT_COLUMNS)
+        for line, user_id, fields in records:
+            try:
+                if fields is None:
+                    raise BatchInputError(f"line {line}: not a JSON object")
+                try:
+                    profile = InvestorProfile.from_dict(fields)
+                except ValueError as error:
+                    raise BatchInputError(f"line {line}: {error}") from None
+            except BatchInputError as error:
+                stats["rejected"] += 1
+                if self.format == "jsonl":
+                    writer.write(f'{{"id": {json.dumps(user_id)}, "error": {json.dumps(str(error))}}}\n')
+                else:
+                    rows.writerow([user_id] + [""] * (len(PROFILE_FIELDS) + len(RESULT_COLUMNS) - 1) + [str(error)])
+                continue
+            rendered = self._render(profile)
+            if self.format == "jsonl":
+                writer.write(f'{{"id": {json.dumps(user_id)}, {rendered}\n')
+            else:
+                rows.writerows([[user_id] + row for row in rendered])
+            stats["profiles"] += 1
+        return stats
+
+
+def run_batch(service, source: str = "-", output: str = "-", input_format: Optional[str] = None,
+              output_format: Optional[str] = None, top: int = 3, cryptos: Sequence[str] = ()) -> Dict:
+    """Stream profiles from a file (or "-" for stdin) to results in a file (or "-" for stdout)"""
+    from reports import ReportWriter
+
+    input_format = input_format or format_for_path(source)
+    output_format = output_format or format_for_path(output)
+    runner = BatchRunner(service, top, cryptos, output_format)
+    if source == "-":
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="" if input_format == "csv" else None)
+    else:
+        stream = open(source, encoding="utf-8", newline="" if input_format == "csv" else None)
+    target = sys.stdout if output == "-" else output
+    try:
+        with ReportWriter(target, "csv" if output_format == "csv" else "json") as writer:
+            return runner.run(read_profiles(stream, input_format), writer)
+    finally:
+        if source != "-":
+            stream.close()
+
+
+def _top_count(text: str) -> int:
+    """--top value, an integer that is 0 or more"""
+    from argparse import ArgumentTypeError
+
+    try:
+        top = int(text)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if top < 0:
+        raise ArgumentTypeError(f"must be 0 or more, got {top}")
+    return top
+
+
+def add_arguments(parser):
+    """Options of the batch subcommand"""
+    parser.add_argument("input", nargs="?", default="-", metavar="PATH",
+                        help="profiles as JSON lines or CSV with the four profile fields and an optional id "
+                             "(default: stdin)")
+    parser.add_argument("-o", "--output", default="-", metavar="PATH", help="results file (default: stdout)")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, help="default: from the suffix, else jsonl")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="default: from the suffix, else jsonl")
+    parser.add_argument("--top", type=_top_count, default=3, help="top recommendations per profile (0 for none)")
+    parser.add_argument("--crypto", action="append", default=[], metavar="NAME",
+                        help="also include the analysis of this asset (repeatable)")
+
+
+def main(service=None, args=None) -> int:
+    """Run the batch subcommand, report throughput on stderr and return the exit status"""
+    import time
+
+    if args is None:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Recommendations for many investor profiles from a file")
+        add_arguments(parser)
+        args = parser.parse_args()
+    if service is None:
+        from WEEK1 import CryptoInvestmentBot
+        service = CryptoInvestmentBot().service
+
+    started = time.perf_counter()
+    try:
+        stats = run_batch(service, args.input, args.output, args.input_format, args.format, args.top, args.crypto)
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+    except KeyError as error:
+        print(f"❌ {error.args[0]}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    rate = stats["profiles"] / elapsed if elapsed else 0
+    print(f"✅ {stats['profiles']:,} profiles ({stats['distinct']} distinct, {stats['rejected']:,} rejected) "
+          f"in {elapsed:.2f} s, {rate:,.0f} profiles/s", file=sys.stderr)
+    return 1 if stats["rejected"] and not stats["profiles"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+import math
+from array import array
+from bisect import bisect_right
+from functools import partial
+from heapq import nlargest
+from itertools import repeat
+from operator import add, mul, truediv
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import rules
+from asset_table import RISK_COLUMNS
+from result_cache import bounded_table
+
+
+# Columns computed from several stored columns, mirroring rules.DERIVED_FIELDS
+DERIVED_COLUMNS = {
+    "volume_ratio": lambda columns: _volume_ratios(columns["volume_24h"], columns["market_cap"]),
+    "tech_adoption_avg": lambda columns: map(truediv, map(add, columns["technology_score"],
+                                                          columns["adoption_score"]), repeat(2)),
+    "volatility": lambda columns: _measured(columns, "realized_volatility", map(abs, columns["price_change_7d"])),
+    "drawdown": lambda columns: _measured(columns, "max_drawdown", repeat(0.0, len(columns["names"]))),
+    "market_beta": lambda columns: _measured(columns, "beta", repeat(1.0, len(columns["names"]))),
+}
+
+# Decoded message tuples and analysis dicts, shared by every row that produces them
+_shared = bounded_table(65_536)
+
+
+def columns_from_assets(assets: Mapping[str, Mapping], fields: Optional[Sequence[str]] = None) -> Dict:
+    """Transpose a name -> fields mapping into typed columns"""
+    if hasattr(assets, "columns"):
+        # AssetTable is already columnar, share its arrays as-is
+        return assets.columns()
+
+    rows = list(assets.values())
+    columns = {"names": list(assets.keys())}
+    for field in fields if fields is not None else rules.current().input_fields:
+        if field in RISK_COLUMNS:
+            columns[field] = array("d", [row.get(field, math.nan) for row in rows])
+        else:
+            columns[field] = array("d", [row[field] for row in rows])
+    return columns
+
+
+def _buckets(ladder: rules.Ladder, values) -> array:
+    """Ladder bucket of every value, with NaN in the fallback bucket as in Ladder.bucket"""
+    if not isinstance(values, array):
+        values = array("d", values)
+    buckets = array("B", map(partial(bisect_right, ladder.breaks), values))
+    # A NaN anywhere makes the sum NaN, so clean columns (and integer ones) skip the per-value pass
+    if values.typecode == "d":
+        total = sum(values)
+        if total != total:
+            for i in [i for i, value in enumerate(values) if value != value]:
+                buckets[i] = ladder.fallback
+    return buckets
+
+
+def _lookup(table, buckets):
+    return map(table.__getitem__, buckets)
+
+
+def _sum(*iterables):
+    total = iterables[0]
+    for other in iterables[1:]:
+        total = map(add, total, other)
+    return total
+
+
+def _bitor(*iterables):
+    total = iterables[0]
+    for other in iterables[1:]:
+        total = map(int.__or__, total, other)
+    return total
+
+
+def _volume_ratios(volume: array, market_cap: array):
+    # Written as m > 0 so that a NaN market cap (for which min() would not tell) also gives 0
+    if not all(map((0.0).__lt__, market_cap)):
+        return [v / m if m > 0 else 0 for v, m in zip(volume, market_cap)]
+    return map(truediv, volume, market_cap)
+
+
+def _measured(columns: Dict, field: str, estimates):
+    """Risk column with its NaN (unmeasured) cells filled from estimates, as rules._measured"""
+    measured = columns.get(field)
+    if measured is None:
+        return estimates
+    return map(_first_measured, measured, estimates)
+
+
+def _first_measured(value: float, estimate: float) -> float:
+    return estimate if value != value else value
+
+
+def _column(columns: Dict, field: str):
+    derived = DERIVED_COLUMNS.get(field)
+    return derived(columns) if derived is not None else columns[field]
+
+
+def _mask_typecode(messages: Sequence[str]) -> str:
+    return "H" if len(messages) <= 16 else "L" if len(messages) <= 32 else "Q"
+
+
+def _score_ladders(columns: Dict, ladders: Sequence[rules.Ladder], bits):
+    """Score, message bitmask and per-ladder bucket columns for one analysis"""
+    buckets = [_buckets(ladder, _column(columns, ladder.field)) for ladder in ladders]
+    score = array("h", _sum(*(_lookup(ladder["points"], b) for ladder, b in zip(ladders, buckets))))
+    masks = _bitor(*(_lookup(ladder_bits, b) for ladder_bits, b in zip(bits, buckets)))
+    return score, masks, {ladder.field: b for ladder, b in zip(ladders, buckets)}
+
+
+def risk_columns(columns: Dict, ruleset: rules.Ruleset) -> Dict:
+    """Inputs of the profile-dependent risk adjustment, kept alongside scores for weighted_scores"""
+    fields = {ladder.field for ladders in ruleset.risk_adjustment.values() for ladder in ladders}
+    return {field: array("d", _column(columns, field)) if field in DERIVED_COLUMNS else columns[field]
+            for field in sorted(fields)}
+
+
+def select_columns(columns: Dict, rows: Sequence[int], fields: Sequence[str]) -> Dict:
+    """Copy of the given rows of some columns (plus names), in the given row order"""
+    selected = {"names": [columns["names"][row] for row in rows]}
+    for field in fields:
+        column = columns[field]
+        selected[field] = array(column.typecode, map(column.__getitem__, rows))
+    return selected
+
+
+def score_universe(assets: Mapping[str, Mapping], ruleset: Optional[rules.Ruleset] = None) -> Dict:
+    """Score every asset in one columnar pass, matching the per-asset analysis methods"""
+    ruleset = ruleset or rules.current()
+    return score_columns(columns_from_assets(assets, ruleset.input_fields), ruleset)
+
+
+def score_columns(columns: Dict, ruleset: Optional[rules.Ruleset] = None) -> Dict:
+    """score_universe over columns that are already transposed, such as a select_columns subset"""
+    ruleset = ruleset or rules.current()
+    profit_score, profit_masks, profit_buckets = _score_ladders(
+        columns, ruleset.profitability, ruleset.profitability_bits)
+    profit_signals = array(_mask_typecode(ruleset.profitability_signals), profit_masks)
+    profit_rating = _buckets(ruleset.profitability_rating, profit_score)
+
+    sustain_score, sustain_masks, sustain_buckets = _score_ladders(
+        columns, ruleset.sustainability, ruleset.sustainability_bits)
+    sustain_factors = array(_mask_typecode(ruleset.sustainability_factors), sustain_masks)
+    sustain_rating = _buckets(ruleset.sustainability_rating, sustain_score)
+
+    return {
+        "rules": ruleset,
+        "names": columns["names"],
+        "risk_columns": risk_columns(columns, ruleset),
+        "buckets": {"profitability": profit_buckets, "sustainability": sustain_buckets},
+        "profitability_score": profit_score,
+        "profitability_rating": profit_rating,
+        "profitability_signals": profit_signals,
+        "sustainability_score": sustain_score,
+        "sustainability_rating": sustain_rating,
+        "sustainability_factors": sustain_factors,
+    }
+
+
+def decode_bits(mask: int, messages: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Expand a signal/factor bitmask back into its ordered message tuple (built once per mask)"""
+    return _shared((mask, messages), lambda: tuple(message for bit, message in enumerate(messages)
+                                                   if mask >> bit & 1))
+
+
+def analysis_result(rating: rules.Ladder, score: int, key: str, messages: Tuple[str, ...]) -> Dict:
+    """The analysis dict for a score and its messages under a rating ladder
+
+    Analyses only take a few dozen distinct values however large the
+    universe is, so equal ones are built once and the same read-only dict is
+    returned to every asset (and every caller) that produces it.
+    """
+    def build():
+        bucket = rating.bucket(score)
+        return {
+            "score": score,
+            "rating": rating["rating"][bucket],
+            key: messages,
+            "recommendation": rating["recommendation"][bucket],
+        }
+    return _shared((rating, score, key, messages), build)
+
+
+def profitability_result(scores: Dict, i: int) -> Dict:
+    """Rebuild the analyze_profitability dict for row i"""
+    ruleset = scores["rules"]
+    return analysis_result(ruleset.profitability_rating, scores["profitability_score"][i], "signals",
+                           decode_bits(scores["profitability_signals"][i], ruleset.profitability_signals))
+
+
+def sustainability_result(scores: Dict, i: int) -> Dict:
+    """Rebuild the analyze_sustainability dict for row i"""
+    ruleset = scores["rules"]
+    return analysis_result(ruleset.sustainability_rating, scores["sustainability_score"][i], "factors",
+                           decode_bits(scores["sustainability_factors"][i], ruleset.sustainability_factors))
+
+
+def weighted_scores(scores: Dict, risk_tolerance: Optional[str] = "medium",
+                    sustainability_preference: Optional[str] = None) -> array:
+    """Unrounded weighted scores for one profile, same arithmetic as get_personalized_recommendation"""
+    profit_weight = 0.7 if sustainability_preference == "low" else 0.5
+    sustain_weight = 1 - profit_weight
+
+    weighted = map(add, map(mul, scores["profitability_score"], repeat(profit_weight)),
+                   map(mul, scores["sustainability_score"], repeat(sustain_weight)))
+    for ladder in scores["rules"].risk_adjustment.get(risk_tolerance, ()):
+        adjust = _buckets(ladder, scores["risk_columns"][ladder.field])
+        weighted = map(add, weighted, _lookup(ladder["points"], adjust))
+    return array("d", weighted)
+
+
+def final_recommendations(weighted: array, ruleset: Optional[rules.Ruleset] = None) -> array:
+    """Verdict codes into the final_recommendation tiers for a weighted score column"""
+    ruleset = ruleset or rules.current()
+    return _buckets(ruleset.final_recommendation, weighted)
+
+
+def rank_top_n(scores: Dict, n: int, risk_tolerance: Optional[str] = "medium",
+               sustainability_preference: Optional[str] = None) -> List[int]:
+    """Row indices of the n best assets, ordered like a stable sort on the rounded weighted score"""
+    rounded = list(map(round, weighted_scores(scores, risk_tolerance, sustainability_preference), repeat(2)))
+    return nlargest(n, range(len(rounded)), key=rounded.__getitem__)
@@ -0,0 +1,78 @@
+import argparse
+import random
+import statistics
+import time
+
+from alerts import OPERATORS, AlertEngine, tier_labels
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+from scoring import RISK_LEVELS, SUSTAINABILITY_LEVELS, AnalysisCache, InvestorProfile
+
+PROFILES = [InvestorProfile(risk_tolerance=risk, sustainability_preference=preference)
+            for risk in RISK_LEVELS for preference in SUSTAINABILITY_LEVELS]
+
+
+def random_condition(rng: random.Random):
+    """(field, operator, value) spread over the kinds of conditions clients register"""
+    field = rng.choice(("weighted_score", "final_recommendation", "profitability_rating",
+                        "price_change_24h", "price_change_7d", "volume_24h"))
+    op = rng.choice(OPERATORS[:-1]) if rng.random() < 0.95 else "changes"
+    if op == "changes":
+        return field, op, None
+    if field in ("final_recommendation", "profitability_rating"):
+        return field, op, rng.choice(tier_labels(field))
+    if field == "weighted_score":
+        return field, op, round(rng.uniform(0, 10), 1)
+    if field == "volume_24h":
+        return field, op, float(rng.randint(10**4, 10**10))
+    return field, op, float(rng.randint(-20, 20))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert fan-out cost per asset update with many subscriptions")
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--subscriptions", type=int, default=1_000_000)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    assets = AssetTable.from_records(dict(synthetic_records(args.assets, args.seed)))
+    cache = AnalysisCache(assets)
+    names = list(assets)
+    ticks = [(rng.choice(names), {"price_change_24h": round(rng.gauss(0, 5), 2),
+                                  "price_change_7d": round(rng.gauss(0, 12), 2),
+                                  "volume_24h": float(rng.randint(10**4, 10**10))})
+             for _ in range(args.updates)]
+
+    def replay():
+        timings = []
+        for name, fields in ticks:
+            start = time.perf_counter()
+            assets.update(name, fields)
+            cache.analyses(name)  # Without alerts the ingestion path still refreshes the analyses
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    baseline = replay()
+
+    start = time.perf_counter()
+    engine = AlertEngine(assets, cache)
+    for i in range(args.subscriptions):
+        field, op, value = random_condition(rng)
+        engine.subscribe(i % 50_000, rng.choice(names), field, op, value, rng.choice(PROFILES))
+    built = time.perf_counter() - start
+
+    timings = replay()
+    extra = sorted(t - b for t, b in zip(timings, baseline))
+    timings.sort()
+    print(f"{len(engine):,} subscriptions on {args.assets:,} assets, registered in {built:.1f}s")
+    print(f"  update with fan-out   median {statistics.median(timings) * 1e6:>7.1f} us   "
+          f"p99 {timings[len(timings) * 99 // 100] * 1e6:>7.1f} us")
+    print(f"  fan-out alone         median {statistics.median(extra) * 1e6:>7.1f} us   "
+          f"p99 {extra[len(extra) * 99 // 100] * 1e6:>7.1f} us")
+    print(f"  alerts fired          {engine.fired:,} ({engine.fired / len(ticks):.1f} per update)")
+
+
+if __name__ == "__main__":
+    main()
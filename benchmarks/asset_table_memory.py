@@ -0,0 +1,47 @@
+import argparse
+import gc
+import tracemalloc
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def _measure(build) -> int:
+    """Bytes still allocated by the object build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def _dict_layout(n: int):
+    return dict(synthetic_records(n))
+
+
+def _table_layout(n: int):
+    table = AssetTable()
+    for name, record in synthetic_records(n):
+        table.add(name, record)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of the nested dict layout and AssetTable")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    args = parser.parse_args()
+
+    print(f"{'Rows':>10} {'dict MB':>10} {'table MB':>10} {'ratio':>7}")
+    for n in args.sizes:
+        dict_bytes = _measure(lambda: _dict_layout(n))
+        table_bytes = _measure(lambda: _table_layout(n))
+        print(f"{n:>10,} {dict_bytes / 2**20:>10.1f} {table_bytes / 2**20:>10.1f} "
+              f"{dict_bytes / table_bytes:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import math
+import time
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+from market_aggregates import MarketAggregates
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def _rescan(assets: AssetTable):
+    """What the market overview computed on every call before the running aggregates"""
+    changes = assets.column("price_change_24h")
+    return (math.fsum(assets.column("market_cap")), math.fsum(assets.column("volume_24h")),
+            sum(1 for change in changes if change > 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market summary cost: full rescan vs running aggregates")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--updates", type=int, default=100_000, help="ticks applied per size")
+    args = parser.parse_args()
+
+    print(f"{'Rows':>10} {'rescan ms':>10} {'summary us':>11} {'update us':>10}")
+    for n in args.sizes:
+        assets = AssetTable.from_records(dict(synthetic_records(n)))
+        aggregates = MarketAggregates(assets)
+        names = list(assets)
+
+        start = time.perf_counter()
+        _rescan(assets)
+        rescan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(args.updates):
+            assets.update(names[i * 7919 % n], {"price_change_24h": (i % 41) - 20.0, "volume_24h": float(i)})
+        update = (time.perf_counter() - start) / args.updates
+
+        calls = 1000
+        start = time.perf_counter()
+        for _ in range(calls):
+            aggregates.summary(5)
+        summary = (time.perf_counter() - start) / calls
+        print(f"{n:>10,} {rescan * 1e3:>10.1f} {summary * 1e6:>11.1f} {update * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
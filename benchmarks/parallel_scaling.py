@@ -0,0 +1,43 @@
+import argparse
+import os
+import time
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+from parallel import ParallelScorer
+from scoring import InvestorProfile, RISK_LEVELS, SUSTAINABILITY_LEVELS
+
+PROFILES = [InvestorProfile(risk_tolerance=risk, sustainability_preference=preference)
+            for risk in RISK_LEVELS for preference in SUSTAINABILITY_LEVELS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of ParallelScorer from 1 to N worker processes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    table = AssetTable()
+    for name, record in synthetic_records(args.rows):
+        table.add(name, record)
+
+    print(f"{args.rows:,} assets, {len(PROFILES)} profiles, top {args.k} (cores available: {os.cpu_count()})")
+    print(f"{'Workers':>8} {'Best s':>8} {'Speedup':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        with ParallelScorer(table, workers) as scorer:
+            scorer.top_k(PROFILES, args.k)  # Warm up the pool and publish the shared block
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                scorer.top_k(PROFILES, args.k)
+                timings.append(time.perf_counter() - start)
+        best = min(timings)
+        baseline = baseline or best
+        print(f"{workers:>8} {best:>8.3f} {baseline / best:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
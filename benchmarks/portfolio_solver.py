@@ -0,0 +1,113 @@
+import argparse
+import math
+import random
+import sys
+import time
+from typing import List, Sequence
+
+from portfolio import RISK_AVERSION, SingleIndexRiskModel, optimize_portfolio
+
+# Weight moved between two assets when looking for a better feasible allocation than the solver's
+PERTURBATION_STEPS = (1e-4, 1e-3, 1e-2, 0.05, 0.1)
+
+
+def random_risk_model(assets: int, periods: int = 90, seed: int = 42) -> SingleIndexRiskModel:
+    """Risk model fitted on synthetic daily returns driven by one market factor"""
+    rng = random.Random(seed)
+    market = [rng.gauss(0, 0.03) for _ in range(periods)]
+    returns, caps = {}, {}
+    for i in range(assets):
+        beta, noise = rng.uniform(0.3, 1.8), rng.uniform(0.01, 0.06)
+        returns[f"asset{i}"] = [beta * m + rng.gauss(0, noise) for m in market]
+        caps[f"asset{i}"] = rng.uniform(1e6, 1e11)
+    return SingleIndexRiskModel.from_returns(returns, caps)
+
+
+def _objective(model: SingleIndexRiskModel, scores: Sequence[float], weights: Sequence[float],
+               risk_aversion: float) -> float:
+    """The optimizer's objective: score (scaled to 0..1) minus risk_aversion / 2 times variance"""
+    top = max(scores)
+    volatility = model.volatility(model.names, weights)
+    return math.fsum(score / top * w for score, w in zip(scores, weights)) - risk_aversion / 2 * volatility ** 2
+
+
+def perturbation_gain(model: SingleIndexRiskModel, scores: Sequence[float], environmental: Sequence[float],
+                      caps: Sequence[float], weights: List[float], risk_aversion: float, floor) -> float:
+    """Best objective gain of moving weight between two assets while staying within caps and the floor"""
+    base = best = _objective(model, scores, weights, risk_aversion)
+    for source, held in enumerate(weights):
+        for target, room in enumerate(map(float.__sub__, map(float, caps), weights)):
+            if source == target:
+                continue
+            for step in PERTURBATION_STEPS:
+                moved = min(step, held, room)
+                if moved <= 0:
+                    continue
+                trial = list(weights)
+                trial[source] -= moved
+                trial[target] += moved
+                if floor is not None and math.fsum(map(float.__mul__, map(float, environmental), trial)) \
+                        < floor * math.fsum(trial) - 1e-9:
+                    continue
+                best = max(best, _objective(model, scores, trial, risk_aversion))
+    return best - base
+
+
+def check(cases: int, seed: int) -> int:
+    """Solve small random problems and count those a feasible perturbation improves on"""
+    failures = 0
+    for case in range(seed, seed + cases):
+        rng = random.Random(case)
+        model = random_risk_model(12, seed=case)
+        scores = [rng.uniform(1, 9) for _ in model.names]
+        environmental = [rng.randint(1, 10) for _ in model.names]
+        caps = [0.05 if score < 4 else 0.15 for score in scores]
+        for floor in (None, 5.0, 7.0):
+            for aversion in RISK_AVERSION.values():
+                try:
+                    result = optimize_portfolio(model.names, scores, environmental, model, caps, 10.0,
+                                                aversion, floor)
+                except ValueError:
+                    continue  # Floor out of reach
+                weights = [result["weights"].get(name, 0.0) for name in model.names]
+                gain = perturbation_gain(model, scores, environmental, caps, weights, aversion, floor)
+                if gain > 1e-9:
+                    failures += 1
+                    print(f"case {case}, floor {floor}, risk aversion {aversion}: "
+                          f"a perturbation improves the objective by {gain:.3g}")
+    print(f"{cases} random problems checked, {failures} improved on by a perturbation")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio optimizer solve time by universe size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=(100, 500, 2_000))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--check", type=int, metavar="N",
+                        help="instead of timing, check N small random problems against feasible perturbations")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(1 if check(args.check, args.seed) else 0)
+
+    print(f"{'Assets':>8} {'ESG floor':>10} {'Risk':>7} {'Best ms':>9} {'Positions':>10}")
+    for size in args.sizes:
+        model = random_risk_model(size, seed=args.seed)
+        rng = random.Random(args.seed)
+        scores = [rng.uniform(1, 9) for _ in model.names]
+        environmental = [rng.randint(1, 10) for _ in model.names]
+        caps = [0.05 if score < 4 else 0.15 for score in scores]
+        for floor in (None, 5.0, 7.5):
+            for risk, aversion in RISK_AVERSION.items():
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    result = optimize_portfolio(model.names, scores, environmental, model, caps, 0.6,
+                                                aversion, floor)
+                    timings.append(time.perf_counter() - start)
+                print(f"{size:>8,} {floor if floor is not None else '-':>10} {risk:>7} "
+                      f"{min(timings) * 1000:>9.1f} {len(result['weights']):>10}")
+
+
+if __name__ == "__main__":
+    main()
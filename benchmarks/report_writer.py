@@ -0,0 +1,47 @@
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_universe
+from profiles import PROFILES
+from reports import FORMATS, ReportWriter, analysis_reports
+from service import RecommendationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk report throughput: per-line print vs ReportWriter")
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--profiles", type=int, default=3, help="profiles reported per asset")
+    args = parser.parse_args()
+
+    service = RecommendationService(AssetTable.from_records(synthetic_universe(args.assets)))
+    profiles = PROFILES[:args.profiles]
+    reports = args.assets * len(profiles)
+    list(analysis_reports(service, profiles[:1]))  # Warm the analysis cache so only rendering is timed
+
+    print(f"{'Output':<18} {'Seconds':>8} {'Reports/s':>11} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "report.txt")
+        start = time.perf_counter()
+        with open(path, "w") as output, contextlib.redirect_stdout(output):
+            for report in analysis_reports(service, profiles):
+                for line in report.lines():
+                    print(line)
+        elapsed = time.perf_counter() - start
+        print(f"{'print per line':<18} {elapsed:>8.2f} {reports / elapsed:>11,.0f} {os.path.getsize(path) / 1e6:>8.1f}")
+
+        for fmt in FORMATS:
+            path = os.path.join(directory, f"report.{fmt}")
+            start = time.perf_counter()
+            with ReportWriter(path, fmt) as writer:
+                writer.write_all(analysis_reports(service, profiles))
+            elapsed = time.perf_counter() - start
+            print(f"{'writer ' + fmt:<18} {elapsed:>8.2f} {reports / elapsed:>11,.0f} "
+                  f"{os.path.getsize(path) / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import gc
+import itertools
+import random
+import time
+import tracemalloc
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+from result_cache import LRUCache
+from scoring import (INVESTMENT_AMOUNTS, RISK_LEVELS, SUSTAINABILITY_LEVELS, TIME_HORIZONS, AnalysisCache,
+                     InvestorProfile)
+from service import RecommendationService
+
+PROFILES = [InvestorProfile(*answers) for answers in itertools.product(
+    RISK_LEVELS, INVESTMENT_AMOUNTS, TIME_HORIZONS, SUSTAINABILITY_LEVELS)]
+
+
+def replay(service: RecommendationService, requests):
+    """Seconds taken and bytes still held after answering every request, results kept as a server would"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = [service.analyze(profile, name) for profile, name in requests]
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return elapsed, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Personalized recommendations with and without the result cache")
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--hot", type=int, default=500, help="assets receiving 90%% of the requests")
+    parser.add_argument("--size", type=int, default=100_000, help="result cache entries")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    assets = AssetTable.from_records(dict(synthetic_records(args.assets, args.seed)))
+    names = list(assets)
+    hot = names[:args.hot]
+    requests = [(rng.choice(PROFILES), rng.choice(hot) if rng.random() < 0.9 else rng.choice(names))
+                for _ in range(args.requests)]
+    cache = AnalysisCache(assets)
+
+    print(f"{args.requests:,} requests over {args.assets:,} assets ({args.hot} hot) and {len(PROFILES)} profiles")
+    for label, size in (("no result cache", 0), (f"LRU of {args.size:,}", args.size)):
+        service = RecommendationService(assets, cache, LRUCache(size))
+        replay(service, requests[:1000])  # Fill the analysis cache for the hot assets first
+        elapsed, held = replay(service, requests)
+        stats = service.results.stats()
+        print(f"  {label:<18} {args.requests / elapsed:>10,.0f} req/s   "
+              f"{held / args.requests:>6.0f} B/result   hit rate {stats['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import random
+import tempfile
+import time
+
+from asset_table import AssetTable
+from benchmarks.synthetic import synthetic_records
+from price_history import DAY, PriceHistory
+from risk_analytics import LOOKBACK_DAYS, RiskAnalytics
+
+
+def write_history(history: PriceHistory, names, days: int, seed: int = 42) -> int:
+    """Daily bars for every asset: a common market factor plus noise of its own, return the last timestamp"""
+    rng = random.Random(seed)
+    market = [rng.gauss(0.0005, 0.03) for _ in range(days)]
+    for name in names:
+        beta = rng.uniform(0.3, 2.0)
+        noise = rng.uniform(0.005, 0.05)
+        close = rng.lognormvariate(0, 2)
+        bars = []
+        for day, factor in enumerate(market):
+            close *= 1 + beta * factor + rng.gauss(0, noise)
+            bars.append((day * DAY, close, close, close, close, 1.0))
+        history.append(name, bars)
+    return (days - 1) * DAY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of the risk metrics over a synthetic price history")
+    parser.add_argument("--assets", type=int, default=2_000)
+    parser.add_argument("--days", type=int, default=LOOKBACK_DAYS + 30, help="days of stored bars per asset")
+    parser.add_argument("--lookback", type=int, default=LOOKBACK_DAYS)
+    args = parser.parse_args()
+
+    assets = AssetTable.from_records(dict(synthetic_records(args.assets)))
+    with tempfile.TemporaryDirectory() as directory:
+        history = PriceHistory(directory)
+        last = write_history(history, list(assets), args.days)
+
+        start = time.perf_counter()
+        analytics = RiskAnalytics(history, assets, args.lookback)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analytics.refresh()
+        idle = time.perf_counter() - start
+
+        history.append("asset0", [(last + DAY, 1.0, 1.0, 1.0, 1.0, 1.0)])
+        start = time.perf_counter()
+        analytics.refresh(last)
+        one = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analytics.apply_to(assets)
+        applied = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analytics.correlations("asset1")
+        row = time.perf_counter() - start
+        history.close()
+
+    print(f"{len(analytics):,} assets x {args.lookback} days")
+    print(f"  first read and metrics     {cold * 1e3:>8.1f} ms")
+    print(f"  refresh, nothing new       {idle * 1e3:>8.1f} ms")
+    print(f"  refresh, one series grew   {one * 1e3:>8.1f} ms")
+    print(f"  store in the asset table   {applied * 1e3:>8.1f} ms")
+    print(f"  one correlation row        {row * 1e3:>8.1f} ms "
+          f"(full matrix about {row * len(analytics):.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
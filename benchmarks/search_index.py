@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from search_index import SearchIndex
+
+
+def synthetic_listings(n: int, seed: int = 42) -> List[str]:
+    """Distinct pronounceable asset names, some with the usual coin/token suffixes"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        syllables = (rng.choice("bcdfghjklmnprstvwxz") + rng.choice("aeiou") + rng.choice(("", "", "n", "r", "x"))
+                     for _ in range(rng.randint(2, 4)))
+        names.add("".join(syllables) + rng.choice(("", "", " coin", " token", " network")))
+    return sorted(names)
+
+
+def _typo(rng: random.Random, name: str) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice("abcxyz") + name[i + 1:]
+
+
+def _latencies(lookup: Callable, queries: List[str]) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        lookup(query)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index build time and lookup latency")
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    names = synthetic_listings(args.listings)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        index.add(name, f"{name[:3].upper()}{i % 97}")
+    print(f"🔎 {len(names):,} listings indexed in {time.perf_counter() - start:.2f} s")
+
+    sample = [rng.choice(names) for _ in range(args.queries)]
+    workloads = {
+        "exact": (index.exact, sample),
+        "prefix": (index.prefix, [name[:rng.randint(1, len(name))] for name in sample]),
+        "fuzzy": (index.fuzzy, [_typo(rng, name) for name in sample]),
+        "search": (index.search, [_typo(rng, name) for name in sample]),
+    }
+    print(f"{'Lookup':<8} {'p50 us':>8} {'p99 us':>8}")
+    for label, (lookup, queries) in workloads.items():
+        latencies = _latencies(lookup, queries)
+        print(f"{label:<8} {latencies[len(latencies) // 2] * 1e6:>8.0f} {latencies[int(len(latencies) * 0.99)] * 1e6:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import datetime
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from asset_table import AssetTable
+from batch_scoring import score_universe
+from benchmarks.synthetic import synthetic_records
+from scoring import InvestorProfile, analyze_profitability, analyze_sustainability, generate_investment_advice
+from service import RecommendationService
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+PROFILE = InvestorProfile(risk_tolerance="high", time_horizon="long", sustainability_preference="medium")
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(path: str, size: int, latencies_ns: List[int], items_per_call: int) -> Dict:
+    latencies_ns.sort()
+    total = sum(latencies_ns)
+    return {
+        "path": path,
+        "size": size,
+        "calls": len(latencies_ns),
+        "throughput_per_s": items_per_call * len(latencies_ns) / (total / 1e9) if total else None,
+        "latency_us": {
+            "p50": _percentile(latencies_ns, 0.50) / 1e3,
+            "p90": _percentile(latencies_ns, 0.90) / 1e3,
+            "p99": _percentile(latencies_ns, 0.99) / 1e3,
+            "max": latencies_ns[-1] / 1e3,
+        },
+    }
+
+
+def _peak_memory(run: Callable[[], None]) -> int:
+    """Peak bytes allocated while run() executes (measured separately from timing)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _per_asset(path: str, size: int, names: List[str], call: Callable[[str], object]) -> Dict:
+    clock = time.perf_counter_ns
+    latencies = []
+    for name in names:
+        start = clock()
+        call(name)
+        latencies.append(clock() - start)
+    result = _summarize(path, size, latencies, 1)
+    result["peak_memory_bytes"] = _peak_memory(lambda: [call(name) for name in names[:1000]])
+    return result
+
+
+def _whole_universe(path: str, size: int, repeat: int, call: Callable[[], object]) -> Dict:
+    clock = time.perf_counter_ns
+    latencies = []
+    for _ in range(repeat):
+        start = clock()
+        call()
+        latencies.append(clock() - start)
+    result = _summarize(path, size, latencies, size)
+    result["peak_memory_bytes"] = _peak_memory(call)
+    return result
+
+
+def run_size(size: int, seed: int, calls: int, repeat: int) -> List[Dict]:
+    """Benchmark every hot path on one synthetic universe"""
+    table = AssetTable()
+    for name, record in synthetic_records(size, seed):
+        table.add(name, record)
+    names = list(table)[:calls]
+    rows = {name: table[name] for name in names}
+    results = []
+
+    results.append(_per_asset("analyze_profitability", size, names,
+                              lambda name: analyze_profitability(rows[name])))
+    results.append(_per_asset("analyze_sustainability", size, names,
+                              lambda name: analyze_sustainability(rows[name])))
+
+    service = RecommendationService(table)
+    results.append(_per_asset("get_personalized_recommendation[cold]", size, names,
+                              lambda name: service.analyze(PROFILE, name)))
+    results.append(_per_asset("get_personalized_recommendation[cached]", size, names,
+                              lambda name: service.analyze(PROFILE, name)))
+    results.append(_per_asset("generate_investment_advice", size, names,
+                              lambda name: generate_investment_advice(rows[name], 5.5, PROFILE)))
+
+    results.append(_whole_universe("score_universe", size, repeat, lambda: score_universe(table)))
+    results.append(_whole_universe("market_overview", size, repeat, service.market_overview))
+    service.topk  # Build the ranking index outside the timed region
+    results.append(_per_asset("top_recommendations", size, names[:min(len(names), 1000)],
+                              lambda name: service.top_recommendations(PROFILE, 3)))
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> int:
+    """Print throughput changes against a previous run, return how many paths regressed"""
+    previous = {(r["path"], r["size"]): r for r in baseline["results"]}
+    regressions = 0
+    print(f"\n{'Path':<42} {'Size':>10} {'Before/s':>12} {'After/s':>12} {'Change':>8}")
+    for result in current["results"]:
+        old = previous.get((result["path"], result["size"]))
+        if old is None or not old["throughput_per_s"] or not result["throughput_per_s"]:
+            continue
+        change = result["throughput_per_s"] / old["throughput_per_s"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = " ❌"
+        print(f"{result['path']:<42} {result['size']:>10,} {old['throughput_per_s']:>12,.0f} "
+              f"{result['throughput_per_s']:>12,.0f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CryptoWise scoring and reporting hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="universe sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--calls", type=int, default=20_000, help="per-asset calls timed per path")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of whole-universe paths")
+    parser.add_argument("--output", "-o", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="previous JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="throughput drop counted as a regression (default 10%%)")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "calls": args.calls,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    for size in args.sizes:
+        for result in run_size(size, args.seed, args.calls, args.repeat):
+            report["results"].append(result)
+            latency = result["latency_us"]
+            print(f"{result['path']:<42} {size:>10,} {result['throughput_per_s']:>14,.0f}/s "
+                  f"p50 {latency['p50']:>10.1f}us p99 {latency['p99']:>10.1f}us "
+                  f"peak {result['peak_memory_bytes'] / 2**20:>8.1f}MB")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare) as previous:
+            regressions = compare(json.load(previous), report, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
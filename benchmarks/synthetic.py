@@ -0,0 +1,33 @@
+import random
+from typing import Dict, Iterator, Tuple
+
+SUSTAINABILITY_RATINGS = ("Low", "Medium", "High")
+ENVIRONMENTAL_RATINGS = ("Poor", "Fair", "Good", "Excellent")
+
+
+def synthetic_records(n: int, seed: int = 42) -> Iterator[Tuple[str, Dict]]:
+    """Deterministic (name, record) pairs shaped like the crypto_data entries"""
+    rng = random.Random(seed)
+    for i in range(n):
+        yield f"asset{i}", {
+            "symbol": f"A{i}",
+            "current_price": round(rng.lognormvariate(0, 3), 4),
+            "price_change_24h": round(rng.gauss(0, 5), 2),
+            "price_change_7d": round(rng.gauss(0, 12), 2),
+            "price_change_30d": round(rng.gauss(0, 25), 2),
+            "market_cap": rng.randint(10**6, 10**12),
+            "volume_24h": rng.randint(10**4, 10**10),
+            "energy_efficiency_score": rng.randint(1, 10),
+            "environmental_score": rng.randint(1, 10),
+            "sustainability_rating": rng.choice(SUSTAINABILITY_RATINGS),
+            "environmental_rating": rng.choice(ENVIRONMENTAL_RATINGS),
+            "project_viability": rng.randint(1, 10),
+            "adoption_score": rng.randint(1, 10),
+            "technology_score": rng.randint(1, 10),
+            "team_score": rng.randint(1, 10),
+        }
+
+
+def synthetic_universe(n: int, seed: int = 42) -> Dict[str, Dict]:
+    """Synthetic universe in the old nested-dict layout"""
+    return dict(synthetic_records(n, seed))
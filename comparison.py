@@ -0,0 +1,138 @@
+from array import array
+from itertools import repeat
+from operator import sub
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import rules
+from asset_table import AssetTable
+from batch_scoring import final_recommendations, score_columns, select_columns, weighted_scores
+from scoring import InvestorProfile
+
+MARKET_COLUMNS = ("current_price", "price_change_24h", "price_change_7d", "price_change_30d",
+                  "market_cap", "volume_24h")
+SCORE_COLUMNS = ("profitability_score", "sustainability_score", "weighted_score")
+TIER_COLUMNS = ("profitability_rating", "sustainability_rating", "final_recommendation")
+COLUMNS = ("crypto", "symbol") + MARKET_COLUMNS + SCORE_COLUMNS + TIER_COLUMNS
+NUMERIC_COLUMNS = MARKET_COLUMNS + SCORE_COLUMNS
+
+
+def resolve_rows(assets: AssetTable, keys: Iterable[str]) -> List[int]:
+    """Table rows of assets given by name or symbol, without duplicates, in first-seen order"""
+    rows: List[int] = []
+    seen = set()
+    unknown = []
+    for key in keys:
+        row = assets.row_of(key.strip())
+        if row is None:
+            unknown.append(key)
+        elif row not in seen:
+            seen.add(row)
+            rows.append(row)
+    if unknown:
+        raise KeyError(f"Unknown cryptocurrencies: {', '.join(unknown)}")
+    return rows
+
+
+class Comparison:
+    """Selected assets scored for one profile in a single batch, as sortable columns
+
+    Every column is a sequence indexed by position in the comparison.
+    Rating and verdict columns hold their labels, but sort by tier (worst
+    to best) through the tier codes kept next to them. Sorting reorders all
+    columns together and is stable, so ties keep their previous order.
+    """
+
+    def __init__(self, assets: AssetTable, rows: Sequence[int], profile: InvestorProfile,
+                 ruleset: Optional[rules.Ruleset] = None):
+        ruleset = ruleset or rules.current()
+        self.profile = profile
+        self.rows = list(rows)
+        selected = select_columns(assets.columns(), self.rows, ruleset.input_fields)
+        scores = score_columns(selected, ruleset)
+        weighted = weighted_scores(scores, profile.risk_tolerance, profile.sustainability_preference)
+        verdicts = final_recommendations(weighted, ruleset)
+
+        self.columns: Dict[str, Sequence] = {
+            "crypto": [name.title() for name in selected["names"]],
+            "symbol": [assets.get_field(row, "symbol") for row in self.rows],
+        }
+        for field in MARKET_COLUMNS:
+            column = assets.column(field)
+            self.columns[field] = array("d", map(column.__getitem__, self.rows))
+        self.columns["profitability_score"] = scores["profitability_score"]
+        self.columns["sustainability_score"] = scores["sustainability_score"]
+        self.columns["weighted_score"] = array("d", map(round, weighted, repeat(2)))
+        self._tiers = {
+            "profitability_rating": (scores["profitability_rating"], ruleset.profitability_rating["rating"]),
+            "sustainability_rating": (scores["sustainability_rating"], ruleset.sustainability_rating["rating"]),
+            "final_recommendation": (verdicts, ruleset.final_recommendation["recommendation"]),
+        }
+        for column, (codes, labels) in self._tiers.items():
+            self.columns[column] = [labels[code] for code in codes]
+
+    @classmethod
+    def of(cls, assets: AssetTable, keys: Iterable[str], profile: InvestorProfile) -> "Comparison":
+        """Comparison of assets given by name or symbol"""
+        return cls(assets, resolve_rows(assets, keys), profile)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _column(self, column: str) -> Sequence:
+        if column not in self.columns:
+            raise ValueError(f"Unknown comparison column: {column!r} (expected one of {', '.join(self.columns)})")
+        return self.columns[column]
+
+    def _position(self, key: Union[int, str]) -> int:
+        if isinstance(key, int):
+            if not 0 <= key < len(self.rows):
+                raise ValueError(f"No asset at position {key} of the comparison")
+            return key
+        key = key.strip()
+        for position, (crypto, symbol) in enumerate(zip(self.columns["crypto"], self.columns["symbol"])):
+            if key.lower() == crypto.lower() or key.upper() == symbol.upper():
+                return position
+        raise KeyError(f"{key} is not part of the comparison")
+
+    def sort(self, column: str, descending: bool = False) -> "Comparison":
+        """Reorder every column by one of them, in place"""
+        values = self._column(column)
+        if column in self._tiers:
+            values = self._tiers[column][0]
+        self._reorder(sorted(range(len(self.rows)), key=values.__getitem__, reverse=descending))
+        return self
+
+    def _reorder(self, order: List[int]):
+        self.rows = [self.rows[position] for position in order]
+        for column, values in self.columns.items():
+            reordered = [values[position] for position in order]
+            self.columns[column] = array(values.typecode, reordered) if isinstance(values, array) else reordered
+        for column, (codes, labels) in self._tiers.items():
+            self._tiers[column] = (array(codes.typecode, [codes[position] for position in order]), labels)
+
+    def add_deltas(self, columns: Iterable[str], baseline: Union[int, str] = 0) -> List[str]:
+        """Add a <column>_delta column of differences to the baseline asset, return the new names"""
+        columns = list(columns)
+        position = self._position(baseline) if columns else 0
+        added = []
+        for column in columns:
+            if column not in NUMERIC_COLUMNS:
+                raise ValueError(f"Deltas need a numeric column, not {column!r} "
+                                 f"(expected one of {', '.join(NUMERIC_COLUMNS)})")
+            values = self.columns[column]
+            self.columns[f"{column}_delta"] = array("d", map(sub, values, repeat(values[position])))
+            added.append(f"{column}_delta")
+        return added
+
+    def pairwise(self, column: str) -> List[array]:
+        """Matrix of column[i] - column[j] for every pair of assets, one array per row"""
+        if column not in NUMERIC_COLUMNS:
+            raise ValueError(f"Deltas need a numeric column, not {column!r} "
+                             f"(expected one of {', '.join(NUMERIC_COLUMNS)})")
+        values = self.columns[column]
+        return [array("d", map(sub, repeat(value), values)) for value in values]
+
+    def records(self) -> List[Dict]:
+        """One dict per asset, in the current order"""
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
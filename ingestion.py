@@ -0,0 +1,293 @@
+import json
+import math
+import queue
+import random
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+from asset_table import AssetTable
+
+# Feed messages are flat JSON objects, one per line:
+#   {"type": "tick", "asset": "bitcoin", "current_price": 68510.0, "price_change_24h": 3.6}
+#   {"type": "snapshot", "asset": "newcoin", "symbol": "NEW", ...every asset field...}
+# "type" defaults to "tick". Ticks update existing assets, snapshots add or fully replace one.
+# An optional "ts" (epoch seconds) is only used to pace replays.
+# A line that is not a JSON object, or that holds NaN, Infinity or an overflowing number, is rejected.
+META_KEYS = ("type", "asset", "ts")
+
+
+def _finite(text: str) -> float:
+    value = float(text)
+    if not math.isfinite(value):
+        raise ValueError(f"Non-finite number in feed: {text}")
+    return value
+
+
+def _non_finite(text: str):
+    raise ValueError(f"Non-finite number in feed: {text}")
+
+
+def _decode(line) -> Optional[Dict]:
+    """One feed line as a message, None when it cannot be decoded (counted as rejected when applied)"""
+    try:
+        return json.loads(line, parse_float=_finite, parse_constant=_non_finite)
+    except (ValueError, RecursionError):
+        return None
+
+
+def _parse_lines(lines: Iterable) -> Iterator[Optional[Dict]]:
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield _decode(line)
+
+
+def file_source(path: str, follow: bool = False, poll_interval: float = 0.2) -> Iterator[Optional[Dict]]:
+    """Messages from a local JSONL file, optionally tailing it for new lines"""
+    with open(path, "rb") as feed:
+        while True:
+            line = feed.readline()
+            if line:
+                if line.endswith(b"\n"):
+                    line = line.strip()
+                    if line:
+                        yield _decode(line)
+                    continue
+                if not follow:
+                    if line.strip():
+                        yield _decode(line)
+                    return
+                # Partial line still being written, re-read it once complete
+                feed.seek(-len(line), 1)
+            elif not follow:
+                return
+            time.sleep(poll_interval)
+
+
+def socket_source(host: str, port: int, timeout: Optional[float] = None) -> Iterator[Optional[Dict]]:
+    """Messages from a line-delimited JSON TCP feed, until the peer closes the connection"""
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        with conn.makefile("rb") as stream:
+            yield from _parse_lines(stream)
+
+
+def replay_source(path: str, speed: Optional[float] = None) -> Iterator[Optional[Dict]]:
+    """Replay a recorded JSONL feed, as fast as possible or paced by its "ts" fields
+
+    speed=1.0 replays in real time, 10.0 ten times faster; None disables pacing.
+    """
+    start_wall = start_ts = None
+    for message in file_source(path):
+        ts = message.get("ts") if isinstance(message, dict) else None
+        if speed and ts is not None:
+            if start_ts is None:
+                start_wall, start_ts = time.monotonic(), ts
+            delay = (ts - start_ts) / speed - (time.monotonic() - start_wall)
+            if delay > 0:
+                time.sleep(delay)
+        yield message
+
+
+def synthetic_feed(assets: Mapping, count: int, seed: int = 42, start_ts: float = 0.0,
+                   interval: float = 0.001) -> Iterator[Dict]:
+    """Deterministic stand-in feed of random-walk price ticks over existing assets
+
+    Useful to exercise the pipeline offline; write it out with write_feed() to get a
+    replayable JSONL file.
+    """
+    rng = random.Random(seed)
+    names = list(assets.keys())
+    prices = {name: assets[name]["current_price"] for name in names}
+    changes = {name: assets[name]["price_change_24h"] for name in names}
+    for i in range(count):
+        name = names[rng.randrange(len(names))]
+        move = rng.gauss(0, 0.002)
+        prices[name] = round(prices[name] * (1 + move), 8)
+        changes[name] = round(changes[name] + move * 100, 4)
+        message = {"type": "tick", "asset": name, "ts": round(start_ts + i * interval, 6),
+                   "current_price": prices[name], "price_change_24h": changes[name]}
+        if i % 10 == 0:
+            message["volume_24h"] = round(assets[name]["volume_24h"] * rng.uniform(0.8, 1.2))
+        yield message
+
+
+def write_feed(path: str, messages: Iterable[Dict]) -> int:
+    """Write messages as JSONL and return how many were written"""
+    count = 0
+    with open(path, "w") as feed:
+        for message in messages:
+            feed.write(json.dumps(message, separators=(",", ":")))
+            feed.write("\n")
+            count += 1
+    return count
+
+
+class IngestionPipeline:
+    """Apply streamed market updates to an AssetTable in coalesced batches
+
+    A reader thread pulls messages from the source into a bounded queue of
+    batches; when the applier falls behind the queue fills and the reader
+    blocks, which pushes back on the source instead of buffering without
+    limit. Each batch is coalesced per asset (last value per field wins), so
+    every touched asset is written and re-versioned once per batch. Only
+    those assets are reported to listeners and, when a cache is attached,
+    re-analyzed.
+    """
+
+    def __init__(self, assets: AssetTable, cache=None, batch_size: int = 4096, max_batches: int = 16):
+        self.assets = assets
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.listeners: List[Callable[[Set[str]], None]] = []
+        self.stats = {"received": 0, "applied": 0, "batches": 0, "assets_updated": 0, "rejected": 0}
+        self._stop = threading.Event()
+
+    def subscribe(self, listener: Callable[[Set[str]], None]):
+        """Call listener(changed_names) after every applied batch"""
+        self.listeners.append(listener)
+
+    def apply_batch(self, messages: Iterable[Dict]) -> Set[str]:
+        """Apply a batch of messages synchronously and return the names of changed assets"""
+        ticks: Dict[str, Dict] = {}
+        received = rejected = 0
+        assets = self.assets
+        for message in messages:
+            received += 1
+            if not isinstance(message, dict):
+                # A line the source could not decode, or JSON that is not an object
+                rejected += 1
+                continue
+            name = message.get("asset")
+            fields = {key: value for key, value in message.items() if key not in META_KEYS}
+            if message.get("type", "tick") == "snapshot":
+                # Flush earlier ticks first so per-asset ordering is preserved
+                pending = ticks.pop(name, None) if isinstance(name, str) else None
+                if pending:
+                    rejected += self._flush(name, pending)
+                    ticks[name] = {}
+                try:
+                    if isinstance(name, str) and name in assets:
+                        assets.update(name, fields)
+                    else:
+                        assets.add(name, fields)
+                except (KeyError, TypeError, ValueError, OverflowError):
+                    rejected += 1
+                    continue
+                ticks[name] = {}
+            elif isinstance(name, str) and name in assets:
+                # Checked per message, so a bad tick is dropped without losing the asset's other ticks
+                try:
+                    assets.validate(fields, name)
+                except (KeyError, TypeError, ValueError, OverflowError):
+                    rejected += 1
+                    continue
+                pending = ticks.get(name)
+                if pending is None:
+                    pending = ticks[name] = {}
+                pending.update(fields)
+            else:
+                rejected += 1
+
+        changed = set()
+        for name, fields in ticks.items():
+            if fields:
+                rejected += self._flush(name, fields)
+            changed.add(name)
+
+        if self.cache is not None:
+            for name in changed:
+                self.cache.analyses(name)
+        for listener in self.listeners:
+            listener(changed)
+
+        stats = self.stats
+        stats["received"] += received
+        stats["applied"] += received - rejected
+        stats["rejected"] += rejected
+        stats["batches"] += 1
+        stats["assets_updated"] += len(changed)
+        return changed
+
+    def _flush(self, name: str, fields: Dict) -> int:
+        """Write an asset's coalesced ticks, return 1 if their symbol had to be dropped, else 0"""
+        try:
+            self.assets.update(name, fields)
+            return 0
+        except ValueError:
+            # Ticks are validated on arrival, so only a symbol taken since by another asset's snapshot can fail
+            del fields["symbol"]
+            self.assets.update(name, fields)
+            return 1
+
+    def _read(self, source: Iterable[Dict], batches: queue.Queue, errors: List[BaseException]):
+        batch = []
+        try:
+            for message in source:
+                if self._stop.is_set():
+                    break
+                batch.append(message)
+                if len(batch) >= self.batch_size:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+        except BaseException as error:
+            errors.append(error)
+        finally:
+            batches.put(None)
+
+    def run(self, source: Iterable[Dict]) -> Dict:
+        """Consume a source until it is exhausted or stop() is called, return the stats"""
+        self._stop.clear()
+        batches = queue.Queue(maxsize=self.max_batches)
+        errors: List[BaseException] = []
+        reader = threading.Thread(target=self._read, args=(source, batches, errors),
+                                  name="ingestion-reader", daemon=True)
+        reader.start()
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            if not self._stop.is_set():
+                self.apply_batch(batch)
+        reader.join()
+        if errors:
+            raise errors[0]
+        return dict(self.stats)
+
+    def stop(self):
+        """Ask a running pipeline to finish after the batch in progress"""
+        self._stop.set()
+
+
+def main():
+    """Generate a stand-in feed or measure ingestion throughput offline"""
+    import argparse
+
+    from WEEK1 import CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="CryptoWise market-data ingestion tools")
+    parser.add_argument("--generate", metavar="PATH", help="write a synthetic JSONL feed to PATH")
+    parser.add_argument("--replay", metavar="PATH", help="replay a JSONL feed and report throughput")
+    parser.add_argument("--count", type=int, default=1_000_000, help="messages to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    bot = CryptoInvestmentBot()
+    if args.generate:
+        written = write_feed(args.generate, synthetic_feed(bot.crypto_data, args.count, args.seed))
+        print(f"Wrote {written:,} messages to {args.generate}")
+    if args.replay:
+        pipeline = IngestionPipeline(bot.crypto_data, bot.service.cache)
+        start = time.perf_counter()
+        stats = pipeline.run(replay_source(args.replay))
+        elapsed = time.perf_counter() - start
+        print(f"Applied {stats['applied']:,} updates in {elapsed:.2f}s "
+              f"({stats['applied'] / elapsed:,.0f} updates/sec), rejected {stats['rejected']:,}")
+
+
+if __name__ == "__main__":
+    main()
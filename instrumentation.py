@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, TextIO
+
+# Process-wide probe. Hot paths only read this once and test it for None, so
+# leaving instrumentation disabled costs a single global lookup per call.
+_active: Optional["Instrumentation"] = None
+
+
+class MemorySink:
+    """Keep every flushed snapshot in a list"""
+
+    def __init__(self):
+        self.snapshots: List[Dict] = []
+
+    def write(self, snapshot: Dict):
+        self.snapshots.append(snapshot)
+
+
+class JsonlSink:
+    """Append one JSON line per flushed snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, snapshot: Dict):
+        with open(self.path, "a") as output:
+            output.write(json.dumps(snapshot) + "\n")
+
+
+class PrometheusTextSink:
+    """Write the latest snapshot in the Prometheus text exposition format
+
+    The file is rewritten on every flush, ready for a node_exporter textfile
+    collector or any scraper that reads a static file.
+    """
+
+    def __init__(self, path: str, prefix: str = "cryptowise"):
+        self.path = path
+        self.prefix = prefix
+
+    def write(self, snapshot: Dict):
+        with open(self.path, "w") as output:
+            self.render(snapshot, output)
+
+    def render(self, snapshot: Dict, output: TextIO):
+        prefix = self.prefix
+        output.write(f"# HELP {prefix}_stage_seconds Time spent per recommendation pipeline stage\n")
+        output.write(f"# TYPE {prefix}_stage_seconds summary\n")
+        for stage, timer in sorted(snapshot["timers"].items()):
+            label = _label(stage)
+            output.write(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {timer["total_s"]!r}\n')
+            output.write(f'{prefix}_stage_seconds_count{{stage="{label}"}} {timer["count"]}\n')
+        output.write(f"# HELP {prefix}_events_total Counted events and threshold branch hits\n")
+        output.write(f"# TYPE {prefix}_events_total counter\n")
+        for event, count in sorted(snapshot["counters"].items()):
+            output.write(f'{prefix}_events_total{{event="{_label(event)}"}} {count}\n')
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Instrumentation:
+    """Per-stage timers and event/branch counters with pluggable sinks"""
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self._lock = threading.Lock()
+        self._timers: Dict[str, List[float]] = {}  # stage -> [count, total seconds, max seconds]
+        self._counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def count(self, event: str, amount: int = 1):
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + amount
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "timers": {name: {"count": count, "total_s": total, "max_s": peak}
+                           for name, (count, total, peak) in self._timers.items()},
+                "counters": dict(self._counters),
+            }
+
+    def flush(self):
+        """Send the current snapshot to every sink"""
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.write(snapshot)
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+def active() -> Optional[Instrumentation]:
+    return _active
+
+
+def enable(sinks=()) -> Instrumentation:
+    """Start collecting process-wide and return the live Instrumentation"""
+    global _active
+    _active = Instrumentation(sinks)
+    return _active
+
+
+def disable() -> Optional[Instrumentation]:
+    """Stop collecting; returns the instance that was active so it can still be flushed"""
+    global _active
+    previous, _active = _active, None
+    return previous
+
+
+def sink_for_path(path: str):
+    """Prometheus text for *.prom paths, JSON lines otherwise"""
+    return PrometheusTextSink(path) if path.endswith(".prom") else JsonlSink(path)
@@ -0,0 +1,199 @@
+import heapq
+import math
+import threading
+from array import array
+from typing import Dict, List, Tuple
+
+from asset_table import AssetTable
+
+
+class ExactSum:
+    """Running float sum that supports removal without drift
+
+    Keeps the value as a short list of non-overlapping partials (Shewchuk's
+    algorithm, the one behind math.fsum), so after any sequence of add and
+    remove calls value() equals math.fsum of the values currently held.
+    Each call costs O(number of partials), which is bounded by the float
+    exponent range and stays a handful in practice.
+
+    NaN and infinities are counted aside instead: added to the partials,
+    one would leave them NaN for good, even after it is removed.
+    """
+
+    def __init__(self):
+        self._partials: List[float] = []
+        self._nan = self._inf = self._negative_inf = 0
+
+    def add(self, x: float):
+        if math.isfinite(x):
+            self._add(x)
+        else:
+            self._count(x, 1)
+
+    def remove(self, x: float):
+        if math.isfinite(x):
+            self._add(-x)
+        else:
+            self._count(x, -1)
+
+    def _count(self, x: float, step: int):
+        if x != x:
+            self._nan += step
+        elif x > 0:
+            self._inf += step
+        else:
+            self._negative_inf += step
+
+    def _add(self, x: float):
+        partials = self._partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            high = x + y
+            low = y - (high - x)
+            if low:
+                partials[i] = low
+                i += 1
+            x = high
+        partials[i:] = [x]
+
+    def value(self) -> float:
+        if self._nan or (self._inf and self._negative_inf):
+            return math.nan
+        if self._inf or self._negative_inf:
+            return math.inf if self._inf else -math.inf
+        return math.fsum(self._partials)
+
+
+class _RankHeap:
+    """Rows ordered by key, smallest first, with lazy deletion
+
+    Every update pushes a fresh (key, row) entry; entries whose key no longer
+    matches the row's current key are stale and dropped when they reach the
+    top. The heap is rebuilt once stale entries outnumber live ones, so its
+    size stays O(rows).
+    """
+
+    def __init__(self, keys: array):
+        self._keys = keys
+        self._heap: List[Tuple[float, int]] = list(zip(keys, range(len(keys))))
+        heapq.heapify(self._heap)
+
+    def push(self, row: int):
+        heapq.heappush(self._heap, (self._keys[row], row))
+        if len(self._heap) > 2 * len(self._keys) + 64:
+            self._heap = list(zip(self._keys, range(len(self._keys))))
+            heapq.heapify(self._heap)
+
+    def smallest(self, k: int) -> List[int]:
+        """Rows of the k smallest keys, ties by row, in O(k log n)"""
+        heap, keys = self._heap, self._keys
+        taken = []
+        while heap and len(taken) < k:
+            key, row = heapq.heappop(heap)
+            if keys[row] == key and (not taken or taken[-1][1] != row):
+                taken.append((key, row))
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [row for _key, row in taken]
+
+
+class MarketAggregates:
+    """Market totals, sentiment and movers kept current as the asset table changes
+
+    Listens to the table and, per added or updated row, adjusts the exact
+    market cap and volume sums and the positive performer count in O(1) and
+    pushes the row's new 24h change and volume into the gainer, loser and
+    volume heaps in O(log n). Serving the totals is O(1) and the movers
+    O(k log n), whatever the universe size.
+    """
+
+    def __init__(self, assets: AssetTable):
+        self.assets = assets
+        self._lock = threading.Lock()
+        # Last seen values per row, to take an updated row's old contribution back out
+        self._market_caps = array("d", assets.column("market_cap"))
+        self._volumes = array("d", assets.column("volume_24h"))
+        self._changes = array("d", assets.column("price_change_24h"))
+        self._market_cap = ExactSum()
+        self._volume = ExactSum()
+        for value in self._market_caps:
+            self._market_cap.add(value)
+        for value in self._volumes:
+            self._volume.add(value)
+        self._positive = sum(1 for change in self._changes if change > 0)
+        # Heap keys: losers by change, gainers by -change, volume leaders by -volume
+        self._negated_changes = array("d", [-change for change in self._changes])
+        self._negated_volumes = array("d", [-volume for volume in self._volumes])
+        self._losers = _RankHeap(self._changes)
+        self._gainers = _RankHeap(self._negated_changes)
+        self._volume_leaders = _RankHeap(self._negated_volumes)
+        assets.add_listener(self._apply)
+
+    def _apply(self, row: int):
+        assets = self.assets
+        market_cap = assets.get_field(row, "market_cap")
+        volume = assets.get_field(row, "volume_24h")
+        change = assets.get_field(row, "price_change_24h")
+        with self._lock:
+            added = row == len(self._changes)
+            if added:
+                # Rows are appended in order, so a new row is always the next index
+                self._market_caps.append(market_cap)
+                self._volumes.append(volume)
+                self._changes.append(change)
+                self._negated_volumes.append(-volume)
+                self._negated_changes.append(-change)
+            else:
+                self._market_cap.remove(self._market_caps[row])
+                self._volume.remove(self._volumes[row])
+                self._positive -= self._changes[row] > 0
+                self._market_caps[row] = market_cap
+            self._market_cap.add(market_cap)
+            self._volume.add(volume)
+            self._positive += change > 0
+            if added or self._volumes[row] != volume:
+                self._volumes[row] = volume
+                self._negated_volumes[row] = -volume
+                self._volume_leaders.push(row)
+            if added or self._changes[row] != change:
+                self._changes[row] = change
+                self._negated_changes[row] = -change
+                self._losers.push(row)
+                self._gainers.push(row)
+
+    def totals(self) -> Dict:
+        """Market cap and volume totals, positive performers and sentiment"""
+        with self._lock:
+            positive = self._positive
+            total = len(self._changes)
+            return {
+                "total_market_cap": self._market_cap.value(),
+                "total_volume": self._volume.value(),
+                "positive_performers": positive,
+                "total_assets": total,
+                "sentiment": "Bullish" if positive > total / 2 else "Bearish",
+            }
+
+    def _movers(self, heap: _RankHeap, k: int) -> List[Dict]:
+        assets = self.assets
+        return [{
+            "crypto": assets.name_of(row).title(),
+            "symbol": assets.get_field(row, "symbol"),
+            "price_change_24h": self._changes[row],
+            "volume_24h": self._volumes[row],
+        } for row in heap.smallest(k)]
+
+    def summary(self, k: int = 5) -> Dict:
+        """totals() plus the top k gainers, losers and volume leaders"""
+        result = self.totals()
+        with self._lock:
+            result["top_gainers"] = self._movers(self._gainers, k)
+            result["top_losers"] = self._movers(self._losers, k)
+            result["volume_leaders"] = self._movers(self._volume_leaders, k)
+        return result
+
+    def close(self):
+        """Stop following table updates"""
+        self.assets.remove_listener(self._apply)
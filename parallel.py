@@ -0,0 +1,131 @@
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import rules
+from asset_table import AssetTable
+from batch_scoring import score_universe, weighted_scores
+from scoring import InvestorProfile
+from topk_index import bucket_of
+
+# Worker-side cache of mapped column files, so each process maps a published block once
+_attached: Dict[str, Tuple[mmap.mmap, memoryview]] = {}
+
+
+class _ShardColumns:
+    """Zero-copy column views over one shard of the shared block, shaped for score_universe"""
+
+    def __init__(self, values: memoryview, fields: Tuple[str, ...], rows: int, start: int, stop: int):
+        self._columns = {"names": range(start, stop)}
+        for i, field in enumerate(fields):
+            self._columns[field] = values[i * rows + start:i * rows + stop]
+
+    def columns(self) -> Dict:
+        return self._columns
+
+
+def _attach(path: str) -> memoryview:
+    entry = _attached.get(path)
+    if entry is None:
+        # A new path means the parent republished; drop mappings of superseded blocks
+        for old_map, old_values in _attached.values():
+            old_values.release()
+            old_map.close()
+        _attached.clear()
+        with open(path, "rb") as block:
+            mapped = mmap.mmap(block.fileno(), 0, access=mmap.ACCESS_READ)
+        entry = _attached[path] = (mapped, memoryview(mapped).cast("d"))
+    return entry[1]
+
+
+def _score_shard(path: str, ruleset: rules.Ruleset, rows: int, start: int, stop: int,
+                 buckets: List[Tuple[str, bool]], k: int) -> Dict[Tuple[str, bool], List[Tuple[float, int]]]:
+    """Top-k (-rounded score, row) keys of one shard for each profile bucket"""
+    columns = _ShardColumns(_attach(path), ruleset.input_fields, rows, start, stop)
+    scores = score_universe(columns, ruleset)
+    shard_rows = range(start, stop)
+    results = {}
+    for risk, profit_focused in buckets:
+        weighted = weighted_scores(scores, risk, "low" if profit_focused else "medium")
+        keys = zip(map(float.__neg__, map(round, weighted, repeat(2))), shard_rows)
+        results[risk, profit_focused] = heapq.nsmallest(k, keys)
+    return results
+
+
+class ParallelScorer:
+    """Score a large asset universe across a process pool
+
+    The scoring columns are written once into a memory-mapped file (in
+    /dev/shm when available, so it never touches disk) that every worker maps
+    read-only, so tasks only carry the file path, the compiled rules and a
+    row range. Each worker returns its shard's top-k per profile bucket and the
+    shards are merged in the parent, which gives exactly the single-process
+    ranking.
+    """
+
+    def __init__(self, assets: AssetTable, workers: Optional[int] = None, shards_per_worker: int = 4):
+        self.assets = assets
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self._block: Optional[str] = None
+        self._ruleset: Optional[rules.Ruleset] = None
+        self._stale = True
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        assets.add_listener(self._mark_stale)
+
+    def _mark_stale(self, row: int):
+        self._stale = True
+
+    def publish(self):
+        """Write the current scoring columns to a fresh shared block"""
+        ruleset = rules.current()
+        rows = len(self.assets)
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        fd, path = tempfile.mkstemp(prefix="cryptowise-", suffix=".cols", dir=directory)
+        with os.fdopen(fd, "wb") as block:
+            for field in ruleset.input_fields:
+                array("d", self.assets.column(field)).tofile(block)
+        self._release_block()
+        self._block, self._rows, self._ruleset = path, rows, ruleset
+        self._stale = False
+
+    def top_k(self, profiles: Iterable[InvestorProfile], k: int) -> Dict[InvestorProfile, List[str]]:
+        """Names of the k best assets for every profile, identical to the in-process ranking"""
+        if self._stale or self._ruleset is not rules.current():
+            self.publish()
+        profiles = list(profiles)
+        buckets = sorted({bucket_of(profile) for profile in profiles})
+        rows = self._rows
+        shards = max(1, min(rows, self.workers * self.shards_per_worker))
+        bounds = [rows * i // shards for i in range(shards + 1)]
+        futures = [self._pool.submit(_score_shard, self._block, self._ruleset, rows, start, stop, buckets, k)
+                   for start, stop in zip(bounds, bounds[1:])]
+        shard_results = [future.result() for future in futures]
+
+        merged = {}
+        for bucket in buckets:
+            best = heapq.nsmallest(k, heapq.merge(*(result[bucket] for result in shard_results)))
+            merged[bucket] = [self.assets.name_of(row) for _score, row in best]
+        return {profile: merged[bucket_of(profile)] for profile in profiles}
+
+    def _release_block(self):
+        if self._block is not None:
+            # Workers still mapping the old file keep it alive until they move on
+            os.unlink(self._block)
+            self._block = None
+
+    def close(self):
+        self.assets.remove_listener(self._mark_stale)
+        self._pool.shutdown(wait=True)
+        self._release_block()
+
+    def __enter__(self) -> "ParallelScorer":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
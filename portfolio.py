@@ -0,0 +1,362 @@
+import math
+import statistics
+from array import array
+from itertools import repeat
+from operator import add, mul, sub, truediv
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from asset_table import AssetTable
+from batch_scoring import score_universe, weighted_scores
+from price_history import PriceHistory
+from scoring import InvestorProfile
+
+PERIODS_PER_YEAR = 365  # Crypto trades every day, so daily returns annualize over 365 days
+
+# Profile answers -> portfolio constraints
+VOLATILITY_TARGETS = {"low": 0.35, "medium": 0.60, "high": 0.90}  # annualized ceiling
+RISK_AVERSION = {"low": 8.0, "medium": 4.0, "high": 2.0}  # lambda in mean-variance, scores scaled to 0..1
+POSITION_LIMITS = {"small": 0.25, "medium": 0.20, "large": 0.10}  # larger portfolios diversify more
+ESG_FLOORS = {"low": None, "medium": 5.0, "high": 7.0}  # minimum weighted environmental_score
+
+# Ceiling of each position-sizing band in generate_investment_advice, by final recommendation
+# code: "Avoid" gets nothing, 2-5%, 5-15%, and 15-25% for high-risk profiles only
+BAND_CEILINGS = (0.0, 0.05, 0.15, 0.25)
+MIN_WEIGHTED_SCORE = 1  # "Not Recommended" assets are never bought
+
+
+class SingleIndexRiskModel:
+    """Covariance of asset returns under a single market factor
+
+    Sigma = diag(residual variance) + market variance * beta beta^T, fitted on
+    daily returns against a market-cap weighted index. The structure keeps
+    every covariance product O(n) instead of O(n^2), which is what lets the
+    optimizer run on hundreds of assets in pure Python.
+    """
+
+    def __init__(self, names: Sequence[str], betas: Sequence[float], residual_variances: Sequence[float],
+                 market_variance: float):
+        self.names = list(names)
+        self.betas = array("d", betas)
+        self.residual_variances = array("d", residual_variances)
+        self.market_variance = market_variance
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_returns(cls, returns: Mapping[str, Sequence[float]], market_caps: Mapping[str, float],
+                     periods_per_year: int = PERIODS_PER_YEAR) -> "SingleIndexRiskModel":
+        """Fit on equally long per-period return series, annualizing the variances"""
+        names = list(returns)
+        if not names:
+            raise ValueError("No return series to fit the risk model on")
+        periods = len(returns[names[0]])
+        if periods < 3 or any(len(series) != periods for series in returns.values()):
+            raise ValueError("Return series must all cover the same periods (at least 3)")
+        total_cap = math.fsum(market_caps[name] for name in names)
+        market = [math.fsum(market_caps[name] * returns[name][t] for name in names) / total_cap
+                  for t in range(periods)]
+        market_variance = statistics.variance(market)
+        betas, residuals = [], []
+        for name in names:
+            series = returns[name]
+            beta = statistics.covariance(series, market) / market_variance if market_variance else 0.0
+            betas.append(beta)
+            # Floor keeps the diagonal positive for assets that move exactly with the index
+            residuals.append(max(statistics.variance(series) - beta * beta * market_variance, 1e-10)
+                             * periods_per_year)
+        return cls(names, betas, residuals, market_variance * periods_per_year)
+
+    @classmethod
+    def from_history(cls, history: PriceHistory, assets: AssetTable, lookback_days: int = 90,
+                     at: Optional[int] = None) -> "SingleIndexRiskModel":
+        """Fit on daily close-to-close returns of every table asset with enough stored bars"""
+        returns, caps = {}, {}
+        for name in history.assets():
+            if name not in assets:
+                continue
+            series = history.series(name)
+            if not len(series):
+                continue
+            end = series.timestamps[-1] if at is None else at
+            closes = series.daily_closes(end, lookback_days)
+            if closes is None or 0 in closes:
+                continue
+            returns[name] = [today / yesterday - 1 for yesterday, today in zip(closes, closes[1:])]
+            caps[name] = assets[name]["market_cap"]
+        return cls.from_returns(returns, caps)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def subset(self, names: Sequence[str]) -> Tuple[array, array]:
+        """Betas and residual variances of names, in that order"""
+        rows = [self._index[name] for name in names]
+        return (array("d", [self.betas[i] for i in rows]),
+                array("d", [self.residual_variances[i] for i in rows]))
+
+    def volatility(self, names: Sequence[str], weights: Sequence[float]) -> float:
+        betas, residuals = self.subset(names)
+        return _volatility(weights, betas, residuals, self.market_variance)
+
+
+def _volatility(weights: Sequence[float], betas: Sequence[float], residuals: Sequence[float],
+                market_variance: float) -> float:
+    exposure = math.fsum(map(mul, betas, weights))
+    variance = math.fsum(map(mul, residuals, map(mul, weights, weights))) + market_variance * exposure * exposure
+    return math.sqrt(max(variance, 0.0))
+
+
+class _Problem:
+    """max mu.w - lambda/2 w'Sigma w  s.t.  0 <= w <= cap, sum(w) = budget, esg.w >= 0
+
+    With the single-index covariance the optimal weights are clipped linear
+    functions of three multipliers: gamma (budget), eta (ESG floor) and kappa
+    (market exposure). Each KKT condition is monotone in its own multiplier,
+    so they are solved as nested one-dimensional root finds: gamma exactly by
+    a sweep over the kinks, kappa and eta by safeguarded regula falsi. No
+    step touches more than O(n log n) work.
+    """
+
+    def __init__(self, mu: List[float], esg: Optional[List[float]], caps: List[float], betas: array,
+                 residuals: array, market_variance: float, lam: float):
+        self.mu = mu
+        self.esg = esg
+        self.caps = caps
+        self.betas = betas
+        self.market_variance = market_variance
+        self.residuals = residuals
+        self.lam = lam
+        self.budget = min(1.0, math.fsum(caps))
+        self._inv_ld = [1 / (lam * d) for d in residuals]
+        self._cap_widths = list(map(truediv, caps, self._inv_ld))  # utility span from zero to cap
+        self._kink_changes = self._inv_ld + [-ild for ild in self._inv_ld]  # slope change at start, full
+        # b.w is bounded by the caps, which brackets every kappa root
+        scale = lam * market_variance
+        self._kappa_high = scale * math.fsum(max(-b, 0.0) * cap for b, cap in zip(betas, caps)) + 1e-12
+        self._kappa_low = -scale * math.fsum(max(b, 0.0) * cap for b, cap in zip(betas, caps)) - 1e-12
+
+    def _weights(self, eta: float, kappa: float) -> List[float]:
+        """Optimal weights for fixed eta and kappa, with gamma fitted to the budget"""
+        utility = map(add, self.mu, map(mul, self.betas, repeat(kappa)))
+        if eta:
+            utility = map(add, utility, map(mul, self.esg, repeat(eta)))
+        utility = list(utility)
+        gamma = self._fit_budget(utility)
+        raw = map(mul, map(sub, utility, repeat(gamma)), self._inv_ld)
+        return list(map(min, map(max, raw, repeat(0.0)), self.caps))
+
+    def _fit_budget(self, utility: List[float]) -> float:
+        """gamma at which the clipped weights add up to the budget
+
+        As gamma falls, an asset starts buying at its utility and is full at
+        utility - cap width, so the weight sum is piecewise linear; sweep its
+        kinks from the top until the budget is reached.
+        """
+        kinks = utility + list(map(sub, utility, self._cap_widths))
+        changes = self._kink_changes
+        total = slope = 0.0
+        previous = max(utility)
+        for kink in sorted(range(len(kinks)), key=kinks.__getitem__, reverse=True):
+            gamma, change = kinks[kink], changes[kink]
+            reached = total + slope * (previous - gamma)
+            if reached >= self.budget and slope > 0:
+                # Clamped to the segment: after a total that fell short of the budget by a rounding
+                # error, the slope of a flat stretch is a rounding residue too
+                return max(gamma, previous - (self.budget - total) / slope)
+            total, previous = reached, gamma
+            slope += change
+        return previous
+
+    def _exposure_gap(self, eta: float, kappa: float) -> Tuple[float, List[float]]:
+        """b.w + kappa / (lambda s): zero when kappa prices the portfolio's market exposure"""
+        weights = self._weights(eta, kappa)
+        return math.fsum(map(mul, self.betas, weights)) + kappa / (self.lam * self.market_variance), weights
+
+    def _solve_kappa(self, eta: float) -> List[float]:
+        return _increasing_root(lambda kappa: self._exposure_gap(eta, kappa), self._kappa_low, self._kappa_high)
+
+    def solve(self) -> List[float]:
+        weights = self._solve_kappa(0.0)
+        if self.esg is None or math.fsum(map(mul, self.esg, weights)) >= 0:
+            return weights
+        # ESG floor binds: raise its multiplier until the weighted environmental score clears it
+        def esg_gap(eta: float) -> Tuple[float, List[float]]:
+            weights = self._solve_kappa(eta)
+            return math.fsum(map(mul, self.esg, weights)), weights
+
+        high = 1.0
+        while esg_gap(high)[0] < 0 and high < 1e12:
+            high *= 8
+        return self._onto_floor(_increasing_root(esg_gap, 0.0, high, nonnegative=True))
+
+    def _onto_floor(self, weights: List[float]) -> List[float]:
+        """Close a rounding-sized ESG shortfall by moving weight from the worst to the best ESG holding"""
+        gap = math.fsum(map(mul, self.esg, weights))
+        if gap >= 0:
+            return weights
+        order = sorted(range(len(weights)), key=self.esg.__getitem__)
+        donor = next((i for i in order if weights[i] > 0), None)
+        receiver = next((i for i in reversed(order) if weights[i] < self.caps[i]), None)
+        if donor is None or receiver is None or self.esg[receiver] <= self.esg[donor]:
+            return weights
+        move = min(-gap / (self.esg[receiver] - self.esg[donor]), weights[donor],
+                   self.caps[receiver] - weights[receiver])
+        weights = list(weights)
+        weights[donor] -= move
+        weights[receiver] += move
+        return weights
+
+    def volatility(self, weights: List[float]) -> float:
+        return _volatility(weights, self.betas, self.residuals, self.market_variance)
+
+
+def _increasing_root(function, low: float, high: float, nonnegative: bool = False,
+                     tolerance: float = 1e-10, iterations: int = 100) -> List[float]:
+    """Illinois regula falsi on a nondecreasing function returning (value, weights)
+
+    Returns the weights at the first point within tolerance of the root,
+    on either side: on a flat stretch the value can sit a rounding error
+    below zero at every probe. If the search runs out first, nonnegative=True
+    returns the weights on the side where the function is >= 0.
+    """
+    f_low, low_weights = function(low)
+    f_high, high_weights = function(high)
+    if f_low >= 0:
+        return low_weights
+    if f_high <= 0:
+        return high_weights
+    side = 0
+    for _ in range(iterations):
+        middle = high - f_high * (high - low) / (f_high - f_low)
+        if not low < middle < high:
+            middle = (low + high) / 2
+        f_middle, weights = function(middle)
+        if abs(f_middle) <= tolerance:
+            return weights
+        if f_middle < 0:
+            low, f_low, low_weights = middle, f_middle, weights
+            if side == -1:
+                f_high /= 2
+            side = -1
+        else:
+            high, f_high, high_weights = middle, f_middle, weights
+            if side == 1:
+                f_low /= 2
+            side = 1
+        if high - low <= tolerance * (1 + abs(high)):
+            break
+    return high_weights if nonnegative or abs(f_high) < abs(f_low) else low_weights
+
+
+def optimize_portfolio(names: Sequence[str], scores: Sequence[float], environmental_scores: Sequence[float],
+                       risk_model: SingleIndexRiskModel, max_positions: Sequence[float],
+                       volatility_target: float, risk_aversion: float = 4.0,
+                       esg_floor: Optional[float] = None) -> Dict:
+    """Concrete weights for the given assets under position caps, an ESG floor and a volatility target
+
+    Maximizes the weighted score (the expected-return proxy, scaled to 0..1)
+    minus risk_aversion / 2 times the portfolio variance. When the result is
+    more volatile than the target, positions are scaled down pro rata and the
+    rest is held as cash. Raises ValueError when the ESG floor cannot be met
+    by any allocation.
+    """
+    top = max(scores, default=0.0)
+    if top <= 0:
+        raise ValueError("No asset has a positive score to allocate to")
+    betas, residuals = risk_model.subset(names)
+    esg = [score - esg_floor for score in environmental_scores] if esg_floor is not None else None
+    problem = _Problem([score / top for score in scores], esg, list(max_positions), betas, residuals,
+                       risk_model.market_variance, risk_aversion)
+    if esg is not None:
+        # Greedy best-ESG fill is the most the floor can be satisfied by
+        best, left = 0.0, problem.budget
+        for value, cap in sorted(zip(esg, problem.caps), reverse=True):
+            take = min(cap, left)
+            best, left = best + value * take, left - take
+        if best < -1e-9:
+            raise ValueError(f"No allocation reaches an environmental score of {esg_floor}")
+
+    weights = problem.solve()
+
+    volatility = problem.volatility(weights)
+    if volatility > volatility_target:
+        # Volatility is linear in the invested fraction: de-risk into cash
+        weights = [w * volatility_target / volatility for w in weights]
+        volatility = volatility_target
+    invested = math.fsum(weights)
+    return {
+        "weights": {name: w for name, w in zip(names, weights) if w > 1e-6},
+        "cash": max(0.0, 1.0 - invested),
+        "expected_volatility": volatility,
+        "environmental_score": (math.fsum(map(mul, environmental_scores, weights)) / invested
+                                if invested else None),
+        "weighted_score": math.fsum(map(mul, scores, weights)) / invested if invested else None,
+    }
+
+
+def allocate(assets: AssetTable, profile: InvestorProfile, risk_model: SingleIndexRiskModel,
+             max_position: Optional[float] = None, volatility_target: Optional[float] = None,
+             esg_floor: Optional[float] = None) -> Dict:
+    """Turn a profile's per-asset advice into a full allocation over the whole table
+
+    Position caps are the ceilings of the advice bands, limited further by
+    investment_amount; risk aversion and the volatility target follow
+    risk_tolerance and the ESG floor follows sustainability_preference unless
+    given explicitly.
+    Assets without a risk estimate are left out.
+    """
+    scores = score_universe(assets)
+    weighted = weighted_scores(scores, profile.risk_tolerance, profile.sustainability_preference)
+    limit = max_position if max_position is not None else POSITION_LIMITS[profile.investment_amount]
+    environmental = assets.column("environmental_score")
+
+    names, candidate_scores, candidate_esg, caps = [], [], [], []
+    for row, (name, score) in enumerate(zip(scores["names"], weighted)):
+        if score < MIN_WEIGHTED_SCORE or name not in risk_model:
+            continue
+        band = 3 if score >= 7 and profile.risk_tolerance == "high" else 2 if score >= 4 else 1
+        names.append(name)
+        candidate_scores.append(score)
+        candidate_esg.append(environmental[row])
+        caps.append(min(BAND_CEILINGS[band], limit))
+    if not names:
+        raise ValueError("No recommended asset has price history to size a position with")
+
+    result = optimize_portfolio(
+        names, candidate_scores, candidate_esg, risk_model, caps,
+        volatility_target if volatility_target is not None else VOLATILITY_TARGETS[profile.risk_tolerance],
+        RISK_AVERSION[profile.risk_tolerance],
+        esg_floor if esg_floor is not None else ESG_FLOORS[profile.sustainability_preference])
+    result["weights"] = dict(sorted(result["weights"].items(), key=lambda item: -item[1]))
+    return result
+
+
+def main():
+    """Print a concrete allocation for one investor profile"""
+    import argparse
+
+    from WEEK1 import CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="Build a CryptoWise AI portfolio allocation")
+    parser.add_argument("history", metavar="DIR", help="OHLCV price history directory for the risk model")
+    for field, choices in (("risk_tolerance", VOLATILITY_TARGETS), ("investment_amount", POSITION_LIMITS),
+                           ("sustainability_preference", ESG_FLOORS)):
+        parser.add_argument("--" + field.replace("_", "-"), choices=list(choices), default="medium")
+    parser.add_argument("--lookback", type=int, default=90, help="days of returns for the risk model")
+    args = parser.parse_args()
+
+    assets = CryptoInvestmentBot().crypto_data
+    profile = InvestorProfile(risk_tolerance=args.risk_tolerance, investment_amount=args.investment_amount,
+                              sustainability_preference=args.sustainability_preference)
+    result = allocate(assets, profile, SingleIndexRiskModel.from_history(PriceHistory(args.history), assets,
+                                                                         args.lookback))
+    print("💼 Suggested allocation:")
+    for name, weight in result["weights"].items():
+        print(f"  {name.title():<15} {weight:>7.1%}")
+    print(f"  {'Cash':<15} {result['cash']:>7.1%}")
+    print(f"📉 Expected volatility: {result['expected_volatility']:.1%} a year")
+    if result["environmental_score"] is not None:
+        print(f"🌱 Environmental score: {result['environmental_score']:.1f}/10")
+
+
+if __name__ == "__main__":
+    main()
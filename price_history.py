@@ -0,0 +1,279 @@
+import math
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# On-disk layout, one append-only file per asset:
+#   header  8s magic, I record size, I reserved          (16 bytes)
+#   records q timestamp (epoch seconds), d open, d high, d low, d close, d volume  (48 bytes each)
+# Every record is 8-byte aligned, so the record area can be viewed as flat int64/float64
+# arrays and each column is a strided memoryview over the mapping.
+MAGIC = b"CWOHLCV1"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<qddddd")
+FIELDS_PER_RECORD = RECORD.size // 8
+OPEN, HIGH, LOW, CLOSE, VOLUME = 1, 2, 3, 4, 5
+SUFFIX = ".ohlcv"
+
+DAY = 24 * 60 * 60
+TREND_WINDOWS = {"price_change_24h": DAY, "price_change_7d": 7 * DAY, "price_change_30d": 30 * DAY}
+
+Bar = Tuple[int, float, float, float, float, float]
+
+
+class BarSeries:
+    """Read-only, memory-mapped view of one asset's bars
+
+    Columns are zero-copy strided views, so timestamps and closes of millions
+    of bars are never materialized as Python objects.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._map is None or size < HEADER.size:
+            raise ValueError(f"Not a price history file: {path}")
+        magic, record_size, _reserved = HEADER.unpack_from(self._map)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"Not a price history file: {path}")
+        # Ignore a torn trailing record left by an interrupted append
+        self.size = size
+        count = (size - HEADER.size) // RECORD.size
+        body = memoryview(self._map)[HEADER.size:HEADER.size + count * RECORD.size]
+        self._floats = body.cast("d")
+        self._ints = body.cast("q")
+        self.timestamps = self._ints[0::FIELDS_PER_RECORD]
+        self.opens = self._floats[OPEN::FIELDS_PER_RECORD]
+        self.highs = self._floats[HIGH::FIELDS_PER_RECORD]
+        self.lows = self._floats[LOW::FIELDS_PER_RECORD]
+        self.closes = self._floats[CLOSE::FIELDS_PER_RECORD]
+        self.volumes = self._floats[VOLUME::FIELDS_PER_RECORD]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, i: int) -> Bar:
+        return (self.timestamps[i], self.opens[i], self.highs[i], self.lows[i], self.closes[i], self.volumes[i])
+
+    def index_at(self, ts: int) -> int:
+        """Index of the last bar at or before ts, -1 if the series starts later"""
+        return bisect_right(self.timestamps, ts) - 1
+
+    def close_at(self, ts: int) -> Optional[float]:
+        i = self.index_at(ts)
+        return self.closes[i] if i >= 0 else None
+
+    def daily_closes(self, end: int, days: int) -> Optional[List[float]]:
+        """Closes at end and at each of the days before it, None unless each has a bar in the day up to it
+
+        Unlike close_at, a bar older than a day does not stand in for a
+        missing one, so a gap in the history cannot pass for flat prices.
+        """
+        closes = []
+        for day in range(days, -1, -1):
+            ts = end - day * DAY
+            i = self.index_at(ts)
+            if i < 0 or ts - self.timestamps[i] >= DAY:
+                return None
+            closes.append(self.closes[i])
+        return closes
+
+    def change(self, window: int, at: Optional[int] = None) -> Optional[float]:
+        """Percent close-to-close change over the last window seconds, None without enough history"""
+        if not len(self):
+            return None
+        end = len(self) - 1 if at is None else self.index_at(at)
+        if end < 0:
+            return None
+        start = self.index_at(self.timestamps[end] - window)
+        if start < 0 or self.closes[start] == 0:
+            return None
+        return (self.closes[end] / self.closes[start] - 1) * 100
+
+    def trend_changes(self, at: Optional[int] = None) -> Dict[str, float]:
+        """price_change_24h/7d/30d as stored in the asset table, for windows with enough history"""
+        changes = {}
+        for field, window in TREND_WINDOWS.items():
+            change = self.change(window, at)
+            if change is not None and math.isfinite(change):
+                changes[field] = round(change, 2)
+        return changes
+
+    def rolling(self, window: int, stat: str = "mean", column: str = "closes") -> array:
+        """Rolling statistic over the last window bars for every bar, NaN until the window fills"""
+        roller = RollingWindow(window)
+        out = array("d")
+        for value in getattr(self, column):
+            roller.push(value)
+            out.append(getattr(roller, stat)() if roller.full else math.nan)
+        return out
+
+    def close(self):
+        try:
+            for view in (self.timestamps, self.opens, self.highs, self.lows, self.closes, self.volumes,
+                         self._floats, self._ints):
+                view.release()
+            self._map.close()
+        except BufferError:
+            pass  # A caller still holds a view; the mapping is freed once it is dropped
+
+
+class RollingWindow:
+    """Fixed-size rolling window with O(1) amortized push
+
+    Keeps a running mean and sum of squared deviations (Welford's update,
+    applied in reverse when a value leaves) and monotonic deques for
+    min/max, so no statistic rescans the window.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self._values: deque = deque()
+        self._mins: deque = deque()
+        self._maxs: deque = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._pushed = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._values) == self.size
+
+    def push(self, value: float):
+        if len(self._values) == self.size:
+            old_index, old = self._values.popleft()
+            remaining = len(self._values)
+            if remaining:
+                delta = old - self._mean
+                self._mean -= delta / remaining
+                self._m2 -= delta * (old - self._mean)
+            else:
+                self._mean = self._m2 = 0.0
+            if self._mins[0][0] == old_index:
+                self._mins.popleft()
+            if self._maxs[0][0] == old_index:
+                self._maxs.popleft()
+        index = self._pushed
+        self._pushed += 1
+        self._values.append((index, value))
+        delta = value - self._mean
+        self._mean += delta / len(self._values)
+        self._m2 += delta * (value - self._mean)
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((index, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((index, value))
+
+    def mean(self) -> float:
+        return self._mean
+
+    def variance(self) -> float:
+        """Sample variance (n - 1)"""
+        n = len(self._values)
+        if n < 2:
+            return 0.0
+        return max(0.0, self._m2 / (n - 1))
+
+    def std(self) -> float:
+        return math.sqrt(self.variance())
+
+    def min(self) -> float:
+        return self._mins[0][1]
+
+    def max(self) -> float:
+        return self._maxs[0][1]
+
+
+class PriceHistory:
+    """Directory of append-only OHLCV files, one per asset"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._series: Dict[str, BarSeries] = {}
+        self._last_ts: Dict[str, int] = {}
+
+    def path_for(self, asset: str) -> str:
+        if not asset or os.sep in asset or (os.altsep and os.altsep in asset) or asset.startswith("."):
+            raise ValueError(f"Invalid asset name for price history: {asset!r}")
+        return os.path.join(self.directory, asset + SUFFIX)
+
+    def assets(self) -> List[str]:
+        return sorted(name[:-len(SUFFIX)] for name in os.listdir(self.directory) if name.endswith(SUFFIX))
+
+    def append(self, asset: str, bars: Iterable[Bar]) -> int:
+        """Append bars in timestamp order and return how many were written"""
+        path = self.path_for(asset)
+        last_ts = self._last_timestamp(asset, path)
+        chunk = bytearray()
+        for bar in bars:
+            ts = bar[0]
+            if last_ts is not None and ts <= last_ts:
+                raise ValueError(f"Bars for {asset} must be appended in increasing time order "
+                                 f"({ts} after {last_ts})")
+            chunk += RECORD.pack(*bar)
+            last_ts = ts
+        if not chunk:
+            return 0
+        with open(path, "ab") as handle:
+            end = handle.tell()
+            if end == 0:
+                handle.write(HEADER.pack(MAGIC, RECORD.size, 0))
+            elif (end - HEADER.size) % RECORD.size:
+                # Drop a torn trailing record left by an interrupted append, or every new bar would be misaligned
+                handle.truncate(end - (end - HEADER.size) % RECORD.size)
+            handle.write(chunk)
+        self._last_ts[asset] = last_ts
+        return len(chunk) // RECORD.size
+
+    def _last_timestamp(self, asset: str, path: str) -> Optional[int]:
+        if asset in self._last_ts:
+            return self._last_ts[asset]
+        if not os.path.exists(path):
+            return None
+        series = self.series(asset)
+        return series.timestamps[-1] if len(series) else None
+
+    def series(self, asset: str) -> BarSeries:
+        """Memory-mapped bars of an asset, remapped when the file has grown"""
+        path = self.path_for(asset)
+        series = self._series.get(asset)
+        if series is not None and series.size == os.path.getsize(path):
+            return series
+        # The superseded mapping stays valid for anyone still holding it and is freed with it
+        series = self._series[asset] = BarSeries(path)
+        return series
+
+    def trend_changes(self, asset: str, at: Optional[int] = None) -> Dict[str, float]:
+        return self.series(asset).trend_changes(at)
+
+    def apply_to(self, table, at: Optional[int] = None) -> int:
+        """Refresh the 24h/7d/30d changes of every table asset that has history, return how many changed"""
+        updated = 0
+        for asset in self.assets():
+            if asset in table:
+                changes = self.trend_changes(asset, at)
+                if changes:
+                    table.update(asset, changes)
+                    updated += 1
+        return updated
+
+    def iter_bars(self, asset: str) -> Iterator[Bar]:
+        series = self.series(asset)
+        for i in range(len(series)):
+            yield series[i]
+
+    def close(self):
+        for series in self._series.values():
+            series.close()
+        self._series.clear()
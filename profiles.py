@@ -0,0 +1,205 @@
+import itertools
+import struct
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from scoring import INVESTMENT_AMOUNTS, RISK_LEVELS, SUSTAINABILITY_LEVELS, TIME_HORIZONS, InvestorProfile
+
+# Every profile is one of 3^4 answer combinations, stored as a one-byte code in mixed radix
+# (risk, amount, horizon, sustainability), so PROFILES[code] is the decoded, shared instance
+PROFILES: Tuple[InvestorProfile, ...] = tuple(InvestorProfile(*answers) for answers in itertools.product(
+    RISK_LEVELS, INVESTMENT_AMOUNTS, TIME_HORIZONS, SUSTAINABILITY_LEVELS))
+_CODES: Dict[InvestorProfile, int] = {profile: code for code, profile in enumerate(PROFILES)}
+
+# File layout: 8s magic, Q user count, then count code bytes, then the user ids joined by "\n"
+MAGIC = b"CWPROF01"
+HEADER = struct.Struct("<8sQ")
+
+
+def encode(profile: InvestorProfile) -> int:
+    """One-byte code of a profile"""
+    return _CODES[profile]
+
+
+def decode(code: int) -> InvestorProfile:
+    return PROFILES[code]
+
+
+class ProfileStore:
+    """Investor profiles of many users, one byte each
+
+    Users are kept in insertion order in parallel columns (id list, code
+    array); removing a user moves the last one into its slot, so every
+    operation is O(1) and the columns stay dense.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._codes = array("B")
+
+    @classmethod
+    def from_profiles(cls, profiles: Mapping[str, InvestorProfile]) -> "ProfileStore":
+        store = cls()
+        for user_id, profile in profiles.items():
+            store.set(user_id, profile)
+        return store
+
+    def set(self, user_id: str, profile: InvestorProfile):
+        """Add a user or replace their profile"""
+        if "\n" in user_id:
+            raise ValueError(f"Invalid user id: {user_id!r}")
+        code = _CODES[profile]
+        row = self._index.get(user_id)
+        if row is None:
+            self._index[user_id] = len(self._ids)
+            self._ids.append(user_id)
+            self._codes.append(code)
+        else:
+            self._codes[row] = code
+
+    def get(self, user_id: str) -> InvestorProfile:
+        return PROFILES[self._codes[self._index[user_id]]]
+
+    def code_of(self, user_id: str) -> int:
+        return self._codes[self._index[user_id]]
+
+    def remove(self, user_id: str):
+        row = self._index.pop(user_id)
+        last_id = self._ids.pop()
+        last_code = self._codes.pop()
+        if row < len(self._ids):
+            self._ids[row] = last_id
+            self._codes[row] = last_code
+            self._index[last_id] = row
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def items(self) -> Iterator[Tuple[str, InvestorProfile]]:
+        return zip(self._ids, map(PROFILES.__getitem__, self._codes))
+
+    def codes(self) -> array:
+        """Profile code of every user, in iteration order (read-only by convention)"""
+        return self._codes
+
+    def counts(self) -> Dict[InvestorProfile, int]:
+        """Number of users per distinct profile"""
+        return {PROFILES[code]: count for code, count in sorted(Counter(self._codes).items())}
+
+    def save(self, path: str):
+        with open(path, "wb") as handle:
+            handle.write(HEADER.pack(MAGIC, len(self)))
+            self._codes.tofile(handle)
+            handle.write("\n".join(self._ids).encode())
+
+    @classmethod
+    def load(cls, path: str) -> "ProfileStore":
+        with open(path, "rb") as handle:
+            data = handle.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Not a profile store file: {path}")
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) < HEADER.size + count:
+            raise ValueError(f"Not a profile store file: {path}")
+        store = cls()
+        store._codes.frombytes(data[HEADER.size:HEADER.size + count])
+        if count and max(store._codes) >= len(PROFILES):
+            raise ValueError(f"Invalid profile code in {path}")
+        store._ids = data[HEADER.size + count:].decode().split("\n") if count else []
+        if len(store._ids) != count:
+            raise ValueError(f"{path} holds {len(store._ids)} user ids for {count} profiles")
+        store._index = dict(zip(store._ids, range(count)))
+        return store
+
+    def __repr__(self) -> str:
+        return f"ProfileStore({len(self)} users)"
+
+
+class PersonalizedBatch:
+    """Per-user results computed once per distinct profile
+
+    Every user with the same profile gets the very same result object, so
+    results must be treated as read-only.
+    """
+
+    def __init__(self, store: ProfileStore, results: Dict[int, Any]):
+        self.store = store
+        self._results = results
+
+    @property
+    def combinations(self) -> int:
+        """Distinct profiles actually computed"""
+        return len(self._results)
+
+    def for_profile(self, profile: InvestorProfile) -> Any:
+        return self._results[_CODES[profile]]
+
+    def __getitem__(self, user_id: str) -> Any:
+        return self._results[self.store.code_of(user_id)]
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.store, map(self._results.__getitem__, self.store.codes()))
+
+
+def personalize_all(store: ProfileStore, compute: Callable[[InvestorProfile], Any]) -> PersonalizedBatch:
+    """Run compute once for each distinct profile in the store and share the results"""
+    return PersonalizedBatch(store, {code: compute(PROFILES[code]) for code in sorted(set(store.codes()))})
+
+
+def random_store(users: int, seed: int = 42, weights: Optional[Iterable[float]] = None) -> ProfileStore:
+    """Synthetic store of users with random profiles, for benchmarks and demos"""
+    import random
+
+    rng = random.Random(seed)
+    store = ProfileStore()
+    store._codes = array("B", rng.choices(range(len(PROFILES)), weights=weights, k=users))
+    store._ids = [f"user{i}" for i in range(users)]
+    store._index = dict(zip(store._ids, range(users)))
+    return store
+
+
+def main():
+    """Batch-personalize recommendations for a profile store"""
+    import argparse
+    import json
+    import time
+
+    from WEEK1 import CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="Personalized recommendations for every user in a profile store")
+    parser.add_argument("store", nargs="?", metavar="PATH", help="profile store file (default: random users)")
+    parser.add_argument("--users", type=int, default=1_000_000, help="random users when no store is given")
+    parser.add_argument("--top", type=int, default=3, help="recommendations per user")
+    parser.add_argument("--output", "-o", metavar="PATH", help="write one JSON line per distinct profile")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = ProfileStore.load(args.store) if args.store else random_store(args.users)
+    loaded = time.perf_counter()
+    service = CryptoInvestmentBot().service
+    batch = service.top_recommendations_batch(store, args.top)
+    done = time.perf_counter()
+
+    print(f"👥 {len(store):,} users, {batch.combinations} distinct profiles")
+    print(f"⏱️  store {(loaded - started) * 1000:.1f} ms, recommendations {(done - loaded) * 1000:.1f} ms")
+    if args.output:
+        counts = store.counts()
+        with open(args.output, "w") as output:
+            for profile, users in counts.items():
+                output.write(json.dumps({"profile": profile.to_dict(), "users": users,
+                                         "recommendations": batch.for_profile(profile)}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+import csv
+import json
+import os
+import sys
+from typing import IO, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from scoring import InvestorProfile
+
+FORMATS = ("text", "json", "csv")
+SUFFIX_FORMATS = {".txt": "text", ".json": "json", ".jsonl": "json", ".csv": "csv"}
+PROFILE_FIELDS = ("risk_tolerance", "investment_amount", "time_horizon", "sustainability_preference")
+
+
+class Report:
+    """Rendered view of one result, produced on demand in any output format
+
+    lines() is the exact console rendering (one print call per item, which
+    may start with a blank line), to_dict() the JSON form and records() the
+    flat rows of the CSV form, whose columns are the class's fields.
+    Nothing is formatted until one of them is called.
+    """
+
+    kind = "report"
+    fields: Tuple[str, ...] = ()
+
+    def lines(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict:
+        raise NotImplementedError
+
+    def records(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        return "\n".join(self.lines())
+
+    def display(self, file: Optional[IO[str]] = None):
+        """Write the console rendering to file (stdout by default)"""
+        (file or sys.stdout).write(self.render() + "\n")
+
+
+def _profile_columns(profile: Optional[InvestorProfile]) -> Dict:
+    return profile.to_dict() if profile is not None else dict.fromkeys(PROFILE_FIELDS, "")
+
+
+class DetailedAnalysisReport(Report):
+    """One asset's personalized recommendation with its market data"""
+
+    kind = "analysis"
+    fields = PROFILE_FIELDS + (
+        "crypto", "symbol", "current_price", "price_change_24h", "price_change_7d", "price_change_30d",
+        "market_cap", "profitability_score", "profitability_rating", "profitability_signals",
+        "profitability_recommendation", "sustainability_score", "sustainability_rating", "environmental_rating",
+        "sustainability_factors", "sustainability_recommendation", "weighted_score", "final_recommendation",
+        "investment_advice",
+    )
+
+    def __init__(self, rec: Dict, data: Mapping, profile: Optional[InvestorProfile] = None):
+        self.rec = rec
+        self.data = data
+        self.profile = profile
+
+    def lines(self) -> Iterator[str]:
+        rec, data = self.rec, self.data
+        profitability, sustainability = rec["profitability"], rec["sustainability"]
+        yield "\n" + "="*60
+        yield f"📈 DETAILED ANALYSIS: {rec['crypto']} ({rec['symbol']})"
+        yield "="*60
+
+        # Current data
+        yield f"💰 Current Price: ${data['current_price']:,.2f}"
+        yield f"📊 24h Change: {data['price_change_24h']:+.1f}%"
+        yield f"📊 7d Change: {data['price_change_7d']:+.1f}%"
+        yield f"📊 30d Change: {data['price_change_30d']:+.1f}%"
+        yield f"🏛️ Market Cap: ${data['market_cap']:,.0f}"
+
+        # Profitability Analysis
+        yield "\n🎯 PROFITABILITY ANALYSIS"
+        yield f"Rating: {profitability['rating']} (Score: {profitability['score']}/10)"
+        yield f"Signals: {', '.join(profitability['signals'])}"
+        yield f"Recommendation: {profitability['recommendation']}"
+
+        # Sustainability Analysis
+        yield "\n🌱 SUSTAINABILITY ANALYSIS"
+        yield f"Rating: {sustainability['rating']} (Score: {sustainability['score']}/10)"
+        yield f"Environmental Rating: {data['environmental_rating']}"
+        yield f"Factors: {', '.join(sustainability['factors'])}"
+        yield f"Recommendation: {sustainability['recommendation']}"
+
+        # Final Recommendation
+        yield "\n⭐ FINAL RECOMMENDATION"
+        yield f"Overall Score: {rec['weighted_score']}/10"
+        yield f"Verdict: {rec['final_recommendation']}"
+        yield f"Investment Advice: {rec['investment_advice']}"
+
+    def to_dict(self) -> Dict:
+        data = self.data
+        result = {"report": self.kind}
+        if self.profile is not None:
+            result["profile"] = self.profile.to_dict()
+        result.update(self.rec)
+        result["market"] = {field: data[field] for field in (
+            "current_price", "price_change_24h", "price_change_7d", "price_change_30d", "market_cap")}
+        result["environmental_rating"] = data["environmental_rating"]
+        return result
+
+    def records(self) -> Iterator[Dict]:
+        rec, data = self.rec, self.data
+        profitability, sustainability = rec["profitability"], rec["sustainability"]
+        record = _profile_columns(self.profile)
+        record.update(
+            crypto=rec["crypto"], symbol=rec["symbol"], current_price=data["current_price"],
+            price_change_24h=data["price_change_24h"], price_change_7d=data["price_change_7d"],
+            price_change_30d=data["price_change_30d"], market_cap=data["market_cap"],
+            profitability_score=profitability["score"], profitability_rating=profitability["rating"],
+            profitability_signals="; ".join(profitability["signals"]),
+            profitability_recommendation=profitability["recommendation"],
+            sustainability_score=sustainability["score"], sustainability_rating=sustainability["rating"],
+            environmental_rating=data["environmental_rating"],
+            sustainability_factors="; ".join(sustainability["factors"]),
+            sustainability_recommendation=sustainability["recommendation"],
+            weighted_score=rec["weighted_score"], final_recommendation=rec["final_recommendation"],
+            investment_advice=rec["investment_advice"],
+        )
+        yield record
+
+
+class TopRecommendationsReport(Report):
+    """Best assets for a profile, best first"""
+
+    kind = "top"
+    fields = PROFILE_FIELDS + ("rank", "crypto", "symbol", "current_price", "weighted_score",
+                               "final_recommendation", "investment_advice")
+
+    def __init__(self, recs: Sequence[Dict], assets: Mapping, profile: Optional[InvestorProfile] = None):
+        self.recs = recs
+        self.assets = assets
+        self.profile = profile
+
+    def _price(self, rec: Dict) -> float:
+        return self.assets[rec["crypto"].lower()]["current_price"]
+
+    def lines(self) -> Iterator[str]:
+        yield "\n" + "="*60
+        yield "🎯 TOP RECOMMENDATIONS FOR YOUR PROFILE"
+        yield "="*60
+
+        for i, rec in enumerate(self.recs, 1):
+            yield f"\n{i}. {rec['crypto']} ({rec['symbol']})"
+            yield f"   💰 Price: ${self._price(rec):,.2f}"
+            yield f"   ⭐ Score: {rec['weighted_score']}/10"
+            yield f"   📈 Recommendation: {rec['final_recommendation']}"
+            yield f"   💡 Advice: {rec['investment_advice']}"
+
+    def to_dict(self) -> Dict:
+        result = {"report": self.kind}
+        if self.profile is not None:
+            result["profile"] = self.profile.to_dict()
+        result["recommendations"] = [dict(rec, current_price=self._price(rec)) for rec in self.recs]
+        return result
+
+    def records(self) -> Iterator[Dict]:
+        profile = _profile_columns(self.profile)
+        for rank, rec in enumerate(self.recs, 1):
+            yield dict(profile, rank=rank, crypto=rec["crypto"], symbol=rec["symbol"],
+                       current_price=self._price(rec), weighted_score=rec["weighted_score"],
+                       final_recommendation=rec["final_recommendation"],
+                       investment_advice=rec["investment_advice"])
+
+
+class ComparisonReport(Report):
+    """Side-by-side rows of RecommendationService.compare"""
+
+    kind = "comparison"
+    fields = ("crypto", "symbol", "current_price", "price_change_24h", "price_change_30d",
+              "profitability_rating", "sustainability_rating", "weighted_score")
+
+    def __init__(self, rows: Sequence[Dict], profile: Optional[InvestorProfile] = None):
+        self.rows = rows
+        self.profile = profile
+
+    def lines(self) -> Iterator[str]:
+        yield "\n" + "="*80
+        yield "⚖️ CRYPTOCURRENCY COMPARISON"
+        yield "="*80
+
+        # Headers
+        yield f"{'Crypto':<12} {'Price':<12} {'24h%':<8} {'30d%':<8} {'Profit':<12} {'Sustain':<12} {'Score':<8}"
+        yield "-" * 80
+
+        # Comparison data
+        for row in self.rows:
+            yield (f"{row['crypto']:<12} "
+                   f"${row['current_price']:<11,.2f} "
+                   f"{row['price_change_24h']:+6.1f}% "
+                   f"{row['price_change_30d']:+6.1f}% "
+                   f"{row['profitability_rating']:<12} "
+                   f"{row['sustainability_rating']:<12} "
+                   f"{row['weighted_score']:<8.1f}")
+
+    def to_dict(self) -> Dict:
+        result = {"report": self.kind}
+        if self.profile is not None:
+            result["profile"] = self.profile.to_dict()
+        result["rows"] = list(self.rows)
+        return result
+
+    def records(self) -> Iterator[Dict]:
+        return iter(self.rows)
+
+
+class MarketOverviewReport(Report):
+    """Market totals, per-asset rows and sentiment of RecommendationService.market_overview"""
+
+    kind = "market_overview"
+    fields = ("crypto", "symbol", "current_price", "price_change_24h", "market_cap")
+
+    def __init__(self, overview: Dict):
+        self.overview = overview
+
+    def lines(self) -> Iterator[str]:
+        overview = self.overview
+        yield "\n" + "="*60
+        yield "🌐 CRYPTOCURRENCY MARKET OVERVIEW"
+        yield "="*60
+
+        yield f"📊 Total Market Cap: ${overview['total_market_cap']:,.0f}"
+        yield f"📈 24h Volume: ${overview['total_volume']:,.0f}"
+
+        yield f"\n{'Cryptocurrency':<15} {'Price':<12} {'24h Change':<12} {'Market Cap':<15}"
+        yield "-" * 60
+
+        for asset in overview["assets"]:
+            change_color = "📈" if asset["price_change_24h"] >= 0 else "📉"
+            yield (f"{asset['crypto']:<15} "
+                   f"${asset['current_price']:<11,.2f} "
+                   f"{change_color}{asset['price_change_24h']:+6.1f}% "
+                   f"${asset['market_cap']:>14,.0f}")
+
+        # Market sentiment
+        sentiment = "Bullish 🐂" if overview["sentiment"] == "Bullish" else "Bearish 🐻"
+        yield f"\n🎭 Market Sentiment: {sentiment}"
+        yield f"📊 Positive Performers: {overview['positive_performers']}/{overview['total_assets']}"
+
+    def to_dict(self) -> Dict:
+        return {"report": self.kind, **self.overview}
+
+    def records(self) -> Iterator[Dict]:
+        return iter(self.overview["assets"])
+
+
+def format_for_path(path: str) -> str:
+    """Output format implied by a file suffix, text when unknown"""
+    return SUFFIX_FORMATS.get(os.path.splitext(path)[1].lower(), "text")
+
+
+class ReportWriter:
+    """Buffered bulk writer of reports as text, JSON lines or CSV
+
+    Rendered pieces are collected in memory and handed to the stream in
+    chunks of about buffer_size characters, so writing millions of reports
+    costs a few large writes instead of one call per line. A CSV file holds
+    one kind of report; its header comes from the first report written.
+    """
+
+    def __init__(self, target: Union[str, IO[str]], fmt: Optional[str] = None, buffer_size: int = 1 << 20):
+        if fmt is None:
+            fmt = format_for_path(target) if isinstance(target, str) else "text"
+        if fmt not in FORMATS:
+            raise ValueError(f"Invalid report format: {fmt!r} (expected one of {', '.join(FORMATS)})")
+        self.format = fmt
+        self.buffer_size = buffer_size
+        self._owned = isinstance(target, str)
+        self._stream = (open(target, "w", newline="" if fmt == "csv" else None, encoding="utf-8",
+                             buffering=buffer_size) if self._owned else target)
+        self._chunk: List[str] = []
+        self._pending = 0
+        self._csv = None
+        self._csv_kind: Optional[str] = None
+        self.reports = 0
+        self.records = 0
+
+    def write(self, piece: str):
+        """Buffer raw text (also the file-like interface the csv module writes through)"""
+        self._chunk.append(piece)
+        self._pending += len(piece)
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def write_report(self, report: Report):
+        if self.format == "text":
+            self.write(report.render() + "\n")
+        elif self.format == "json":
+            self.write(json.dumps(report.to_dict()) + "\n")
+            self.records += 1
+        else:
+            if self._csv is None:
+                self._csv = csv.DictWriter(self, report.fields, extrasaction="ignore")
+                self._csv_kind = report.kind
+                self._csv.writeheader()
+            elif report.kind != self._csv_kind:
+                raise ValueError(f"Cannot mix {report.kind} reports into a CSV of {self._csv_kind} reports")
+            for record in report.records():
+                self._csv.writerow(record)
+                self.records += 1
+        self.reports += 1
+
+    def write_all(self, reports: Iterable[Report]) -> int:
+        """Write every report of an iterable (consumed lazily), return how many were written"""
+        count = self.reports
+        for report in reports:
+            self.write_report(report)
+        return self.reports - count
+
+    def flush(self):
+        if self._chunk:
+            self._stream.write("".join(self._chunk))
+            self._chunk.clear()
+            self._pending = 0
+        self._stream.flush()
+
+    def close(self):
+        self.flush()
+        if self._owned:
+            self._stream.close()
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def analysis_reports(service, profiles: Iterable[InvestorProfile],
+                     cryptos: Optional[Iterable[str]] = None) -> Iterator[DetailedAnalysisReport]:
+    """Lazily built detailed analyses of every (profile, asset) pair, profile-major"""
+    names = list(cryptos) if cryptos is not None else list(service.assets)
+    assets = service.assets
+    for profile in profiles:
+        for name in names:
+            rec = service.analyze(profile, name)
+            yield DetailedAnalysisReport(rec, assets[service.resolve(name)], profile)
+
+
+def top_reports(service, profiles: Iterable[InvestorProfile], n: int = 3) -> Iterator[TopRecommendationsReport]:
+    """Lazily built top-n reports, one per profile"""
+    for profile in profiles:
+        yield TopRecommendationsReport(service.top_recommendations(profile, n), service.assets, profile)
+
+
+def main():
+    """Write nightly reports for many profiles to disk"""
+    import argparse
+    import time
+
+    from profiles import PROFILES, ProfileStore
+    from WEEK1 import DEFAULT_ASSETS, CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="Bulk CryptoWise AI reports as text, JSON lines or CSV")
+    parser.add_argument("output", metavar="PATH", help="report file (format from the suffix unless --format)")
+    parser.add_argument("--format", choices=FORMATS, help="output format")
+    parser.add_argument("--kind", choices=("analysis", "top", "market_overview"), default="analysis")
+    parser.add_argument("--profiles", metavar="PATH",
+                        help="profile store; its distinct profiles are reported (default: all 81)")
+    parser.add_argument("--top", type=int, default=3, help="assets per top report")
+    parser.add_argument("--snapshot", metavar="PATH", help="asset data from a snapshot instead of the bundled set")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        from snapshot import warm_start
+        service = warm_start(args.snapshot, DEFAULT_ASSETS).service
+    else:
+        service = CryptoInvestmentBot().service
+    profiles = (list(ProfileStore.load(args.profiles).counts()) if args.profiles else PROFILES)
+
+    started = time.perf_counter()
+    with ReportWriter(args.output, args.format) as writer:
+        if args.kind == "analysis":
+            writer.write_all(analysis_reports(service, profiles))
+        elif args.kind == "top":
+            writer.write_all(top_reports(service, profiles, args.top))
+        else:
+            writer.write_report(MarketOverviewReport(service.market_overview()))
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(args.output)
+    print(f"📝 {writer.reports:,} {args.kind} reports ({writer.format}, {size / 1e6:,.1f} MB) "
+          f"in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+RESULT_CACHE_SIZE = 100_000
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a size limit and hit/miss/eviction counts
+
+    Values are shared between every caller that gets them and must be
+    treated as read-only. A maxsize of 0 disables caching (every lookup
+    misses), which keeps call sites free of special cases.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE):
+        if maxsize < 0:
+            raise ValueError("Cache size cannot be negative")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            value = self._entries.get(key, self)
+            if value is self:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """Cached value for key, computed (outside the lock) and stored on a miss"""
+        value = self.get(key, self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def bounded_table(limit: int) -> Callable[[Hashable, Callable[[], object]], object]:
+    """Memo table for results drawn from a small discrete key space: shared(key, build)
+
+    Meant for values like rendered strings and analysis dicts, where the
+    number of distinct keys is bounded by the rules; the limit only guards
+    against a pathological ruleset and resets the table when reached.
+    """
+    table: Dict[Hashable, object] = {}
+
+    def shared(key: Hashable, build: Callable[[], object]):
+        value = table.get(key)
+        if value is None:
+            if len(table) >= limit:
+                table.clear()
+            value = table[key] = build()
+        return value
+
+    return shared
@@ -0,0 +1,238 @@
+import math
+from array import array
+from itertools import accumulate, repeat
+from operator import add, mul, sub, truediv
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from asset_table import RISK_COLUMNS, AssetTable
+from price_history import PriceHistory
+
+if TYPE_CHECKING:
+    from portfolio import SingleIndexRiskModel
+
+LOOKBACK_DAYS = 90
+# Volatility is quoted over a week, in percent, so it compares directly with price_change_7d
+VOLATILITY_DAYS = 7
+PERIODS_PER_YEAR = 365
+
+
+class RiskAnalytics:
+    """Realized volatility, max drawdown, beta and correlations of every asset with price history
+
+    Daily close-to-close returns over the lookback window are read once per
+    asset and kept as arrays; every metric is then a handful of whole-array
+    passes. Beta is measured against a market index of the same returns
+    weighted by the table's market_cap. Assets without a bar in every day of
+    the window are left unmeasured.
+
+    refresh() re-reads only the series whose file grew (or all of them when
+    the window moves to a new day), then recomputes the index and the
+    metrics, which costs milliseconds for thousands of assets. Correlation
+    rows are computed on first request and cached until the next refresh.
+    """
+
+    def __init__(self, history: PriceHistory, assets: AssetTable, lookback_days: int = LOOKBACK_DAYS):
+        if lookback_days < 3:
+            raise ValueError("The risk lookback must cover at least 3 days")
+        self.history = history
+        self.assets = assets
+        self.lookback_days = lookback_days
+        self.end: Optional[int] = None
+        self.names: List[str] = []
+        self.volatility = array("d")
+        self.max_drawdown = array("d")
+        self.beta = array("d")
+        self.market_variance = 0.0
+        self._read: Dict[str, Tuple[int, int]] = {}  # asset -> (file size, window end) it was read at
+        # asset -> (returns, centered returns, variance, standardized returns, max drawdown)
+        self._stats: Dict[str, Tuple[array, array, float, array, float]] = {}
+        self._variances = array("d")
+        self._standardized: List[array] = []
+        self._position: Dict[str, int] = {}
+        self._correlations: Dict[str, array] = {}
+        self.refresh()
+
+    def refresh(self, at: Optional[int] = None) -> int:
+        """Bring the metrics up to date with the stored bars and market caps, return how many series were read
+
+        The window ends at the latest stored bar, or at the given time.
+        """
+        series = {name: self.history.series(name) for name in self.history.assets() if name in self.assets}
+        ends = [bars.timestamps[-1] for bars in series.values() if len(bars)]
+        end = at if at is not None else max(ends, default=0)
+        read = 0
+        for name in list(self._read):
+            if name not in series:
+                self._forget(name)
+        for name, bars in series.items():
+            key = (bars.size, end)
+            if self._read.get(name) == key:
+                continue
+            self._read[name] = key
+            read += 1
+            closes = bars.daily_closes(end, self.lookback_days)
+            if closes is None or min(closes) <= 0:
+                self._stats.pop(name, None)
+                continue
+            self._stats[name] = _series_stats(closes)
+        self.end = end
+        self._compute()
+        return read
+
+    def _forget(self, name: str):
+        del self._read[name]
+        self._stats.pop(name, None)
+
+    def _compute(self):
+        names = sorted(self._stats)
+        periods = self.lookback_days
+        caps = self.assets.column("market_cap")
+        weights = [max(caps[self.assets.row_of(name)], 0.0) for name in names]
+        total = math.fsum(weights)
+
+        market = [0.0] * periods
+        if total > 0:
+            for name, weight in zip(names, weights):
+                if weight:
+                    market = list(map(add, market, map(mul, self._stats[name][0], repeat(weight / total))))
+        market_mean = math.fsum(market) / periods
+        market_centered = array("d", map(sub, market, repeat(market_mean)))
+        market_variance = math.fsum(map(mul, market_centered, market_centered)) / (periods - 1)
+
+        volatility, drawdown, beta, variances, standardized = (array("d"), array("d"), array("d"),
+                                                               array("d"), [])
+        volatility_scale = 100 * math.sqrt(VOLATILITY_DAYS)
+        for name in names:
+            _returns, centered, variance, unit, max_drawdown = self._stats[name]
+            variances.append(variance)
+            volatility.append(math.sqrt(variance) * volatility_scale)
+            drawdown.append(max_drawdown)
+            covariance = math.fsum(map(mul, centered, market_centered)) / (periods - 1)
+            beta.append(covariance / market_variance if market_variance else math.nan)
+            standardized.append(unit)
+
+        self.names = names
+        self.volatility, self.max_drawdown, self.beta = volatility, drawdown, beta
+        self.market_variance = market_variance
+        self._variances = variances
+        self._standardized = standardized
+        self._position = {name: i for i, name in enumerate(names)}
+        self._correlations = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._position
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _index(self, name: str) -> int:
+        position = self._position.get(name)
+        if position is None:
+            raise KeyError(f"No risk metrics for {name} (not enough price history)")
+        return position
+
+    def metrics(self, name: str) -> Dict[str, float]:
+        """Weekly volatility and max drawdown in percent, and beta to the market index"""
+        i = self._index(name)
+        return {"volatility": self.volatility[i], "max_drawdown": self.max_drawdown[i], "beta": self.beta[i]}
+
+    def correlations(self, name: str) -> array:
+        """Correlation of one asset's returns with every measured asset, in the order of names"""
+        row = self._correlations.get(name)
+        if row is None:
+            own = self._standardized[self._index(name)]
+            row = self._correlations[name] = array("d", map(sum, map(map, repeat(mul), repeat(own),
+                                                                     self._standardized)))
+        return row
+
+    def correlation(self, a: str, b: str) -> float:
+        return self.correlations(a)[self._index(b)]
+
+    def correlation_matrix(self, names: Optional[Sequence[str]] = None) -> List[array]:
+        """Correlation matrix of some assets (all measured ones by default), one array per row
+
+        Every entry is a dot product over the lookback window, so the full
+        matrix grows with the square of the universe: pass the assets of
+        interest rather than the whole universe when it is large.
+        """
+        if names is None:
+            return [self.correlations(name) for name in self.names]
+        columns = [self._index(name) for name in names]
+        return [array("d", map(self.correlations(name).__getitem__, columns)) for name in names]
+
+    def risk_model(self) -> "SingleIndexRiskModel":
+        """The portfolio optimizer's single-index covariance model, fitted on the same returns"""
+        from portfolio import SingleIndexRiskModel
+
+        market_variance = self.market_variance
+        betas = [beta if beta == beta else 0.0 for beta in self.beta]
+        # Floor keeps the diagonal positive for assets that move exactly with the index
+        residuals = [max(variance - beta * beta * market_variance, 1e-10) * PERIODS_PER_YEAR
+                     for variance, beta in zip(self._variances, betas)]
+        return SingleIndexRiskModel(self.names, betas, residuals, market_variance * PERIODS_PER_YEAR)
+
+    def apply_to(self, table: AssetTable) -> int:
+        """Store the metrics in the table's risk columns, return how many assets changed
+
+        Table assets without a measurement are reset to unmeasured (NaN).
+        """
+        metric_columns = dict(zip(RISK_COLUMNS, (self.volatility, self.max_drawdown, self.beta)))
+        updated = 0
+        for row, name in enumerate(table):
+            i = self._position.get(name)
+            values = {field: round(column[i], 4) if i is not None else math.nan
+                      for field, column in metric_columns.items()}
+            if all(map(_same, values.values(), (table.get_field(row, field) for field in RISK_COLUMNS))):
+                continue
+            table.update(name, values)
+            updated += 1
+        return updated
+
+
+def _series_stats(closes: List[float]) -> Tuple[array, array, float, array, float]:
+    """Returns, centered returns, variance, unit-length centered returns and max drawdown of closes"""
+    returns = array("d", map(sub, map(truediv, closes[1:], closes), repeat(1.0)))
+    centered = array("d", map(sub, returns, repeat(math.fsum(returns) / len(returns))))
+    squares = math.fsum(map(mul, centered, centered))
+    norm = math.sqrt(squares)
+    unit = array("d", map(truediv, centered, repeat(norm))) if norm else centered
+    max_drawdown = (min(map(truediv, closes, accumulate(closes, max))) - 1) * 100
+    return returns, centered, squares / (len(returns) - 1), unit, max_drawdown
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)  # NaN (unmeasured) equals itself here
+
+
+def main():
+    """Print the risk metrics of every asset with price history"""
+    import argparse
+
+    from WEEK1 import CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="Risk metrics of the CryptoWise AI assets from price history")
+    parser.add_argument("history", metavar="DIR", help="OHLCV price history directory")
+    parser.add_argument("--lookback", type=int, default=LOOKBACK_DAYS, help="days of daily returns")
+    parser.add_argument("--correlations", action="store_true", help="also print the correlation matrix")
+    args = parser.parse_args()
+
+    assets = CryptoInvestmentBot().crypto_data
+    analytics = RiskAnalytics(PriceHistory(args.history), assets, args.lookback)
+    if not len(analytics):
+        print(f"❌ No asset has {args.lookback} days of price history in {args.history}")
+        return
+    print(f"📉 Risk over the last {args.lookback} days:")
+    print(f"  {'Asset':<15} {'Volatility (7d)':>16} {'Max drawdown':>13} {'Beta':>6}")
+    for name in analytics.names:
+        metrics = analytics.metrics(name)
+        print(f"  {name.title():<15} {metrics['volatility']:>15.1f}% {metrics['max_drawdown']:>12.1f}% "
+              f"{metrics['beta']:>6.2f}")
+    if args.correlations:
+        print("🔗 Correlations:")
+        print("  " + " " * 15 + "".join(f"{name.title()[:7]:>8}" for name in analytics.names))
+        for name, row in zip(analytics.names, analytics.correlation_matrix()):
+            print(f"  {name.title():<15}" + "".join(f"{value:>8.2f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from bisect import bisect_right
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from asset_table import FLOAT_COLUMNS, INT_COLUMNS, RISK_COLUMNS
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_rules.json")
+RULES_ENV = "CRYPTOWISE_RULES"
+
+# Inputs computed from several asset fields, usable as a ladder field like any stored column
+DERIVED_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Mapping], float]]] = {
+    "volume_ratio": (("volume_24h", "market_cap"),
+                     lambda data: data["volume_24h"] / data["market_cap"] if data["market_cap"] > 0 else 0),
+    "tech_adoption_avg": (("technology_score", "adoption_score"),
+                          lambda data: (data["technology_score"] + data["adoption_score"]) / 2),
+    # Measured risk where price history provides it, else a neutral stand-in so assets without history
+    # are adjusted as before: the last weekly move for weekly volatility, no drawdown, the market's beta
+    "volatility": (("realized_volatility", "price_change_7d"),
+                   lambda data: _measured(data, "realized_volatility", abs(data["price_change_7d"]))),
+    "drawdown": (("max_drawdown",), lambda data: _measured(data, "max_drawdown", 0.0)),
+    "market_beta": (("beta",), lambda data: _measured(data, "beta", 1.0)),
+}
+ASSET_FIELDS = FLOAT_COLUMNS + INT_COLUMNS + RISK_COLUMNS
+
+_OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">=": float.__ge__, "<=": float.__le__, ">": float.__gt__, "<": float.__lt__,
+}
+
+# The allocation bands in the advice, the backtester and the optimizer map onto the verdict codes
+FINAL_RECOMMENDATION_TIERS = 4
+# Signal/factor messages are packed into one 64-bit mask per asset by the batch scorer
+MAX_MESSAGES = 64
+
+
+class RulesError(ValueError):
+    """A scoring rules table that cannot be compiled"""
+
+
+class Ladder:
+    """One compiled if/elif chain on a single field
+
+    The tiers are flattened into sorted breakpoints so that evaluating a value
+    is one bisect_right, whatever the number of tiers; each bucket carries
+    the outcome (points, message, label) of the tier that covers it.
+    NaN goes to the fallback bucket, the else tier, since it fails every
+    condition of the chain (bisect alone would put it in the top bucket).
+    """
+
+    __slots__ = ("field", "breaks", "outcomes", "fallback")
+
+    def __init__(self, field: str, breaks: Sequence[float], outcomes: Dict[str, tuple], fallback: int):
+        self.field = field
+        self.breaks = tuple(breaks)
+        self.outcomes = outcomes  # outcome key -> value for every bucket
+        self.fallback = fallback
+
+    def bucket(self, value: float) -> int:
+        if value != value:
+            return self.fallback
+        return bisect_right(self.breaks, value)
+
+    def __getitem__(self, key: str) -> tuple:
+        return self.outcomes[key]
+
+    def __len__(self) -> int:
+        return max(len(self.breaks), self.fallback) + 1
+
+    def __repr__(self) -> str:
+        return f"Ladder({self.field!r}, breaks={self.breaks})"
+
+
+class Ruleset:
+    """Compiled scoring rules: score ladders, ratings, risk adjustments and verdicts"""
+
+    def __init__(self, profitability: Sequence[Ladder], profitability_rating: Ladder,
+                 sustainability: Sequence[Ladder], sustainability_rating: Ladder,
+                 risk_adjustment: Mapping[str, Sequence[Ladder]], final_recommendation: Ladder,
+                 source: Optional[str] = None, fingerprint: str = ""):
+        self.profitability = tuple(profitability)
+        self.profitability_rating = profitability_rating
+        self.sustainability = tuple(sustainability)
+        self.sustainability_rating = sustainability_rating
+        self.risk_adjustment = {risk: tuple(ladders) for risk, ladders in risk_adjustment.items()}
+        self.final_recommendation = final_recommendation
+        self.source = source
+        # Digest of the rules table, so results persisted under other rules can be told apart
+        self.fingerprint = fingerprint
+        # Signal/factor bitmasks for the batch scorer: one bit per message, numbered in ladder
+        # order so that decoding by ascending bit gives the list the per-asset analysis builds
+        self.profitability_signals, self.profitability_bits = _message_bits(self.profitability, "signal")
+        self.sustainability_factors, self.sustainability_bits = _message_bits(self.sustainability, "factor")
+
+    @property
+    def input_fields(self) -> Tuple[str, ...]:
+        """Asset fields the ladders read, derived inputs expanded to their sources"""
+        fields = set()
+        ladders = self.profitability + self.sustainability + sum(self.risk_adjustment.values(), ())
+        for ladder in ladders:
+            fields.update(DERIVED_FIELDS[ladder.field][0] if ladder.field in DERIVED_FIELDS else (ladder.field,))
+        return tuple(field for field in ASSET_FIELDS if field in fields)
+
+
+def _message_bits(ladders: Sequence[Ladder], key: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[int, ...], ...]]:
+    messages: List[str] = []
+    bits = []
+    for ladder in ladders:
+        ladder_bits = []
+        for message in ladder[key]:
+            if message is None:
+                ladder_bits.append(0)
+            else:
+                ladder_bits.append(1 << len(messages))
+                messages.append(message)
+        bits.append(tuple(ladder_bits))
+    return tuple(messages), tuple(bits)
+
+
+def _measured(data: Mapping, field: str, estimate: float) -> float:
+    value = data.get(field, math.nan)
+    return estimate if value != value else value
+
+
+def field_value(data: Mapping, field: str):
+    """Value of a ladder field for one asset record"""
+    derived = DERIVED_FIELDS.get(field)
+    return derived[1](data) if derived is not None else data[field]
+
+
+def _parse_condition(condition, where: str) -> Tuple[str, float]:
+    if not isinstance(condition, str):
+        raise RulesError(f"{where}: 'when' must be a string like '>= 8'")
+    text = condition.strip()
+    for op in _OPERATORS:  # Two-character operators are listed first
+        if text.startswith(op):
+            try:
+                threshold = float(text[len(op):])
+            except ValueError:
+                break
+            if math.isfinite(threshold):
+                return op, threshold
+            break
+    raise RulesError(f"{where}: cannot parse condition {condition!r}")
+
+
+def compile_ladder(spec: Mapping, where: str, defaults: Mapping, required: Sequence[str] = ()) -> Ladder:
+    """Compile an ordered if/elif/else tier list into breakpoints for bisect_right
+
+    The real line is cut at every threshold into open intervals and the
+    threshold points themselves; each piece takes the first tier whose
+    condition holds, adjacent pieces with the same tier are merged, and a
+    boundary where the threshold belongs to the lower bucket is nudged up by
+    one ulp so bisect_right puts the threshold on the correct side.
+    """
+    if not isinstance(spec, Mapping) or not isinstance(spec.get("field"), str):
+        raise RulesError(f"{where}: a ladder needs a 'field' name and a 'tiers' list")
+    tiers = spec.get("tiers")
+    if not isinstance(tiers, list) or not tiers:
+        raise RulesError(f"{where}: 'tiers' must be a non-empty list")
+    conditions = []
+    for i, tier in enumerate(tiers):
+        if not isinstance(tier, Mapping):
+            raise RulesError(f"{where}: tier {i} must be an object")
+        if "when" in tier:
+            conditions.append(_parse_condition(tier["when"], f"{where} tier {i}"))
+        elif i != len(tiers) - 1:
+            raise RulesError(f"{where}: only the last tier may omit 'when' (it is the else branch)")
+        for key in required:
+            if key not in tier:
+                raise RulesError(f"{where}: tier {i} is missing {key!r}")
+    if len(conditions) == len(tiers):
+        raise RulesError(f"{where}: the last tier must be the else branch (no 'when')")
+
+    def tier_of(value: float) -> int:
+        for index, (op, threshold) in enumerate(conditions):
+            if _OPERATORS[op](value, threshold):
+                return index
+        return len(conditions)
+
+    thresholds = sorted({threshold for _op, threshold in conditions})
+    # Pieces in ascending order: (below t0), t0, (t0, t1), t1, ..., tk, (above tk)
+    pieces: List[Tuple[Optional[float], int]] = []  # (threshold the piece is, or None for an interval, tier)
+    for i, threshold in enumerate(thresholds):
+        below = threshold - 1 if i == 0 else (thresholds[i - 1] + threshold) / 2
+        pieces.append((None, tier_of(below)))
+        pieces.append((threshold, tier_of(threshold)))
+    pieces.append((None, tier_of(thresholds[-1] + 1) if thresholds else len(conditions)))
+
+    breaks: List[float] = []
+    bucket_tiers = [pieces[0][1]]
+    for (point, _tier), (next_point, next_tier) in zip(pieces, pieces[1:]):
+        if next_tier != bucket_tiers[-1]:
+            # Either an interval followed by its threshold (threshold opens the new bucket)
+            # or a threshold followed by the interval above it (threshold closes the old one)
+            breaks.append(next_point if next_point is not None else math.nextafter(point, math.inf))
+            bucket_tiers.append(next_tier)
+
+    # The else tier, given its own bucket past the bisect range when the conditions cover every number
+    if len(conditions) not in bucket_tiers:
+        bucket_tiers.append(len(conditions))
+    fallback = bucket_tiers.index(len(conditions))
+
+    outcomes = {}
+    keys = set(defaults).union(*(tier.keys() for tier in tiers)) - {"when"}
+    for key in keys:
+        outcomes[key] = tuple(tiers[tier].get(key, defaults.get(key)) for tier in bucket_tiers)
+    return Ladder(spec["field"], breaks, outcomes, fallback)
+
+
+def _score_section(section, name: str, message: str) -> Tuple[List[Ladder], Ladder]:
+    if not isinstance(section, Mapping):
+        raise RulesError(f"{name}: expected an object with 'ladders' and 'rating'")
+    ladders = [_points_ladder(spec, f"{name} ladder {i}", {"points": 0, message: None})
+               for i, spec in enumerate(section.get("ladders") or ())]
+    if not ladders:
+        raise RulesError(f"{name}: at least one ladder is required")
+    if sum(text is not None for ladder in ladders for text in ladder[message]) > MAX_MESSAGES:
+        raise RulesError(f"{name}: at most {MAX_MESSAGES} distinct {message} messages are supported")
+    rating = compile_ladder(section.get("rating"), f"{name} rating", {}, ("rating", "recommendation"))
+    return ladders, rating
+
+
+def _points_ladder(spec, where: str, defaults: Mapping) -> Ladder:
+    """Compile a ladder over an asset field whose tiers award integer points"""
+    ladder = compile_ladder(spec, where, defaults)
+    if ladder.field not in ASSET_FIELDS and ladder.field not in DERIVED_FIELDS:
+        raise RulesError(f"{where}: unknown field {ladder.field!r} "
+                         f"(expected one of {', '.join(ASSET_FIELDS + tuple(DERIVED_FIELDS))})")
+    if not all(isinstance(points, int) and not isinstance(points, bool) for points in ladder["points"]):
+        raise RulesError(f"{where}: points must be integers")
+    return ladder
+
+
+def compile_rules(table: Mapping, source: Optional[str] = None) -> Ruleset:
+    """Validate and compile a rules table (the parsed JSON document)"""
+    if not isinstance(table, Mapping):
+        raise RulesError("The rules table must be a JSON object")
+    if table.get("version") != 1:
+        raise RulesError(f"Unsupported rules version: {table.get('version')!r}")
+    profitability, profitability_rating = _score_section(table.get("profitability"), "profitability", "signal")
+    sustainability, sustainability_rating = _score_section(table.get("sustainability"), "sustainability", "factor")
+
+    risk_adjustment = {}
+    for risk, specs in (table.get("risk_adjustment") or {}).items():
+        risk_adjustment[risk] = [_points_ladder(spec, f"risk_adjustment {risk} ladder {i}", {"points": 0})
+                                 for i, spec in enumerate(specs)]
+
+    final = compile_ladder(table.get("final_recommendation"), "final_recommendation", {}, ("recommendation",))
+    if len(final) != FINAL_RECOMMENDATION_TIERS:
+        raise RulesError(f"final_recommendation must have exactly {FINAL_RECOMMENDATION_TIERS} tiers, "
+                         "one per allocation band")
+    fingerprint = hashlib.sha256(json.dumps(table, sort_keys=True).encode()).hexdigest()[:16]
+    return Ruleset(profitability, profitability_rating, sustainability, sustainability_rating,
+                   risk_adjustment, final, source, fingerprint)
+
+
+def load_rules(path: str) -> Ruleset:
+    with open(path) as rules_file:
+        try:
+            table = json.load(rules_file)
+        except ValueError as error:
+            raise RulesError(f"{path}: invalid JSON ({error})") from None
+    try:
+        return compile_rules(table, path)
+    except RulesError as error:
+        raise RulesError(f"{path}: {error}") from None
+
+
+_current: Optional[Ruleset] = None
+_lock = threading.Lock()
+
+
+def current() -> Ruleset:
+    """Active ruleset, loaded from $CRYPTOWISE_RULES or the bundled table on first use"""
+    if _current is None:
+        with _lock:
+            if _current is None:
+                install(load_rules(os.environ.get(RULES_ENV) or DEFAULT_RULES_PATH))
+    return _current
+
+
+def install(ruleset: Ruleset) -> Ruleset:
+    """Make ruleset active for every subsequent evaluation and return it
+
+    Results memoized under the previous rules (AnalysisCache, TopKIndex) are
+    not recomputed automatically; install rules before building those.
+    """
+    global _current
+    _current = ruleset
+    return ruleset
@@ -0,0 +1,274 @@
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import instrumentation
+import rules
+from asset_table import AssetTable
+from batch_scoring import analysis_result, profitability_result, sustainability_result
+
+RISK_LEVELS = ("low", "medium", "high")
+INVESTMENT_AMOUNTS = ("small", "medium", "large")
+TIME_HORIZONS = ("short", "medium", "long")
+SUSTAINABILITY_LEVELS = ("low", "medium", "high")
+
+# Investment advice phrases by position-sizing band, 24h move and horizon fit (None: nothing to add)
+SIZING_ADVICE = ("Avoid or minimal exposure (<2%)", "Consider a small 2-5% portfolio allocation",
+                 "Consider a 5-15% portfolio allocation", "Consider a 15-25% portfolio allocation")
+TIMING_ADVICE = (None, "Current dip may present buying opportunity",
+                 "Consider dollar-cost averaging due to recent gains")
+HORIZON_ADVICE = (None, "Well-suited for long-term holding strategy",
+                  "Monitor closely for short-term trading opportunities")
+# Every advice string there can be, joined once and interned: INVESTMENT_ADVICE[sizing][timing][horizon]
+INVESTMENT_ADVICE = tuple(tuple(tuple(sys.intern(" | ".join(filter(None, (sizing, timing, horizon))))
+                                      for horizon in HORIZON_ADVICE)
+                                for timing in TIMING_ADVICE)
+                          for sizing in SIZING_ADVICE)
+
+
+@dataclass(frozen=True)
+class InvestorProfile:
+    """Immutable investment profile, the four answers collected by the CLI"""
+
+    risk_tolerance: str = "medium"
+    investment_amount: str = "medium"
+    time_horizon: str = "medium"
+    sustainability_preference: str = "medium"
+
+    def __post_init__(self):
+        for field, allowed in (("risk_tolerance", RISK_LEVELS),
+                               ("investment_amount", INVESTMENT_AMOUNTS),
+                               ("time_horizon", TIME_HORIZONS),
+                               ("sustainability_preference", SUSTAINABILITY_LEVELS)):
+            value = getattr(self, field)
+            if value not in allowed:
+                raise ValueError(f"Invalid {field}: {value!r} (expected one of {', '.join(allowed)})")
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "InvestorProfile":
+        """Build a profile from a dict, unanswered (missing/None) fields fall back to medium"""
+        return cls(**{field: data[field] for field in cls.__dataclass_fields__ if data.get(field) is not None})
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _score_ladders(ladders, data: Mapping, message_key: str) -> Tuple[int, Tuple[str, ...]]:
+    """Sum the points of every ladder and collect the messages of the tiers hit"""
+    score = 0
+    messages = []
+    for ladder in ladders:
+        bucket = ladder.bucket(rules.field_value(data, ladder.field))
+        score += ladder["points"][bucket]
+        message = ladder[message_key][bucket]
+        if message is not None:
+            messages.append(message)
+    return score, tuple(messages)
+
+
+def analyze_profitability(data: Mapping) -> Dict:
+    """Analyze profitability based on price trends"""
+    ruleset = rules.current()
+    score, signals = _score_ladders(ruleset.profitability, data, "signal")
+    return analysis_result(ruleset.profitability_rating, score, "signals", signals)
+
+
+def analyze_sustainability(data: Mapping) -> Dict:
+    """Analyze sustainability based on environmental factors and project viability"""
+    ruleset = rules.current()
+    score, factors = _score_ladders(ruleset.sustainability, data, "factor")
+    return analysis_result(ruleset.sustainability_rating, score, "factors", factors)
+
+
+def profitability_recommendation(score: int) -> str:
+    """Get profitability-based recommendation"""
+    rating = rules.current().profitability_rating
+    return rating["recommendation"][rating.bucket(score)]
+
+
+def sustainability_recommendation(score: int) -> str:
+    """Get sustainability-based recommendation"""
+    rating = rules.current().sustainability_rating
+    return rating["recommendation"][rating.bucket(score)]
+
+
+def compute_weighted_score(profitability_score: int, sustainability_score: int, data: Mapping,
+                           risk_tolerance: str, sustainability_preference: str) -> float:
+    """Profile-weighted, risk-adjusted score (unrounded)"""
+    # Weight factors based on user preferences
+    profit_weight = 0.7 if sustainability_preference == "low" else 0.5
+    sustain_weight = 1 - profit_weight
+
+    # Calculate weighted score
+    weighted_score = (profitability_score * profit_weight +
+                      sustainability_score * sustain_weight)
+
+    # Risk adjustment: low tolerance penalizes volatile options, high tolerance rewards growth
+    for ladder in rules.current().risk_adjustment.get(risk_tolerance, ()):
+        weighted_score += ladder["points"][ladder.bucket(rules.field_value(data, ladder.field))]
+    return weighted_score
+
+
+def personalize(crypto_name: str, data: Mapping, profitability: Dict, sustainability: Dict,
+                profile: InvestorProfile) -> Dict:
+    """Combine the profile-independent analyses into a personalized recommendation"""
+    weighted_score = compute_weighted_score(profitability["score"], sustainability["score"], data,
+                                            profile.risk_tolerance, profile.sustainability_preference)
+
+    return recommendation_result(crypto_name, data, profitability, sustainability, weighted_score,
+                                 generate_investment_advice(data, weighted_score, profile))
+
+
+def final_recommendation(weighted_score: float) -> str:
+    """Verdict tier for a weighted score"""
+    verdicts = rules.current().final_recommendation
+    return verdicts["recommendation"][verdicts.bucket(weighted_score)]
+
+
+def recommendation_result(crypto_name: str, data: Mapping, profitability: Dict, sustainability: Dict,
+                          weighted_score: float, investment_advice: str) -> Dict:
+    """Assemble the personalized recommendation dict"""
+    return {
+        "crypto": crypto_name.title(),
+        "symbol": data["symbol"],
+        "profitability": profitability,
+        "sustainability": sustainability,
+        "weighted_score": round(weighted_score, 2),
+        "final_recommendation": final_recommendation(weighted_score),
+        "investment_advice": investment_advice
+    }
+
+
+def generate_investment_advice(data: Mapping, score: float, profile: InvestorProfile) -> str:
+    """Generate specific investment advice"""
+    # Position sizing advice
+    if score >= 7 and profile.risk_tolerance == "high":
+        sizing = 3
+    elif score >= 4:
+        sizing = 2
+    elif score >= 1:
+        sizing = 1
+    else:
+        sizing = 0
+
+    # Timing advice
+    if data["price_change_24h"] < -3:
+        timing = 1
+    elif data["price_change_24h"] > 5:
+        timing = 2
+    else:
+        timing = 0
+
+    # Time horizon advice
+    if profile.time_horizon == "long" and data["project_viability"] >= 8:
+        horizon = 1
+    elif profile.time_horizon == "short":
+        horizon = 2
+    else:
+        horizon = 0
+
+    return INVESTMENT_ADVICE[sizing][timing][horizon]
+
+
+class AnalysisCache:
+    """Memoized profitability/sustainability analyses per asset
+
+    Both analyses depend only on asset data, never on the investor profile,
+    so one entry per asset serves every profile. Entries are tagged with the
+    row's data version and recomputed as soon as the asset is updated.
+    Cached dicts are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, assets: AssetTable):
+        self.assets = assets
+        self._entries: Dict[int, Tuple[int, Dict, Dict]] = {}
+        # Batch scores loaded from a snapshot and the row versions they were computed at
+        self._warm: Optional[Tuple[Dict, Sequence[int]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def warm(self, scores: Dict, versions: Sequence[int]):
+        """Serve misses from batch scores computed at the given row versions
+
+        Rows updated since (a different version now) or scored under other
+        rules fall back to a fresh analysis, so a stale snapshot is only
+        recomputed where it actually changed.
+        """
+        self._warm = (scores, versions)
+
+    def batch_scores(self) -> Optional[Dict]:
+        """The warm batch scores if they still cover every row exactly, else None"""
+        if self._warm is None:
+            return None
+        scores, versions = self._warm
+        current = self.assets.versions()
+        if (scores["rules"] is not rules.current() or len(versions) != len(current)
+                or memoryview(versions).tobytes() != current.tobytes()):
+            return None
+        return scores
+
+    def _warm_analyses(self, row: int, version: int) -> Optional[Tuple[Dict, Dict]]:
+        scores, versions = self._warm
+        if row >= len(versions) or versions[row] != version or scores["rules"] is not rules.current():
+            return None
+        return profitability_result(scores, row), sustainability_result(scores, row)
+
+    def analyses(self, crypto_name: str) -> Tuple[Dict, Dict]:
+        """(profitability, sustainability) for an asset, computed at most once per data version"""
+        row = self.assets.row_of(crypto_name)
+        if row is None:
+            raise KeyError(crypto_name)
+        version = self.assets.version_of(row)
+        entry = self._entries.get(row)
+        probe = instrumentation.active()
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            if probe is not None:
+                probe.count("cache.hit")
+            return entry[1], entry[2]
+
+        self.misses += 1
+        warm = self._warm_analyses(row, version) if self._warm is not None else None
+        data = self.assets[self.assets.name_of(row)]
+        if warm is not None:
+            profitability, sustainability = warm
+            if probe is not None:
+                probe.count("cache.warm")
+        elif probe is None:
+            profitability = analyze_profitability(data)
+            sustainability = analyze_sustainability(data)
+        else:
+            probe.count("cache.miss")
+            with probe.stage("profitability"):
+                profitability = analyze_profitability(data)
+            with probe.stage("sustainability"):
+                sustainability = analyze_sustainability(data)
+            for signal in profitability["signals"]:
+                probe.count(f"branch.profitability.{signal}")
+            for factor in sustainability["factors"]:
+                probe.count(f"branch.sustainability.{factor}")
+        self._entries[row] = (version, profitability, sustainability)
+        return profitability, sustainability
+
+    def profitability(self, crypto_name: str) -> Dict:
+        return self.analyses(crypto_name)[0]
+
+    def sustainability(self, crypto_name: str) -> Dict:
+        return self.analyses(crypto_name)[1]
+
+    def invalidate(self, crypto_name: Optional[str] = None):
+        """Drop one asset's entry, or every entry when no name is given"""
+        if crypto_name is None:
+            self._entries.clear()
+            self._warm = None
+        else:
+            self._entries.pop(self.assets.row_of(crypto_name), None)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
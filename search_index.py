@@ -0,0 +1,240 @@
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from asset_table import AssetTable
+
+GRAM = 3
+# Fuzzy candidates are the keys sharing the most n-grams with the query; only
+# this many of them are checked with the (comparatively slow) edit distance
+FUZZY_CANDIDATES = 32
+MIN_FUZZY_LENGTH = 3
+
+
+class Match(NamedTuple):
+    """One search hit: the asset, the key it matched on and how"""
+
+    crypto: str
+    key: str
+    kind: str  # "exact", "prefix" or "fuzzy"
+    distance: int
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def ngrams(key: str) -> Set[str]:
+    """Padded character n-grams of a key, so short keys and word edges still produce grams"""
+    padded = "^" * (GRAM - 1) + key + "$"
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of a and b, or limit + 1 as soon as it is known to exceed limit
+
+    Only the diagonal band of width 2 * limit + 1 is computed, since any
+    cell outside it already costs more than limit edits.
+    """
+    over = limit + 1
+    if abs(len(a) - len(b)) > limit:
+        return over
+    width = len(b)
+    previous = list(range(width + 1))
+    for i in range(1, len(a) + 1):
+        char = a[i - 1]
+        low = max(1, i - limit)
+        high = min(width, i + limit)
+        current = [over] * (width + 1)
+        if low == 1:
+            current[0] = i
+        best = current[low - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] if char == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        previous = current
+    return min(previous[width], over)
+
+
+class SearchIndex:
+    """Exact, prefix and fuzzy lookup of assets by name or symbol
+
+    Every asset is indexed under two normalized keys (name and symbol).
+    Prefix lookups bisect a sorted list of the keys, which walks the keys
+    under a prefix in order the way a trie would, without one node object
+    per character. Fuzzy lookups rank keys of about the query's length by
+    shared padded trigrams and
+    confirm the best few with a bounded edit distance. Adding or removing
+    an asset touches only its own keys and grams.
+
+    When built over an AssetTable the index follows it: added assets and
+    symbol changes are picked up through the table's listener. Delisted
+    assets are dropped with remove(), and table updates do not bring them
+    back (add() does).
+    """
+
+    def __init__(self, assets: Optional[AssetTable] = None):
+        self.assets = assets
+        self._postings: Dict[str, Set[str]] = {}  # key -> assets indexed under it
+        self._sorted: List[str] = []
+        self._grams: Dict[str, Dict[int, Set[str]]] = {}  # n-gram -> key length -> keys containing it
+        self._keys_of: Dict[str, Tuple[str, str]] = {}  # asset -> (name key, symbol key)
+        self._delisted: Set[str] = set()
+        self._lock = threading.Lock()
+        if assets is not None:
+            for name in assets:
+                self.add(name, assets.get_field(assets.row_of(name), "symbol"))
+            assets.add_listener(self._follow)
+
+    def _index_key(self, key: str, crypto: str):
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = set()
+            insort(self._sorted, key)
+            for gram in ngrams(key):
+                self._grams.setdefault(gram, {}).setdefault(len(key), set()).add(key)
+        postings.add(crypto)
+
+    def _unindex_key(self, key: str, crypto: str):
+        postings = self._postings[key]
+        postings.discard(crypto)
+        if not postings:
+            del self._postings[key]
+            del self._sorted[bisect_left(self._sorted, key)]
+            for gram in ngrams(key):
+                by_length = self._grams[gram]
+                keys = by_length[len(key)]
+                keys.discard(key)
+                if not keys:
+                    del by_length[len(key)]
+                    if not by_length:
+                        del self._grams[gram]
+
+    def add(self, crypto: str, symbol: str):
+        """Index an asset (again) under its name and symbol"""
+        keys = (normalize(crypto), normalize(symbol))
+        with self._lock:
+            self._delisted.discard(crypto)
+            old = self._keys_of.get(crypto)
+            if old == keys:
+                return
+            if old is not None:
+                for key in old:
+                    self._unindex_key(key, crypto)
+            for key in keys:
+                self._index_key(key, crypto)
+            self._keys_of[crypto] = keys
+
+    def remove(self, crypto: str):
+        """Drop a delisted asset from the index"""
+        with self._lock:
+            for key in self._keys_of.pop(crypto):
+                self._unindex_key(key, crypto)
+            self._delisted.add(crypto)
+
+    def _follow(self, row: int):
+        crypto = self.assets.name_of(row)
+        if crypto not in self._delisted:
+            self.add(crypto, self.assets.get_field(row, "symbol"))
+
+    def __contains__(self, crypto) -> bool:
+        return crypto in self._keys_of
+
+    def __len__(self) -> int:
+        return len(self._keys_of)
+
+    def exact(self, query: str) -> List[Match]:
+        key = normalize(query)
+        with self._lock:
+            return [Match(crypto, key, "exact", 0) for crypto in sorted(self._postings.get(key, ()))]
+
+    def prefix(self, query: str, limit: int = 10) -> List[Match]:
+        """Assets with a name or symbol starting with query, in key order"""
+        key = normalize(query)
+        matches: List[Match] = []
+        seen = set()
+        with self._lock:
+            keys = self._sorted
+            for i in range(bisect_left(keys, key), len(keys)):
+                candidate = keys[i]
+                if not candidate.startswith(key) or len(matches) >= limit:
+                    break
+                for crypto in sorted(self._postings[candidate]):
+                    if crypto not in seen:
+                        seen.add(crypto)
+                        matches.append(Match(crypto, candidate, "prefix", len(candidate) - len(key)))
+        return matches[:limit]
+
+    def fuzzy(self, query: str, limit: int = 10, max_distance: int = 2) -> List[Match]:
+        """Assets within max_distance edits of query by name or symbol, closest first"""
+        key = normalize(query)
+        if len(key) < MIN_FUZZY_LENGTH:
+            return []
+        with self._lock:
+            # Keys more than max_distance characters longer or shorter cannot match. Within that
+            # window, max_distance edits change at most GRAM * max_distance grams of the query, so
+            # every match shares at least one of any GRAM * max_distance + 1 of them: the rarest do
+            lengths = range(len(key) - max_distance, len(key) + max_distance + 1)
+            postings = []
+            for gram in ngrams(key):
+                by_length = self._grams.get(gram, {})
+                keys = [by_length[length] for length in lengths if length in by_length]
+                postings.append((sum(map(len, keys)), keys))
+            postings.sort(key=itemgetter(0))
+            shared: Counter = Counter()
+            for _size, keys in postings[:GRAM * max_distance + 1]:
+                for same_length in keys:
+                    shared.update(same_length)
+            scored = []
+            for candidate, _count in shared.most_common(FUZZY_CANDIDATES):
+                distance = edit_distance(key, candidate, max_distance)
+                if distance <= max_distance:
+                    scored.append((distance, candidate))
+            scored.sort()
+            matches: List[Match] = []
+            seen = set()
+            for distance, candidate in scored:
+                for crypto in sorted(self._postings[candidate]):
+                    if crypto not in seen:
+                        seen.add(crypto)
+                        matches.append(Match(crypto, candidate, "fuzzy", distance))
+        return matches[:limit]
+
+    def search(self, query: str, limit: int = 10) -> List[Match]:
+        """Exact hits, then prefix hits, then fuzzy hits, each asset once"""
+        matches: List[Match] = []
+        seen = set()
+        for found in (self.exact(query), self.prefix(query, limit), self.fuzzy(query, limit)):
+            for match in found:
+                if match.crypto not in seen and len(matches) < limit:
+                    seen.add(match.crypto)
+                    matches.append(match)
+        return matches
+
+    def best(self, query: str) -> Optional[str]:
+        """The one asset a query clearly refers to, None when there is no match or it is ambiguous"""
+        exact = self.exact(query)
+        if exact:
+            return exact[0].crypto if len(exact) == 1 else None
+        prefix = self.prefix(query, 2)
+        if prefix:
+            return prefix[0].crypto if len(prefix) == 1 else None
+        fuzzy = self.fuzzy(query, 2)
+        if len(fuzzy) == 1 or (len(fuzzy) == 2 and fuzzy[0].distance < fuzzy[1].distance):
+            return fuzzy[0].crypto
+        return None
+
+    def close(self):
+        """Stop following table updates"""
+        if self.assets is not None:
+            self.assets.remove_listener(self._follow)
@@ -0,0 +1,294 @@
+import asyncio
+import json
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from scoring import InvestorProfile
+from service import RecommendationService
+
+# Line-delimited JSON over TCP. Each request is one JSON object per line:
+#   {"id": 1, "action": "profile", "profile": {"risk_tolerance": "high", ...}}
+#   {"id": 2, "action": "analyze", "crypto": "ETH"}
+#   {"id": 3, "action": "top", "n": 3}
+#   {"id": 4, "action": "compare", "cryptos": ["bitcoin", "SOL"]}
+#     (optional: "sort_by": column, "descending": true, "deltas": [columns], "baseline": asset or position)
+#   {"id": 5, "action": "market_overview"}
+#   {"id": 6, "action": "market_summary", "n": 5}
+#   {"id": 7, "action": "search", "query": "ethe", "limit": 10}
+#   {"id": 8, "action": "subscribe", "crypto": "ETH", "field": "final_recommendation", "op": ">=",
+#    "value": "Highly Recommended"}   (any alerts.FIELDS field; "op": "changes" takes no value)
+#   {"id": 9, "action": "alerts", "limit": 100}   (alerts raised since the last call, oldest first)
+#   {"id": 10, "action": "subscriptions"}
+#   {"id": 11, "action": "unsubscribe", "subscription": 0}
+# and every request gets exactly one response line, in request order:
+#   {"id": 2, "ok": true, "result": {...}}  or  {"id": 2, "ok": false, "error": "..."}
+# The profile set on a connection applies to the requests that follow it;
+# any request may also carry its own "profile" object to override it once.
+# Subscriptions belong to the connection and are dropped when it closes.
+ACTIONS = ("profile", "analyze", "top", "compare", "market_overview", "market_summary", "search",
+           "subscribe", "unsubscribe", "subscriptions", "alerts")
+
+
+class RequestError(Exception):
+    """Client-side problem with a request, reported back on the connection"""
+
+
+class RecommendationServer:
+    """asyncio front-end serving RecommendationService over line-delimited JSON
+
+    The event loop only parses, routes and writes; scoring runs on a thread
+    pool so slow requests never stall other connections. Clients may pipeline
+    requests: up to max_in_flight per connection run concurrently, and
+    responses are still written in request order.
+    """
+
+    def __init__(self, service: RecommendationService, host: str = "127.0.0.1", port: int = 8765,
+                 workers: Optional[int] = None, max_in_flight: int = 64):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cryptowise")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamReader] = {}
+        self._closing = False
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Serve until shutdown() is called or SIGINT/SIGTERM is received"""
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        stopped = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stopped.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform/thread
+        closed = asyncio.ensure_future(self._server.wait_closed())
+        await asyncio.wait([asyncio.ensure_future(stopped.wait()), closed],
+                           return_when=asyncio.FIRST_COMPLETED)
+        await self.shutdown()
+
+    async def shutdown(self, timeout: float = 5.0):
+        """Stop accepting, let connections finish in-flight requests, then release workers"""
+        if self._closing:
+            return
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._connections:
+            # Idle connections see EOF; busy ones finish the requests they already sent
+            for reader in self._connections.values():
+                reader.feed_eof()
+            _done, pending = await asyncio.wait(list(self._connections), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections[task] = reader
+        responses: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+        sender = asyncio.ensure_future(self._send_responses(responses, writer))
+        profile = InvestorProfile()
+        try:
+            while not self._closing:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    await responses.put(_error_response(None, "Request line too long"))
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise RequestError("Request must be a JSON object")
+                    request_id = request.get("id")
+                    if request.get("action") == "profile":
+                        # Applied inline so it affects exactly the requests pipelined after it
+                        profile = _profile_from(request.get("profile"))
+                        await responses.put(_ok_response(request_id, profile.to_dict()))
+                        continue
+                    request_profile = _profile_from(request["profile"]) if "profile" in request else profile
+                except (ValueError, RequestError) as error:
+                    await responses.put(_error_response(_request_id(line), str(error)))
+                    continue
+                future = asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._dispatch, request, request_profile, task)
+                # Blocks once max_in_flight responses are pending, which stops reading from this client
+                await responses.put((request_id, future))
+        finally:
+            await responses.put(None)
+            try:
+                await sender
+            finally:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except ConnectionError:
+                    pass
+                self._connections.pop(task, None)
+                self.service.drop_subscriptions(task)
+
+    async def _send_responses(self, responses: asyncio.Queue, writer: asyncio.StreamWriter):
+        broken = False
+        while True:
+            item = await responses.get()
+            if item is None:
+                return
+            if isinstance(item, bytes):
+                payload = item
+            else:
+                request_id, future = item
+                try:
+                    payload = _ok_response(request_id, await future)
+                except (KeyError, RequestError, ValueError, TypeError) as error:
+                    message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+                    payload = _error_response(request_id, message)
+                except Exception as error:
+                    payload = _error_response(request_id, f"Internal error: {error}")
+            if broken:
+                continue  # Keep draining so in-flight work is awaited, but drop the output
+            try:
+                writer.write(payload)
+                await writer.drain()
+            except ConnectionError:
+                broken = True
+
+    def _dispatch(self, request: Dict, profile: InvestorProfile, connection: asyncio.Task):
+        """Run one request against the service (called on a worker thread)"""
+        action = request.get("action")
+        service = self.service
+        if action == "analyze":
+            return service.analyze(profile, _require(request, "crypto", str))
+        if action == "top":
+            return service.top_recommendations(profile, _positive_int(request, "n", 3))
+        if action == "compare":
+            cryptos = _require(request, "cryptos", list)
+            if not all(isinstance(crypto, str) for crypto in cryptos):
+                raise RequestError("'cryptos' must be a list of asset names or symbols")
+            if len(cryptos) < 2:
+                raise RequestError("Please select at least 2 cryptocurrencies")
+            sort_by = request.get("sort_by")
+            if sort_by is not None and not isinstance(sort_by, str):
+                raise RequestError("'sort_by' must be a str")
+            deltas = request.get("deltas", [])
+            if not isinstance(deltas, list):
+                raise RequestError("'deltas' must be a list")
+            baseline = request.get("baseline", 0)
+            if isinstance(baseline, bool) or not isinstance(baseline, (int, str)):
+                raise RequestError("'baseline' must be a position or an asset name or symbol")
+            return service.compare(profile, cryptos, sort_by, bool(request.get("descending")), deltas, baseline)
+        if action == "market_overview":
+            return service.market_overview()
+        if action == "market_summary":
+            return service.market_summary(_positive_int(request, "n", 5))
+        if action == "search":
+            return service.search(_require(request, "query", str), _positive_int(request, "limit", 10))
+        if action == "subscribe":
+            return service.subscribe(connection, profile, _require(request, "crypto", str),
+                                     _require(request, "field", str), _require(request, "op", str),
+                                     request.get("value"))
+        if action == "unsubscribe":
+            service.unsubscribe(connection, _require(request, "subscription", int))
+            return None
+        if action == "subscriptions":
+            return service.alerts.subscriptions(connection)
+        if action == "alerts":
+            return service.pending_alerts(connection, _positive_int(request, "limit", None))
+        raise RequestError(f"Unknown action: {action!r} (expected one of {', '.join(ACTIONS)})")
+
+
+def _require(request: Dict, key: str, kind: type):
+    value = request.get(key)
+    # JSON true/false are bools, which Python also counts as ints
+    if not isinstance(value, kind) or (isinstance(value, bool) and kind is not bool):
+        raise RequestError(f"{key!r} must be a {kind.__name__}")
+    return value
+
+
+def _positive_int(request: Dict, key: str, default: Optional[int]) -> Optional[int]:
+    """Positive integer field, or the default when absent (None: the field is optional)"""
+    value = request.get(key, default)
+    if value is None and default is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise RequestError(f"{key} must be a positive integer")
+    return value
+
+
+def _profile_from(data) -> InvestorProfile:
+    if not isinstance(data, dict):
+        raise RequestError("'profile' must be an object")
+    return InvestorProfile.from_dict(data)
+
+
+def _request_id(line: bytes):
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return None
+    return request.get("id") if isinstance(request, dict) else None
+
+
+def _ok_response(request_id, result) -> bytes:
+    return json.dumps({"id": request_id, "ok": True, "result": result}).encode() + b"\n"
+
+
+def _error_response(request_id, message: str) -> bytes:
+    return json.dumps({"id": request_id, "ok": False, "error": message}).encode() + b"\n"
+
+
+def main():
+    """Run the CryptoWise recommendation server"""
+    import argparse
+
+    from ingestion import IngestionPipeline, file_source
+    from snapshot import warm_start
+    from WEEK1 import DEFAULT_ASSETS, CryptoInvestmentBot
+
+    parser = argparse.ArgumentParser(description="CryptoWise AI recommendation server (line-delimited JSON over TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="scoring threads (default: Python's choice)")
+    parser.add_argument("--feed", metavar="PATH", help="follow a JSONL market-data feed while serving")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="warm start from a snapshot of the asset data and analyses (rebuilt if stale)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        warm = warm_start(args.snapshot, DEFAULT_ASSETS)
+        service = warm.service
+        print(f"📦 Snapshot {warm.report['status']} in {warm.report['seconds'] * 1000:.1f} ms")
+    else:
+        service = CryptoInvestmentBot().service
+    if args.feed:
+        pipeline = IngestionPipeline(service.assets, service.cache)
+        threading.Thread(target=pipeline.run, args=(file_source(args.feed, follow=True),),
+                         name="market-feed", daemon=True).start()
+
+    async def run():
+        server = RecommendationServer(service, args.host, args.port, args.workers)
+        await server.start()
+        print(f"🚀 CryptoWise AI server listening on {server.host}:{server.port}")
+        await server.serve_forever()
+        print("🤖 Server stopped.")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
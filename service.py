@@ -0,0 +1,198 @@
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Union
+
+import instrumentation
+import rules
+from alerts import AlertEngine
+from asset_table import AssetTable
+from comparison import Comparison
+from instrumentation import Instrumentation
+from market_aggregates import MarketAggregates
+from profiles import PersonalizedBatch, ProfileStore, personalize_all
+from result_cache import RESULT_CACHE_SIZE, LRUCache
+from scoring import (AnalysisCache, InvestorProfile, compute_weighted_score, generate_investment_advice,
+                     personalize, recommendation_result)
+from search_index import SearchIndex
+from topk_index import TopKIndex
+
+
+class RecommendationService:
+    """Headless recommendation API over an asset table
+
+    Holds no per-user state and performs no I/O: every call takes the
+    investor profile explicitly and returns plain data structures, so one
+    instance can be shared by any number of concurrent callers.
+    """
+
+    def __init__(self, assets: AssetTable, cache: Optional[AnalysisCache] = None,
+                 results: Optional[LRUCache] = None):
+        self.assets = assets
+        self.cache = cache if cache is not None else AnalysisCache(assets)
+        # Personalized results by rules, asset data version and the profile answers they depend on
+        self.results = results if results is not None else LRUCache(RESULT_CACHE_SIZE)
+        self._topk: Optional[TopKIndex] = None
+        self._topk_lock = threading.Lock()
+        self._aggregates: Optional[MarketAggregates] = None
+        self._search_index: Optional[SearchIndex] = None
+        self._alerts: Optional[AlertEngine] = None
+
+    @property
+    def topk(self) -> TopKIndex:
+        """Ranking index, built on first use and then kept current by table updates"""
+        if self._topk is None:
+            with self._topk_lock:
+                if self._topk is None:
+                    self._topk = TopKIndex(self.assets, self.cache)
+        return self._topk
+
+    @property
+    def aggregates(self) -> MarketAggregates:
+        """Running market totals and movers, built on first use and then kept current by table updates"""
+        if self._aggregates is None:
+            with self._topk_lock:
+                if self._aggregates is None:
+                    self._aggregates = MarketAggregates(self.assets)
+        return self._aggregates
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Name/symbol search index, built on first use and then kept current by table updates"""
+        if self._search_index is None:
+            with self._topk_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.assets)
+        return self._search_index
+
+    @property
+    def alerts(self) -> AlertEngine:
+        """Alert subscriptions, created on first use and then evaluated on every table update"""
+        if self._alerts is None:
+            with self._topk_lock:
+                if self._alerts is None:
+                    self._alerts = AlertEngine(self.assets, self.cache)
+        return self._alerts
+
+    def subscribe(self, owner: Hashable, profile: InvestorProfile, crypto: str, field: str, op: str,
+                  value=None) -> Dict:
+        """Alert owner whenever a condition on an asset becomes true, return the subscription"""
+        return self.alerts.describe(self.alerts.subscribe(owner, crypto, field, op, value, profile))
+
+    def unsubscribe(self, owner: Hashable, subscription: int):
+        self.alerts.unsubscribe(subscription, owner)
+
+    def pending_alerts(self, owner: Hashable, limit: Optional[int] = None) -> List[Dict]:
+        """Alerts raised for owner since the last call, oldest first"""
+        return [alert.to_dict() for alert in self.alerts.drain(owner, limit)]
+
+    def drop_subscriptions(self, owner: Hashable) -> int:
+        """Forget every subscription of owner (a disconnected client), return how many there were"""
+        return self._alerts.unsubscribe_all(owner) if self._alerts is not None else 0
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """Assets matching a name or symbol exactly, by prefix or approximately, best first"""
+        return [{
+            "crypto": match.crypto.title(),
+            "symbol": self.assets.get_field(self.assets.row_of(match.crypto), "symbol"),
+            "match": match.kind,
+            "distance": match.distance,
+        } for match in self.search_index.search(query, limit)]
+
+    def resolve(self, key: str) -> str:
+        """Canonical asset name for a name or symbol, KeyError if unknown"""
+        row = self.assets.row_of(key)
+        if row is None:
+            raise KeyError(f"Unknown cryptocurrency: {key}")
+        return self.assets.name_of(row)
+
+    def analyze(self, profile: InvestorProfile, crypto: str) -> Dict:
+        """Full personalized recommendation for one asset (shared, read-only)"""
+        name = self.resolve(crypto)
+        probe = instrumentation.active()
+        if probe is None:
+            row = self.assets.row_of(name)
+            # investment_amount never changes the result, and sustainability only weighs in when low
+            key = (rules.current(), row, self.assets.version_of(row), profile.risk_tolerance,
+                   profile.time_horizon, profile.sustainability_preference == "low")
+            result = self.results.get(key)
+            if result is None:
+                profitability, sustainability = self.cache.analyses(name)
+                result = personalize(name, self.assets[name], profitability, sustainability, profile)
+                self.results.put(key, result)
+            return result
+        return self._analyze_instrumented(probe, name, profile)
+
+    def _analyze_instrumented(self, probe: Instrumentation, name: str, profile: InvestorProfile) -> Dict:
+        """analyze() with per-stage timings and branch counts"""
+        with probe.stage("recommendation"):
+            with probe.stage("analyses"):
+                profitability, sustainability = self.cache.analyses(name)
+            data = self.assets[name]
+            with probe.stage("risk_adjustment"):
+                weighted_score = compute_weighted_score(
+                    profitability["score"], sustainability["score"], data,
+                    profile.risk_tolerance, profile.sustainability_preference)
+            with probe.stage("advice"):
+                advice = generate_investment_advice(data, weighted_score, profile)
+            result = recommendation_result(name, data, profitability, sustainability, weighted_score, advice)
+
+        unadjusted = compute_weighted_score(profitability["score"], sustainability["score"], data,
+                                            "medium", profile.sustainability_preference)
+        if weighted_score < unadjusted:
+            probe.count("branch.risk.low_risk_volatility_penalty")
+        elif weighted_score > unadjusted:
+            probe.count("branch.risk.high_risk_growth_bonus")
+        else:
+            probe.count("branch.risk.none")
+        probe.count(f"branch.final.{result['final_recommendation']}")
+        for part in advice.split(" | "):
+            probe.count(f"branch.advice.{part}")
+        return result
+
+    def top_recommendations(self, profile: InvestorProfile, n: int = 3) -> List[Dict]:
+        """The n best assets for a profile, best first"""
+        return [self.analyze(profile, name) for name in self.topk.top(profile, n)]
+
+    def analyze_batch(self, store: ProfileStore, crypto: str) -> PersonalizedBatch:
+        """analyze() for every user in a profile store, computed once per distinct profile"""
+        name = self.resolve(crypto)
+        return personalize_all(store, lambda profile: self.analyze(profile, name))
+
+    def top_recommendations_batch(self, store: ProfileStore, n: int = 3) -> PersonalizedBatch:
+        """top_recommendations() for every user in a profile store, computed once per distinct profile"""
+        return personalize_all(store, lambda profile: self.top_recommendations(profile, n))
+
+    def compare(self, profile: InvestorProfile, cryptos: Iterable[str], sort_by: Optional[str] = None,
+                descending: bool = False, deltas: Iterable[str] = (), baseline: Union[int, str] = 0) -> List[Dict]:
+        """Comparison rows for assets given by name or symbol, scored in one batch
+
+        Rows come in selection order unless sort_by names a column; deltas
+        adds a <column>_delta column per numeric column, relative to the
+        baseline asset (a position in the sorted rows, or a name or symbol).
+        """
+        comparison = Comparison.of(self.assets, cryptos, profile)
+        if sort_by is not None:
+            comparison.sort(sort_by, descending)
+        comparison.add_deltas(deltas, baseline)
+        return comparison.records()
+
+    def market_overview(self) -> Dict:
+        """Market totals, per-asset rows and sentiment"""
+        totals = self.aggregates.totals()
+        return {
+            "total_market_cap": totals["total_market_cap"],
+            "total_volume": totals["total_volume"],
+            "assets": [{
+                "crypto": name.title(),
+                "symbol": data["symbol"],
+                "current_price": data["current_price"],
+                "price_change_24h": data["price_change_24h"],
+                "market_cap": data["market_cap"],
+            } for name, data in self.assets.items()],
+            "positive_performers": totals["positive_performers"],
+            "total_assets": totals["total_assets"],
+            "sentiment": totals["sentiment"],
+        }
+
+    def market_summary(self, n: int = 5) -> Dict:
+        """Market totals, sentiment and the n top gainers, losers and volume leaders, without per-asset rows"""
+        return self.aggregates.summary(n)
@@ -0,0 +1,333 @@
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+# The scoring stack is imported by the functions that build or load a snapshot, so
+# read_profiles (used before the first prompt) only costs the standard library
+if TYPE_CHECKING:
+    from asset_table import AssetTable
+    from scoring import InvestorProfile
+    from service import RecommendationService
+
+# On-disk layout, everything little-endian except the array payloads (native, see meta.byteorder):
+#   header     8s magic, I schema version, I section count, Q body length, I crc32 of body, 4x  (32 bytes)
+#   directory  32s section name, Q offset, Q length, one entry per section                      (48 bytes each)
+#   sections   raw payloads, each starting on an 8-byte boundary so it can be cast in place
+# The body (everything after the header) is covered by the checksum. The "meta" section is JSON
+# with row count, typecodes, category values, profiles and the fingerprint of the scoring rules.
+# The "seeds" column holds, per row, the record_digest of the source record the row was built
+# from (NO_SEED for rows that only ever came from a feed).
+MAGIC = b"CWSNAP\x00\x00"
+SCHEMA_VERSION = 1
+HEADER = struct.Struct("<8sIIQI4x")
+ENTRY = struct.Struct("<32sQQ")
+ALIGN = 8
+NO_SEED = -1
+
+# Batch score arrays persisted as the precomputed analyses
+SCORE_COLUMNS = (
+    "profitability_score", "profitability_rating", "profitability_signals",
+    "sustainability_score", "sustainability_rating", "sustainability_factors",
+)
+
+
+class SnapshotError(ValueError):
+    """A snapshot file that cannot be used (missing, corrupt or from another schema)"""
+
+
+class LoadedSnapshot(NamedTuple):
+    """Contents of a snapshot file
+
+    scores is None when the analyses were computed under different scoring
+    rules than the active ones; the asset data is still good.
+    """
+
+    assets: "AssetTable"
+    scores: Optional[Dict]
+    versions: memoryview
+    profiles: Dict[str, "InvestorProfile"]
+    seeds: array
+    created: float
+
+
+class WarmStart(NamedTuple):
+    """A ready service plus what had to be rebuilt to get it"""
+
+    service: "RecommendationService"
+    profiles: Dict[str, "InvestorProfile"]
+    seeds: array
+    report: Dict
+
+
+def record_digest(record: Mapping) -> int:
+    """Digest of a source record, to spot seed data that changed since the snapshot was taken
+
+    Depends on the field order and the Python version (marshal format), either
+    of which changing only causes a harmless refresh from the source.
+    """
+    return zlib.crc32(marshal.dumps(tuple(record.items())))
+
+
+def _strings(values) -> bytes:
+    return "\0".join(values).encode()
+
+
+def save_snapshot(path: str, assets: "AssetTable", profiles: Optional[Mapping[str, "InvestorProfile"]] = None,
+                  seeds: Optional[array] = None, scores: Optional[Dict] = None) -> int:
+    """Write assets, their analyses and saved profiles to path atomically, return the file size
+
+    Analyses are the batch scores of every row at its current version (pass
+    scores to reuse a score_universe result of the same table). seeds holds
+    the record_digest of the source record each row was built from.
+    """
+    import tempfile
+
+    import rules
+    from asset_table import CATEGORY_COLUMNS, FLOAT_COLUMNS, INT_COLUMNS, RISK_COLUMNS
+    from batch_scoring import score_universe
+
+    ruleset = rules.current()
+    if scores is None or scores["rules"] is not ruleset or len(scores["names"]) != len(assets):
+        scores = score_universe(assets, ruleset)
+
+    arrays: Dict[str, array] = {}
+    for field in FLOAT_COLUMNS + RISK_COLUMNS + INT_COLUMNS + CATEGORY_COLUMNS:
+        arrays[f"column.{field}"] = assets.column(field)
+    arrays["versions"] = assets.versions()
+    arrays["seeds"] = seeds = array("q", seeds if seeds is not None else ())
+    seeds.extend([NO_SEED] * (len(assets) - len(seeds)))
+    for key in SCORE_COLUMNS:
+        arrays[f"scores.{key}"] = scores[key]
+
+    meta = {
+        "rows": len(assets),
+        "created": time.time(),
+        "byteorder": sys.byteorder,
+        "typecodes": {name: [column.typecode, column.itemsize] for name, column in arrays.items()},
+        "categories": {field: assets.categories(field) for field in CATEGORY_COLUMNS},
+        "rules": ruleset.fingerprint,
+        "profiles": {name: profile.to_dict() for name, profile in (profiles or {}).items()},
+    }
+    sections: List[Tuple[str, bytes]] = [
+        ("meta", json.dumps(meta).encode()),
+        ("names", _strings(assets)),
+        ("symbols", _strings(assets.column("symbol"))),
+    ]
+    sections += [(name, column.tobytes()) for name, column in arrays.items()]
+
+    directory_size = ENTRY.size * len(sections)
+    entries = []
+    payload = bytearray()
+    offset = HEADER.size + directory_size
+    for name, data in sections:
+        padding = -(offset + len(payload)) % ALIGN
+        payload += bytes(padding)
+        entries.append(ENTRY.pack(name.encode(), offset + len(payload), len(data)))
+        payload += data
+    body = b"".join(entries) + payload
+    header = HEADER.pack(MAGIC, SCHEMA_VERSION, len(sections), len(body), zlib.crc32(body))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(header)
+            handle.write(body)
+        os.chmod(temporary, 0o644)  # mkstemp creates it private, other workers need to map it
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return len(header) + len(body)
+
+
+def load_snapshot(path: str) -> LoadedSnapshot:
+    """Map a snapshot file, verify it and rebuild the asset table from its columns
+
+    Numeric columns are copied out of the mapping in one buffer copy each;
+    the analyses stay as zero-copy views over the mapping and are decoded
+    per asset only when first requested.
+    """
+    import rules
+    from asset_table import CATEGORY_COLUMNS, FLOAT_COLUMNS, INT_COLUMNS, RISK_COLUMNS, AssetTable
+    from batch_scoring import risk_columns
+    from scoring import InvestorProfile
+
+    try:
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < HEADER.size:
+                raise SnapshotError(f"Not a snapshot file: {path}")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError as error:
+        raise SnapshotError(f"Cannot read snapshot {path}: {error}") from None
+
+    magic, version, count, length, checksum = HEADER.unpack_from(mapped)
+    if magic != MAGIC:
+        raise SnapshotError(f"Not a snapshot file: {path}")
+    if version != SCHEMA_VERSION:
+        raise SnapshotError(f"Snapshot schema version {version} is not supported (expected {SCHEMA_VERSION})")
+    view = memoryview(mapped)
+    body = view[HEADER.size:]
+    if len(body) != length or zlib.crc32(body) != checksum:
+        raise SnapshotError(f"Snapshot {path} is truncated or corrupt (checksum mismatch)")
+
+    sections = {}
+    for i in range(count):
+        name, offset, section_length = ENTRY.unpack_from(mapped, HEADER.size + i * ENTRY.size)
+        sections[name.rstrip(b"\0").decode()] = view[offset:offset + section_length]
+    try:
+        meta = json.loads(bytes(sections["meta"]))
+        if meta["byteorder"] != sys.byteorder:
+            raise SnapshotError(f"Snapshot {path} was written on a {meta['byteorder']}-endian machine")
+
+        def column(name: str) -> memoryview:
+            typecode, itemsize = meta["typecodes"][name]
+            if array(typecode).itemsize != itemsize:
+                raise SnapshotError(f"Snapshot {path} stores {name} with a different item size")
+            return sections[name].cast(typecode)
+
+        rows = meta["rows"]
+        names = bytes(sections["names"]).decode().split("\0") if rows else []
+        symbols = bytes(sections["symbols"]).decode().split("\0") if rows else []
+        fields = FLOAT_COLUMNS + INT_COLUMNS + CATEGORY_COLUMNS
+        # Snapshots written before the risk metrics existed load with them unmeasured
+        fields += tuple(field for field in RISK_COLUMNS if f"column.{field}" in sections)
+        versions = column("versions")
+        assets = AssetTable.from_columns(names, symbols, {field: column(f"column.{field}") for field in fields},
+                                         meta["categories"], versions)
+
+        ruleset = rules.current()
+        scores = None
+        if meta["rules"] == ruleset.fingerprint:
+            scores = {key: column(f"scores.{key}") for key in SCORE_COLUMNS}
+            scores.update({"rules": ruleset, "names": assets.columns()["names"],
+                           "risk_columns": risk_columns(assets.columns(), ruleset)})
+        profiles = {name: InvestorProfile.from_dict(profile) for name, profile in meta["profiles"].items()}
+        return LoadedSnapshot(assets, scores, versions, profiles, array("q", column("seeds")), meta["created"])
+    except SnapshotError:
+        raise
+    except (KeyError, TypeError, ValueError) as error:
+        raise SnapshotError(f"Snapshot {path} is malformed: {error!r}") from None
+
+
+def read_profiles(path: str) -> Dict[str, Dict]:
+    """Saved profiles of a snapshot as plain dicts, read from its meta section alone
+
+    The rest of the file is neither read nor verified, so this stays cheap
+    whatever the number of assets; load_snapshot still checks the whole file.
+    Empty when the file cannot be read.
+    """
+    try:
+        with open(path, "rb") as handle:
+            header = handle.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return {}
+            magic, version, count, _length, _checksum = HEADER.unpack(header)
+            if magic != MAGIC or version != SCHEMA_VERSION:
+                return {}
+            directory = handle.read(ENTRY.size * count)
+            for i in range(count):
+                name, offset, length = ENTRY.unpack_from(directory, i * ENTRY.size)
+                if name.rstrip(b"\0") == b"meta":
+                    handle.seek(offset)
+                    meta = json.loads(handle.read(length))
+                    return dict(meta["profiles"])
+    except (OSError, KeyError, TypeError, ValueError, struct.error):
+        pass
+    return {}
+
+
+def warm_start(path: str, source: Optional[Mapping[str, Mapping]] = None, save: bool = True) -> WarmStart:
+    """Service backed by the snapshot at path, falling back to source and refreshing stale parts
+
+    A missing, corrupt or other-schema snapshot is rebuilt from source.
+    Otherwise the snapshot is reconciled with source: assets added to the
+    source are appended and assets whose source record changed are
+    overwritten, which bumps their row version so only they are re-analyzed;
+    everything else (including updates applied by feeds since) is served
+    from the snapshot as-is. Analyses computed under other scoring rules are
+    dropped and recomputed lazily. The refreshed snapshot is written back
+    when anything was rebuilt and save is set.
+    """
+    from asset_table import AssetTable
+    from scoring import AnalysisCache
+    from service import RecommendationService
+
+    report = {"path": path, "status": "warm", "reason": None, "added": 0, "updated": 0,
+              "rescored": False}
+    started = time.perf_counter()
+    try:
+        snapshot = load_snapshot(path)
+    except SnapshotError as error:
+        if source is None:
+            raise
+        report.update(status="rebuilt", reason=str(error))
+        assets = AssetTable.from_records(source)
+        seeds = array("q", map(record_digest, source.values()))
+        service = RecommendationService(assets)
+        profiles: Dict[str, "InvestorProfile"] = {}
+        report["rescored"] = True
+    else:
+        assets = snapshot.assets
+        seeds = snapshot.seeds
+        seeds.extend([NO_SEED] * (len(assets) - len(seeds)))
+        profiles = snapshot.profiles
+        cache = AnalysisCache(assets)
+        if snapshot.scores is not None:
+            cache.warm(snapshot.scores, snapshot.versions)
+        else:
+            report.update(status="stale", reason="scoring rules changed", rescored=True)
+        for name, record in (source or {}).items():
+            digest = record_digest(record)
+            if name in assets:
+                row = assets.row_of(name)
+                if seeds[row] == digest:
+                    continue
+                assets.update(name, record)
+                report["updated"] += 1
+            else:
+                row = assets.add(name, record)
+                seeds.append(NO_SEED)
+                report["added"] += 1
+            seeds[row] = digest
+        if report["added"] or report["updated"]:
+            report.update(status="stale", reason=report["reason"] or "source data changed")
+        service = RecommendationService(assets, cache)
+
+    if save and report["status"] != "warm":
+        save_snapshot(path, assets, profiles, seeds)
+    report["seconds"] = time.perf_counter() - started
+    return WarmStart(service, profiles, seeds, report)
+
+
+def main():
+    """Build, inspect or time a snapshot of the bundled asset data"""
+    import argparse
+
+    from WEEK1 import DEFAULT_ASSETS
+
+    parser = argparse.ArgumentParser(description="CryptoWise AI asset/analysis snapshots")
+    parser.add_argument("path", help="snapshot file")
+    parser.add_argument("--rebuild", action="store_true", help="ignore any existing snapshot and rebuild it")
+    args = parser.parse_args()
+
+    if args.rebuild and os.path.exists(args.path):
+        os.unlink(args.path)
+    warm = warm_start(args.path, DEFAULT_ASSETS)
+    report = warm.report
+    print(f"📦 {report['path']}: {report['status']}"
+          + (f" ({report['reason']})" if report["reason"] else "")
+          + f", {len(warm.service.assets)} assets, {report['added']} added, {report['updated']} updated, "
+            f"ready in {report['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Set, Tuple
+
+from asset_table import AssetTable
+from batch_scoring import score_universe, weighted_scores
+from scoring import RISK_LEVELS, AnalysisCache, InvestorProfile, compute_weighted_score
+
+# get_personalized_recommendation only branches on the risk level and on whether
+# sustainability preference is "low", so these six buckets cover every profile
+BUCKETS: Tuple[Tuple[str, bool], ...] = tuple(
+    (risk, profit_focused) for risk in RISK_LEVELS for profit_focused in (False, True))
+
+
+def bucket_of(profile: InvestorProfile) -> Tuple[str, bool]:
+    return profile.risk_tolerance, profile.sustainability_preference == "low"
+
+
+class TopKIndex:
+    """Every asset ranked by weighted score, maintained per profile bucket
+
+    Each bucket is a sorted list of (-rounded score, row) keys, which is the
+    order a stable descending sort on the rounded score produces. The index
+    listens to the asset table and only re-ranks rows that changed, with a
+    bisect removal and insort per bucket, so a query is a slice of the head
+    of one list.
+    """
+
+    def __init__(self, assets: AssetTable, cache: AnalysisCache = None):
+        self.assets = assets
+        self.cache = cache if cache is not None else AnalysisCache(assets)
+        self._ranked: Dict[Tuple[str, bool], List[Tuple[float, int]]] = {}
+        self._keys: Dict[Tuple[str, bool], List[Tuple[float, int]]] = {}
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self.rebuild()
+        assets.add_listener(self._dirty.add)
+
+    def rebuild(self):
+        """Rank the whole universe from scratch with the batch scorer (or warm snapshot scores)"""
+        scores = self.cache.batch_scores() or score_universe(self.assets)
+        with self._lock:
+            for risk, profit_focused in BUCKETS:
+                weighted = weighted_scores(scores, risk, "low" if profit_focused else "medium")
+                keys = [(-round(score, 2), row) for row, score in enumerate(weighted)]
+                self._keys[risk, profit_focused] = keys
+                self._ranked[risk, profit_focused] = sorted(keys)
+            self._dirty.clear()
+
+    def _rerank(self, row: int):
+        name = self.assets.name_of(row)
+        profitability, sustainability = self.cache.analyses(name)
+        data = self.assets[name]
+        for bucket in BUCKETS:
+            risk, profit_focused = bucket
+            score = compute_weighted_score(profitability["score"], sustainability["score"], data,
+                                           risk, "low" if profit_focused else "medium")
+            key = (-round(score, 2), row)
+            keys = self._keys[bucket]
+            ranked = self._ranked[bucket]
+            if row < len(keys):
+                old = keys[row]
+                if old == key:
+                    continue
+                del ranked[bisect_left(ranked, old)]
+                keys[row] = key
+            else:
+                # Rows are appended in order, so a new row is always the next index
+                keys.append(key)
+            insort(ranked, key)
+
+    def _flush(self):
+        rows = []
+        while self._dirty:
+            rows.append(self._dirty.pop())
+        # Ascending so newly added rows are appended in row order
+        for row in sorted(rows):
+            self._rerank(row)
+
+    def top(self, profile: InvestorProfile, k: int) -> List[str]:
+        """Names of the k best assets for a profile, best first"""
+        with self._lock:
+            self._flush()
+            ranked = self._ranked[bucket_of(profile)]
+            return [self.assets.name_of(row) for _score, row in ranked[:k]]
+
+    def close(self):
+        """Stop following table updates"""
+        self.assets.remove_listener(self._dirty.add)